@@ -0,0 +1,130 @@
+"""
+Compares the CPU cost and the bytes saved by each response compression
+setting on payloads shaped like the list endpoints' (GET /project/ and
+GET /user/).
+
+Run it from `api_service/`:
+
+    python -m benchmarks.compression [--rows 100 1000] [--repeat 20]
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+import zlib
+
+from datetime import datetime, timedelta, timezone
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+STATUSES = ["Planning", "In Progress", "Completed", "On Hold", "Cancelled"]
+POSITIONS = ["Backend Developer", "Frontend Developer", "QA", "Designer"]
+ROLES = ["Developer", "Tester", "Manager"]
+
+
+def _timestamp(rng: random.Random) -> str:
+    moment = datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(
+        seconds=rng.randrange(365 * 24 * 3600),
+        microseconds=rng.randrange(1_000_000)
+    )
+    return moment.isoformat().replace("+00:00", "Z")
+
+
+def _user(rng: random.Random, id: int) -> dict:
+    return {
+        "user_id": id,
+        "full_name": f"User {id}",
+        "job_title": rng.choice(POSITIONS),
+        "updated_at": _timestamp(rng),
+        "deleted_at": None,
+        "role_name": rng.choice(ROLES),
+        "joined_at": _timestamp(rng),
+    }
+
+
+def users_payload(rows: int, seed: int = 0) -> bytes:
+    """
+    A GET /user/ body with `rows` users.
+    """
+    rng = random.Random(seed)
+    users = [_user(rng, id) for id in range(1, rows + 1)]
+    return json.dumps(users, separators=(",", ":")).encode()
+
+
+def projects_payload(rows: int, seed: int = 0) -> bytes:
+    """
+    A GET /project/ body with `rows` projects of 3 to 8 members each.
+    """
+    rng = random.Random(seed)
+    team = [_user(rng, id) for id in range(1, 201)]
+    projects = [
+        {
+            "project_id": id,
+            "name": f"Project {id}",
+            "description": f"Description of project {id}",
+            "status": rng.choice(STATUSES),
+            "users": rng.sample(team, rng.randint(3, 8)),
+            "updated_at": _timestamp(rng),
+            "deleted_at": None,
+            "begin_date": _timestamp(rng),
+            "end_date": _timestamp(rng),
+        }
+        for id in range(1, rows + 1)
+    ]
+    return json.dumps(projects, separators=(",", ":")).encode()
+
+
+def codecs():
+    yield "gzip-1", lambda data: zlib.compress(data, 1, 31)
+    yield "gzip-6", lambda data: zlib.compress(data, 6, 31)
+    yield "gzip-9", lambda data: zlib.compress(data, 9, 31)
+    if brotli is not None:
+        for quality in (1, 4, 5, 8):
+            yield f"br-{quality}", (
+                lambda data, quality=quality: brotli.compress(
+                    data, quality=quality
+                )
+            )
+
+
+def measure(compress, data: bytes, repeat: int) -> tuple[int, float]:
+    """
+    Returns the compressed size and the median time, in seconds, of
+    compressing `data`.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = len(compress(data))
+        timings.append(time.perf_counter() - started)
+    return size, statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'payload':<16}{'codec':<8}{'bytes':>10}{'ratio':>8}"
+          f"{'ms':>9}{'MB/s':>9}")
+    for name, build in (("project", projects_payload), ("user", users_payload)):
+        for rows in args.rows:
+            data = build(rows)
+            label = f"{name} x{rows}"
+            print(f"{label:<16}{'none':<8}{len(data):>10}{1:>8.1f}"
+                  f"{0:>9.2f}{'':>9}")
+            for codec, compress in codecs():
+                size, seconds = measure(compress, data, args.repeat)
+                print(f"{'':<16}{codec:<8}{size:>10}"
+                      f"{len(data) / size:>8.1f}{seconds * 1000:>9.2f}"
+                      f"{len(data) / seconds / 1e6:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
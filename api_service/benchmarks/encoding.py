@@ -0,0 +1,76 @@
+"""
+Compares the size and the encode and decode times of list responses in
+JSON and in MessagePack (Accept: application/msgpack). JSON decode times
+include turning the date strings into datetimes, which MessagePack
+clients get natively.
+
+Run it from `api_service/`:
+
+    python -m benchmarks.encoding [--rows 100 1000] [--repeat 20]
+"""
+import argparse
+import json
+import statistics
+import time
+
+import msgpack
+
+from benchmarks.compression import projects_payload, users_payload
+from core.negotiation import MsgPackResponse, _restore_datetimes
+
+
+def measure(func, data, repeat: int) -> float:
+    """
+    Returns the median time, in seconds, of `func(data)`.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(data)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'payload':<16}{'format':<9}{'bytes':>10}{'encode ms':>11}"
+          f"{'decode ms':>11}")
+    for name, build in (("project", projects_payload), ("user", users_payload)):
+        for rows in args.rows:
+            json_body = build(rows)
+            content = json.loads(json_body)
+            msgpack_body = MsgPackResponse(content).body
+            label = f"{name} x{rows}"
+            json_encode = measure(
+                lambda data: json.dumps(data, separators=(",", ":")),
+                content,
+                args.repeat
+            )
+            json_decode = measure(
+                lambda data: _restore_datetimes(json.loads(data)),
+                json_body,
+                args.repeat
+            )
+            msgpack_encode = measure(
+                lambda data: MsgPackResponse(data),
+                content,
+                args.repeat
+            )
+            msgpack_decode = measure(
+                lambda data: msgpack.unpackb(data, timestamp=3),
+                msgpack_body,
+                args.repeat
+            )
+            print(f"{label:<16}{'json':<9}{len(json_body):>10}"
+                  f"{json_encode * 1000:>11.2f}{json_decode * 1000:>11.2f}")
+            print(f"{'':<16}{'msgpack':<9}{len(msgpack_body):>10}"
+                  f"{msgpack_encode * 1000:>11.2f}"
+                  f"{msgpack_decode * 1000:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Measures the client-side CPU spent per repository lookup: rebuilding a
+select for every call (with or without `lambda_stmt`) versus reusing the
+statements BaseRepository builds once.
+
+It runs against the configured database, inside a transaction that is
+rolled back, so it leaves no data behind. Run it from `api_service/`:
+
+    python -m benchmarks.queries [--repeat 3000]
+"""
+import argparse
+import time
+
+from sqlalchemy import lambda_stmt
+from sqlmodel import Session, select
+
+from core.db import create_db_and_tables, engine
+from models.project import Project
+from models.role import Role
+from models.user import User
+from repositories.project import ProjectRepository
+
+
+def measure(session: Session, lookup, repeat: int) -> tuple[float, float]:
+    """
+    Returns the CPU and wall-clock time, in microseconds, of one lookup.
+    The session is emptied between lookups, so each one runs its query.
+    """
+    for _ in range(min(repeat, 200)):
+        lookup()
+        session.expunge_all()
+    cpu, wall = time.process_time(), time.perf_counter()
+    for _ in range(repeat):
+        lookup()
+        session.expunge_all()
+    return (
+        (time.process_time() - cpu) / repeat * 1e6,
+        (time.perf_counter() - wall) / repeat * 1e6
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3000)
+    args = parser.parse_args()
+
+    engine.echo = False
+    create_db_and_tables()
+    with Session(engine) as session:
+        role = Role(name="Benchmark", description="")
+        session.add(role)
+        session.flush()
+        session.add(User(name="Benchmark", position="", role_id=role.id))
+        project = Project(name="Benchmark")
+        session.add(project)
+        session.flush()
+        id = project.id
+        repo = ProjectRepository(session=session)
+
+        def rebuilt():
+            statement = select(Project).where(
+                Project.id == id,
+                Project.deleted_at.is_(None)
+            )
+            return session.exec(statement).first()
+
+        def lambda_built():
+            statement = lambda_stmt(lambda: select(Project).where(
+                Project.id == id,
+                Project.deleted_at.is_(None)
+            ))
+            return session.exec(statement).first()
+
+        def rebuilt_all():
+            statement = select(Project).where(Project.deleted_at.is_(None))
+            return session.exec(statement).all()
+
+        lookups = [
+            ("get_by_id: Session.get", lambda: session.get(Project, id)),
+            ("get_by_id: select", rebuilt),
+            ("get_by_id: lambda_stmt", lambda_built),
+            ("get_by_id: reused", lambda: repo.get_by_id(id)),
+            ("get_all: select", rebuilt_all),
+            ("get_all: reused", lambda: repo.get_all()),
+        ]
+        print(f"{engine.dialect.name}, {args.repeat} lookups each")
+        print(f"{'lookup':<26}{'cpu us':>9}{'wall us':>9}")
+        for name, lookup in lookups:
+            cpu, wall = measure(session, lookup, args.repeat)
+            print(f"{name:<26}{cpu:>9.1f}{wall:>9.1f}")
+        session.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Measures the cost of tracing per request: disabled, and enabled with
+several sample rates, exporting to a file in batches.
+
+Each setting runs in its own process (tracing is set up at import) against
+a private in-memory SQLite database, so only the application side is
+measured: the database time does not depend on tracing. Run it from
+`api_service/`:
+
+    python -m benchmarks.tracing [--requests 2000] [--rates 0 0.1 1]
+                                 [--repeat 3]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def child(requests: int) -> None:
+    """
+    Runs in the measuring process: seeds a project with members, then
+    reads it back, alone and in the list, and prints the median time of a
+    request in microseconds.
+    """
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as client:
+        role = client.post("/role/", json={
+            "name": "Benchmark",
+            "description": "Tracing benchmark"
+        }).json()["id"]
+        users = [
+            client.post("/user/", json={
+                "name": f"Member {index}",
+                "position": "Engineer",
+                "role_id": role
+            }).json()["user_id"]
+            for index in range(5)
+        ]
+        project = client.post("/project/", json={
+            "name": "Benchmark",
+            "begin_date": "2024-01-01T00:00:00",
+            "end_date": "2024-12-31T00:00:00",
+            "user_ids": users
+        }).json()["project_id"]
+
+        def run(count: int) -> list[float]:
+            timings = []
+            for index in range(count):
+                started = time.perf_counter()
+                if index % 2:
+                    client.get(f"/project/{project}")
+                else:
+                    client.get("/project/", params={"limit": 20})
+                timings.append(time.perf_counter() - started)
+            return timings
+
+        run(min(requests, 200))
+        print(json.dumps(statistics.median(run(requests)) * 1e6))
+
+
+def measure(environment: dict, requests: int) -> float:
+    """
+    Returns the median time, in microseconds, of one request with tracing
+    set up by `environment`.
+    """
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.tracing", "--child",
+         "--requests", str(requests)],
+        env={**os.environ, **environment},
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--rates", type=float, nargs="+", default=[0, 0.01, 0.1, 1]
+    )
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.requests)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        common = {
+            "DATABASE_BACKEND": "sqlite",
+            "SQLITE_PATH": ":memory:",
+            "RATE_LIMIT_ENABLED": "false",
+            "PURGE_INTERVAL_SECONDS": "0",
+            "AUDIT_ENABLED": "false",
+            "AUDIT_MAINTENANCE_INTERVAL_SECONDS": "0",
+            "LOG_LEVEL": "WARNING",
+            "TRACING_EXPORTER": "file",
+            "TRACING_FILE_PATH": os.path.join(directory, "traces.jsonl")
+        }
+        settings = [("disabled", {"TRACING_ENABLED": "false"})] + [
+            (f"sampled {rate:.0%}", {
+                "TRACING_ENABLED": "true",
+                "TRACING_SAMPLE_RATE": str(rate)
+            })
+            for rate in args.rates
+        ]
+        print(f"{'tracing':<16}{'us/req':>12}{'overhead':>10}")
+        baseline = None
+        for label, environment in settings:
+            # The best of several runs: the others were disturbed.
+            cost = min(
+                measure({**common, **environment}, args.requests)
+                for _ in range(args.repeat)
+            )
+            baseline = baseline or cost
+            print(f"{label:<16}{cost:>12.0f}"
+                  f"{(cost - baseline) / baseline:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+import logging
+import os
+import queue
+import threading
+
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from enum import Enum
+from fastapi import Request
+from pydantic_core import to_jsonable_python
+from sqlalchemy import event
+from sqlmodel import Session
+from starlette.types import ASGIApp, Receive, Scope, Send
+from typing import Any, Callable, Dict, Iterable, List
+
+from core.db import engine
+from core.metrics import registry
+from core.ratelimit import client_key
+from repositories.audit import AuditRepository
+
+
+AUDIT_ENABLED = os.getenv("AUDIT_ENABLED", "true").lower() == "true"
+# Entries are written when this many are waiting, or every
+# AUDIT_FLUSH_INTERVAL seconds.
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1"))
+# Entries waiting to be written at most. When the database falls that far
+# behind, new entries are dropped (and counted): a request that committed
+# never waits on the audit log.
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+
+
+logger = logging.getLogger(__name__)
+
+# The client making the current request (see AuditActorMiddleware).
+audit_actor: ContextVar[str | None] = ContextVar("audit_actor", default=None)
+
+
+class AuditActorMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Makes the client of each request the actor of the changes it makes.
+        The client is identified like the rate limiter does: by a hash of
+        its API key, or by its IP address.
+
+        Args:
+            app (ASGIApp): The application to wrap.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = audit_actor.set(client_key(Request(scope)))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            audit_actor.reset(token)
+
+
+def diff(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Describes the fields changed by a write as {"field": {"old": ...,
+    "new": ...}}, with JSON-compatible values. Fields whose value did not
+    change are left out.
+
+    Args:
+        before (Dict[str, Any]): The values of the fields before the write
+        (missing fields are None).
+        after (Dict[str, Any]): The values written.
+    """
+    changes = {}
+    for field, new in after.items():
+        old = before.get(field)
+        if old != new:
+            changes[field] = {
+                "old": to_jsonable_python(old),
+                "new": to_jsonable_python(new)
+            }
+    return changes
+
+
+def record(
+    session: Session,
+    entity: Enum,
+    entity_id: int,
+    action: Enum,
+    changes: Dict[str, Any] | None = None
+) -> None:
+    """
+    Records a change made through a session. The entry is only kept if the
+    session commits, and is then written by the audit writer, off the
+    request path.
+
+    Args:
+        session (Session): The session the change is made through.
+        entity (Enum): The kind of record changed (an AuditEntity).
+        entity_id (int): The ID of the record changed.
+        action (Enum): What was done (an AuditAction).
+        changes (Dict[str, Any] | None): The fields changed (see diff).
+    """
+    if not AUDIT_ENABLED:
+        return
+    session.info.setdefault("audit", []).append({
+        "occurred_at": datetime.now(timezone.utc),
+        "actor": audit_actor.get(),
+        "entity": entity,
+        "entity_id": entity_id,
+        "action": action,
+        "changes": changes or {}
+    })
+
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_committed(session: Session) -> None:
+    entries = session.info.pop("audit", None)
+    if entries:
+        audit_writer.enqueue(entries)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop("audit", None)
+
+
+class AuditWriter:
+    def __init__(
+        self,
+        write: Callable[[List[dict]], None] | None = None,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        interval: float = AUDIT_FLUSH_INTERVAL,
+        max_size: int = AUDIT_QUEUE_SIZE
+    ) -> None:
+        """
+        Writes the committed audit entries in batches from a daemon thread,
+        so requests never wait on the audit log.
+
+        Entries are only lost if the process dies before writing them, or
+        if the queue is full; a failed batch is kept and written again with
+        the next one.
+
+        Args:
+            write (Callable[[List[dict]], None] | None): Writes one batch of
+            entries. Defaults to an insert in a new session.
+            batch_size (int): The most entries written per statement.
+            interval (float): Seconds between two writes when entries come
+            in slowly.
+            max_size (int): The most entries waiting to be written.
+        """
+        self.write = write or _write_entries
+        self.batch_size = batch_size
+        self.interval = interval
+        self.written = 0
+        self.failures = 0
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+        self._retry: List[dict] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() + len(self._retry)
+
+    def enqueue(self, entries: Iterable[dict]) -> None:
+        """
+        Queues entries for writing. When the writer is not running (in
+        scripts), they are written at once.
+
+        Never blocks: it runs after the changes are committed, and entries
+        that don't fit in the queue are dropped and logged.
+        """
+        dropped = 0
+        for entry in entries:
+            try:
+                self._queue.put_nowait(entry)
+            except queue.Full:
+                dropped += 1
+        if dropped:
+            self.dropped += dropped
+            logger.error("Audit queue full, %s entries dropped", dropped)
+        if not self.running:
+            self.flush()
+        elif self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """
+        Writes all the entries queued so far.
+
+        Returns:
+            int: The number of entries written.
+        """
+        written = 0
+        with self._lock:
+            while True:
+                batch, self._retry = self._retry, []
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not batch:
+                    return written
+                try:
+                    self.write(batch)
+                except Exception:
+                    self.failures += 1
+                    self._retry = batch
+                    logger.exception(
+                        "Could not write %s audit entries", len(batch)
+                    )
+                    return written
+                written += len(batch)
+                self.written += len(batch)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def start(self) -> None:
+        """
+        Starts the writer thread. Does nothing if it is already running.
+        """
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="audit-writer",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """
+        Stops the writer thread and writes the entries still queued.
+
+        Args:
+            timeout (float | None): Maximum seconds to wait for the thread.
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+
+def _write_entries(entries: List[dict]) -> None:
+    with Session(engine) as session:
+        AuditRepository(session=session).append(entries)
+        session.commit()
+
+
+audit_writer = AuditWriter()
+
+registry.gauge(
+    "audit_entries_pending",
+    "Committed audit entries waiting to be written.",
+    lambda: audit_writer.pending
+)
+registry.counter(
+    "audit_entries_written_total",
+    "Audit entries written to the audit log.",
+    lambda: audit_writer.written
+)
+registry.counter(
+    "audit_entries_dropped_total",
+    "Audit entries dropped because the audit queue was full.",
+    lambda: audit_writer.dropped
+)
+registry.counter(
+    "audit_write_failures_total",
+    "Batches of audit entries that failed to be written.",
+    lambda: audit_writer.failures
+)
@@ -0,0 +1,161 @@
+import json
+import os
+import threading
+import time
+
+from typing import Any
+
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/1")
+
+
+class InMemoryCache:
+    def __init__(self, max_entries: int = 10_000):
+        """
+        Keeps cached values in process memory.
+
+        Each API process has its own copy, so a value may be served stale by
+        one process for up to its TTL after another one refreshed it. Use a
+        shared backend when that matters.
+
+        Args:
+            max_entries (int): Number of entries above which expired entries
+            are dropped, and then the oldest ones.
+        """
+        self.max_entries = max_entries
+        self._entries: dict[str, tuple[float, str]] = {}
+        # Reentrant: add() sets the value while holding it.
+        self._lock = threading.RLock()
+
+    def get(self, key: str) -> Any | None:
+        """
+        Retrieves a cached value.
+
+        Args:
+            key (str): The key of the value.
+
+        Returns:
+            Any | None: The value, or None if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """
+        Caches a JSON-serializable value for `ttl` seconds.
+        """
+        now = time.monotonic()
+        encoded = json.dumps(value)
+        with self._lock:
+            self._entries[key] = (now + ttl, encoded)
+            if len(self._entries) > self.max_entries:
+                self._entries = {
+                    key: entry
+                    for key, entry in self._entries.items()
+                    if entry[0] > now
+                }
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+
+    def add(self, key: str, value: Any, ttl: float) -> bool:
+        """
+        Caches a JSON-serializable value for `ttl` seconds, unless the key
+        already holds a live value.
+
+        Returns:
+            bool: True if the value was cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return False
+            self.set(key, value, ttl)
+            return True
+
+    def delete(self, key: str) -> None:
+        """
+        Removes a cached value.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class RedisCache:
+    def __init__(self, client, prefix: str = "cache:"):
+        """
+        Keeps cached values in Redis, shared by every API process. Values
+        expire server-side.
+
+        Args:
+            client: A `redis.Redis` compatible client.
+            prefix (str): Prefix of the keys written.
+        """
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Any | None:
+        """
+        Retrieves a cached value. See InMemoryCache.get.
+        """
+        value = self.client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """
+        Caches a JSON-serializable value for `ttl` seconds.
+        """
+        self.client.set(
+            self.prefix + key,
+            json.dumps(value),
+            px=max(1, int(ttl * 1000))
+        )
+
+    def add(self, key: str, value: Any, ttl: float) -> bool:
+        """
+        Caches a value unless the key exists, atomically. See
+        InMemoryCache.add.
+        """
+        return bool(self.client.set(
+            self.prefix + key,
+            json.dumps(value),
+            px=max(1, int(ttl * 1000)),
+            nx=True
+        ))
+
+    def delete(self, key: str) -> None:
+        """
+        Removes a cached value.
+        """
+        self.client.delete(self.prefix + key)
+
+
+def create_cache(name: str = CACHE_BACKEND):
+    """
+    Creates the cache backend selected by configuration.
+
+    Args:
+        name (str): "memory" or "redis".
+
+    Returns:
+        The cache instance.
+    """
+    if name == "memory":
+        return InMemoryCache()
+    if name == "redis":
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+        return RedisCache(redis.Redis.from_url(CACHE_REDIS_URL))
+    raise ValueError(f"Unknown cache backend: {name}")
+
+
+cache = create_cache()
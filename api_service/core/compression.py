@@ -0,0 +1,216 @@
+import os
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import List
+
+from core.http import parse_quality_values
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional: only gzip is offered without it.
+    brotli = None
+
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+# Bodies smaller than this are sent as is: below about a kilobyte the
+# headers dominate and compressing only costs CPU.
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+# Levels for bodies sent in one piece.
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+# Levels for streaming responses, which are compressed and flushed chunk by
+# chunk: cheap levels keep the time to first byte low.
+COMPRESSION_STREAMING_GZIP_LEVEL = int(
+    os.getenv("COMPRESSION_STREAMING_GZIP_LEVEL", "1")
+)
+COMPRESSION_STREAMING_BROTLI_QUALITY = int(
+    os.getenv("COMPRESSION_STREAMING_BROTLI_QUALITY", "1")
+)
+
+# Media types worth compressing (images, archives... already are).
+COMPRESSIBLE_MEDIA_TYPES = (
+    "text/",
+    "application/json",
+    "application/msgpack",
+    "application/javascript",
+    "application/xml",
+)
+
+
+def supported_encodings() -> List[str]:
+    """
+    The encodings the server can produce, by order of preference.
+    """
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """
+    Picks the content coding of a response (RFC 9110, section 12.5.3).
+
+    The coding with the highest q-value among the supported ones is chosen;
+    ties go to the server's preference (brotli, then gzip). A "*" entry
+    covers the codings not listed and a q-value of 0 refuses a coding.
+
+    Args:
+        accept_encoding (str | None): The request's Accept-Encoding header.
+
+    Returns:
+        str | None: "br" or "gzip", or None to send the body unencoded.
+    """
+    if not accept_encoding:
+        return None
+    codings = parse_quality_values(accept_encoding)
+    wildcard = codings.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in supported_encodings():
+        q = codings.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _Encoder:
+    def __init__(self, encoding: str, streaming: bool) -> None:
+        """
+        Incremental gzip or brotli compressor.
+
+        Args:
+            encoding (str): "br" or "gzip".
+            streaming (bool): Whether to use the streaming levels.
+        """
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(
+                quality=COMPRESSION_STREAMING_BROTLI_QUALITY
+                if streaming else COMPRESSION_BROTLI_QUALITY
+            )
+        else:
+            # wbits=31 writes the gzip header and trailer.
+            self._compressor = zlib.compressobj(
+                COMPRESSION_STREAMING_GZIP_LEVEL
+                if streaming else COMPRESSION_GZIP_LEVEL,
+                zlib.DEFLATED,
+                31
+            )
+
+    def compress_all(self, data: bytes) -> bytes:
+        """
+        Compresses a whole body in one go.
+        """
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.finish()
+        return self._compressor.compress(data) + self._compressor.flush()
+
+    def compress(self, data: bytes) -> bytes:
+        """
+        Compresses a chunk and flushes it, so the client can decode
+        everything received so far.
+        """
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return (
+            self._compressor.compress(data)
+            + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        )
+
+    def finish(self) -> bytes:
+        """
+        Ends the compressed stream.
+        """
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MINIMUM_SIZE
+    ) -> None:
+        """
+        ASGI middleware compressing responses with brotli (when the
+        `brotli` package is installed) or gzip, as negotiated with the
+        client's Accept-Encoding header.
+
+        Only compressible media types are encoded. Bodies sent in one piece
+        are compressed if they reach `minimum_size`; streaming responses
+        are compressed chunk by chunk with the cheaper streaming levels.
+
+        Args:
+            app (ASGIApp): The application to wrap.
+            minimum_size (int): The smallest body, in bytes, compressed.
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding")
+        )
+
+        start: Message | None = None
+        encoder: _Encoder | None = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, encoder, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                headers = Headers(raw=message["headers"])
+                compressible = (
+                    message["status"] not in (204, 206, 304)
+                    and "content-encoding" not in headers
+                    and headers.get("content-type", "").startswith(
+                        COMPRESSIBLE_MEDIA_TYPES
+                    )
+                )
+                if compressible:
+                    MutableHeaders(scope=message).add_vary_header(
+                        "Accept-Encoding"
+                    )
+                passthrough = not compressible or encoding is None
+                if passthrough:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                encoder = _Encoder(encoding, streaming=more_body)
+                headers = MutableHeaders(scope=start)
+                headers["Content-Encoding"] = encoding
+                if more_body:
+                    del headers["Content-Length"]
+                    await send(start)
+                else:
+                    body = encoder.compress_all(body)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+            body = encoder.compress(body) if body else b""
+            if not more_body:
+                body += encoder.finish()
+            await send({
+                "type": "http.response.body",
+                "body": body,
+                "more_body": more_body
+            })
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,183 @@
+import os
+import threading
+import time
+
+from core.metrics import registry
+
+
+DB_CONCURRENCY_ENABLED = os.getenv("DB_CONCURRENCY_ENABLED", "true").lower() == "true"
+# Defaults to the size of the connection pool, overflow included (see
+# core.db), so requests queue here rather than on the pool.
+DB_CONCURRENCY_MAX_LIMIT = int(
+    os.getenv("DB_CONCURRENCY_MAX_LIMIT")
+    or int(os.getenv("DB_POOL_SIZE", "5")) + int(os.getenv("DB_MAX_OVERFLOW", "10"))
+)
+DB_CONCURRENCY_MIN_LIMIT = min(
+    int(os.getenv("DB_CONCURRENCY_MIN_LIMIT", "2")),
+    DB_CONCURRENCY_MAX_LIMIT
+)
+DB_CONCURRENCY_INITIAL_LIMIT = min(
+    int(os.getenv("DB_CONCURRENCY_INITIAL_LIMIT", "10")),
+    DB_CONCURRENCY_MAX_LIMIT
+)
+DB_CONCURRENCY_MAX_QUEUE = int(os.getenv("DB_CONCURRENCY_MAX_QUEUE", "20"))
+DB_CONCURRENCY_QUEUE_TIMEOUT = float(os.getenv("DB_CONCURRENCY_QUEUE_TIMEOUT", "0.5"))
+DB_LATENCY_TARGET_MS = float(os.getenv("DB_LATENCY_TARGET_MS", "100"))
+
+
+class AdaptiveConcurrencyLimiter:
+    def __init__(
+        self,
+        initial_limit: int = DB_CONCURRENCY_INITIAL_LIMIT,
+        min_limit: int = DB_CONCURRENCY_MIN_LIMIT,
+        max_limit: int = DB_CONCURRENCY_MAX_LIMIT,
+        max_queue: int = DB_CONCURRENCY_MAX_QUEUE,
+        queue_timeout: float = DB_CONCURRENCY_QUEUE_TIMEOUT,
+        latency_target: float = DB_LATENCY_TARGET_MS / 1000,
+        backoff_ratio: float = 0.9,
+        smoothing: float = 0.2
+    ):
+        """
+        Caps the number of in-flight database-bound requests with an AIMD
+        (additive increase, multiplicative decrease) limit driven by the
+        observed query latency.
+
+        While the smoothed query latency stays under the target, every full
+        window of requests completed at the limit raises it by one. When it
+        goes over the target, or a request fails because the database is
+        unreachable or the pool is exhausted, the limit is multiplied by
+        `backoff_ratio`, at most once per window (a number of requests equal
+        to the limit) so a single slow burst does not collapse it. Requests
+        over the limit wait in a short queue; once the queue is full, or the
+        wait times out, they are rejected so they can fail fast instead of
+        piling up.
+
+        Args:
+            initial_limit (int): The limit to start with.
+            min_limit (int): The lowest the limit can go.
+            max_limit (int): The highest the limit can go; it should not
+            exceed the size of the connection pool.
+            max_queue (int): The maximum number of waiting requests.
+            queue_timeout (float): Seconds a request may wait for a slot.
+            latency_target (float): Seconds of smoothed query latency above
+            which the database is considered overloaded.
+            backoff_ratio (float): The factor applied to the limit on
+            overload.
+            smoothing (float): The weight of a new sample in the moving
+            average of the query latency.
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.latency_target = latency_target
+        self.backoff_ratio = backoff_ratio
+        self.smoothing = smoothing
+
+        self._limit = float(initial_limit)
+        self.in_flight = 0
+        self.queued = 0
+        self.rejected = 0
+        self.latency = 0.0
+        self._window = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """
+        The current maximum number of in-flight requests.
+        """
+        return int(self._limit)
+
+    def observe(self, latency: float) -> None:
+        """
+        Records the duration of a database query.
+
+        Args:
+            latency (float): The duration in seconds.
+        """
+        self.latency += self.smoothing * (latency - self.latency)
+
+    def acquire(self) -> bool:
+        """
+        Takes an in-flight slot, waiting up to `queue_timeout` for one.
+
+        Returns:
+            bool: True if a slot was taken, False if the request must be
+            rejected.
+        """
+        with self._condition:
+            if self.in_flight < self.limit:
+                self.in_flight += 1
+                return True
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                return False
+            self.queued += 1
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while self.in_flight >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        return False
+                    self._condition.wait(remaining)
+            finally:
+                self.queued -= 1
+            self.in_flight += 1
+            return True
+
+    def release(self, overloaded: bool = False) -> None:
+        """
+        Gives back a slot taken with `acquire` and adapts the limit.
+
+        Args:
+            overloaded (bool): Whether the request failed because of the
+            database being overloaded or unreachable.
+        """
+        with self._condition:
+            saturated = self.in_flight >= self.limit
+            self.in_flight -= 1
+            self._window += 1
+            if overloaded or self.latency > self.latency_target:
+                if self._window >= self.limit:
+                    self._limit = max(
+                        self.min_limit,
+                        self._limit * self.backoff_ratio
+                    )
+                    self._window = 0
+            elif saturated:
+                self._limit = min(
+                    self.max_limit,
+                    self._limit + 1 / self._limit
+                )
+            self._condition.notify_all()
+
+
+db_limiter = AdaptiveConcurrencyLimiter()
+
+registry.gauge(
+    "db_concurrency_limit",
+    "Current maximum number of in-flight database-bound requests.",
+    lambda: db_limiter.limit
+)
+registry.gauge(
+    "db_concurrency_in_flight",
+    "Database-bound requests currently being served.",
+    lambda: db_limiter.in_flight
+)
+registry.gauge(
+    "db_concurrency_queued",
+    "Database-bound requests waiting for a slot.",
+    lambda: db_limiter.queued
+)
+registry.counter(
+    "db_concurrency_rejected_total",
+    "Requests rejected with 503 because the database was saturated.",
+    lambda: db_limiter.rejected
+)
+registry.gauge(
+    "db_query_latency_seconds",
+    "Moving average of the database query latency.",
+    lambda: db_limiter.latency
+)
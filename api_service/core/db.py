@@ -1,21 +1,181 @@
 import os
+import threading
+import time
 
 from dotenv import load_dotenv
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError, TimeoutError
+from sqlalchemy.pool import StaticPool
 from sqlmodel import create_engine, SQLModel, Session
-from typing import Iterator
+from typing import Callable, Iterator
+
+from core.concurrency import DB_CONCURRENCY_ENABLED, db_limiter
+from core.logging import log_query
+from core.tracing import instrument_engine
+from models.base import schema_upgrades
 
 
 load_dotenv()
 
+# "postgresql" or "sqlite". SQLite needs no database server: it suits
+# tests and small single-node installs.
+DATABASE_BACKEND = os.getenv("DATABASE_BACKEND", "postgresql")
+
 POSTGRES_USER = os.getenv("POSTGRES_USER")
 POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD")
 POSTGRES_SERVER = os.getenv("POSTGRES_SERVER")
 POSTGRES_PORT = os.getenv("POSTGRES_PORT")
 POSTGRES_DB = os.getenv("POSTGRES_DB")
 
-DATABASE_URL = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}"
+# Connections kept open by the pool of each process, and extra ones opened
+# under load (closed when returned). When several API processes run (see
+# serve.py), these are derived from the global DB_POOL_BUDGET.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# Seconds a session waits for a connection when the pool is exhausted.
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# Path of the SQLite database file, or ":memory:" for a private in-memory
+# database (lost when the process exits).
+SQLITE_PATH = os.getenv("SQLITE_PATH", "project_db.sqlite")
+
+# Pragmas applied to every SQLite connection. WAL lets readers work while
+# a write is in progress; synchronous=NORMAL is safe in WAL mode and avoids
+# an fsync per commit; busy_timeout makes writers wait for the lock instead
+# of failing at once.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "foreign_keys": "ON",
+    "busy_timeout": "5000",
+    "cache_size": "-64000",
+    "temp_store": "MEMORY",
+    "mmap_size": "268435456",
+}
+
+
+class SerializedStaticPool(StaticPool):
+    """
+    The single shared connection of an in-memory SQLite database, handed to
+    one thread at a time.
+
+    Request handlers, the audit writer and the periodic tasks all run in
+    their own threads; without this their transactions would interleave on
+    the one connection. The connection may be returned from another thread
+    than the one that took it, since FastAPI closes request sessions in a
+    different worker. A session the holder opens meanwhile shares the
+    connection, as with a plain StaticPool.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+        self._owner = None
+
+    def _do_get(self):
+        thread = threading.get_ident()
+        if self._owner != thread:
+            if not self._lock.acquire(timeout=DB_POOL_TIMEOUT):
+                raise TimeoutError(
+                    f"The in-memory database connection was not released "
+                    f"within {DB_POOL_TIMEOUT:g} seconds"
+                )
+            self._owner = thread
+        return super()._do_get()
+
+    def _do_return_conn(self, record):
+        # Sessions sharing the connection share its pool record, which is
+        # returned once, by the first of them to close.
+        super()._do_return_conn(record)
+        self._owner = None
+        self._lock.release()
+
+
+def create_database_engine(backend: str = DATABASE_BACKEND):
+    """
+    Creates the engine of the configured database backend.
+
+    Args:
+        backend (str): "postgresql" or "sqlite".
+
+    Returns:
+        Engine: The SQLAlchemy engine.
+    """
+    if backend == "postgresql":
+        return create_engine(
+            f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}"
+            f"@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}",
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            # Workers are replaced on reload; drop connections the server
+            # closed meanwhile instead of failing the next request.
+            pool_pre_ping=True
+        )
+    if backend != "sqlite":
+        raise ValueError(f"Unknown database backend: {backend}")
+
+    in_memory = SQLITE_PATH == ":memory:"
+    if in_memory:
+        # An in-memory database only lives as long as its connection, so
+        # every session must share the same one, one thread at a time.
+        pool_options = {"poolclass": SerializedStaticPool}
+    else:
+        pool_options = {
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT
+        }
+    sqlite_engine = create_engine(
+        f"sqlite:///{SQLITE_PATH}",
+        # Sessions are used from FastAPI's worker threads.
+        connect_args={"check_same_thread": False},
+        **pool_options
+    )
+
+    @event.listens_for(sqlite_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            if in_memory and name == "journal_mode":
+                continue
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+    return sqlite_engine
+
+
+engine = create_database_engine()
+
 
-engine = create_engine(DATABASE_URL, echo=True)
+@event.listens_for(engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _observe_query_latency(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    db_limiter.observe(elapsed)
+    # Statements are logged sampled and off the request thread (see
+    # core.logging) rather than echoed synchronously.
+    log_query(statement, elapsed, executemany)
+
+
+@event.listens_for(engine, "handle_error")
+def _discard_query_timer(context):
+    # A failed statement never reaches after_cursor_execute: its start time
+    # would be left behind and paired with the next statement.
+    starts = (
+        context.connection.info.get("query_start")
+        if context.connection is not None else None
+    )
+    if starts:
+        starts.pop()
+
+
+instrument_engine(engine)
 
 
 def create_db_and_tables() -> None:
@@ -25,22 +185,114 @@ def create_db_and_tables() -> None:
     This function uses the SQLModel engine to connect to the database and 
     create all the tables that are mapped to SQLModel models.
 
+    The tables that already exist are upgraded (see upgrade_schema), so
+    upgrading only takes a restart.
+
     Returns:
         None
     """
     SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        upgrade_schema(connection)
+
+
+def upgrade_schema(connection) -> None:
+    """
+    Adds to existing tables the Postgres columns, indexes and constraints
+    introduced since they were created (see models.base.postgres_ddl).
+    Every statement is idempotent, so it can run at every startup.
+
+    Args:
+        connection: A connection in a transaction, so the upgrade is all or
+        nothing.
+    """
+    if connection.dialect.name != "postgresql":
+        return
+    for ddl in schema_upgrades:
+        connection.execute(ddl)
+
+
+class UnitOfWork:
+    def __init__(self, session_factory: Callable[[], Session] = None):
+        """
+        Wraps a session in a single transaction committed once at the end.
+
+        Repositories only flush their writes, so everything done through the
+        session (by one or several services) is committed together when the
+        block exits without an exception, and rolled back otherwise:
+
+            with UnitOfWork() as uow:
+                ProjectService(session=uow.session).create_project(...)
+
+        Args:
+            session_factory (Callable[[], Session]): Creates the session.
+            Defaults to a session on the application engine.
+        """
+        self.session_factory = session_factory or (lambda: Session(engine))
+        self.session: Session | None = None
+
+    def __enter__(self) -> "UnitOfWork":
+        self.session = self.session_factory()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        try:
+            if exc_type is None:
+                self.commit()
+            else:
+                self.rollback()
+        finally:
+            self.session.close()
+
+    def commit(self) -> None:
+        """
+        Commits the work done so far. The unit of work can keep being used.
+        """
+        self.session.commit()
+
+    def rollback(self) -> None:
+        """
+        Discards the work done since the last commit.
+        """
+        self.session.rollback()
 
 
 def get_session() -> Iterator[Session]:
     """
     Provides a session for database operations.
 
-    This function creates a new database session using the SQLModel engine. 
-    The session is used to interact with the database and is automatically 
-    closed when the operations are complete.
+    This function creates a new database session using the SQLModel engine,
+    wrapped in a unit of work: the request's writes are committed once,
+    after the route returns, or rolled back if it raises. The session is
+    automatically closed when the operations are complete.
+
+    Requests go through the adaptive concurrency limiter first: when the
+    database is saturated and the short wait queue is full, they fail fast
+    with a 503 and a Retry-After header instead of waiting on a connection.
 
     Yields:
         Session: A SQLModel session for interacting with the database.
+
+    Raises:
+        HTTPException: 503 if the request was shed by the limiter.
     """
-    with Session(engine) as session:
-        yield session
\ No newline at end of file
+    if not DB_CONCURRENCY_ENABLED:
+        with UnitOfWork() as uow:
+            yield uow.session
+        return
+
+    if not db_limiter.acquire():
+        raise HTTPException(
+            status_code=503,
+            detail="Service overloaded, retry later",
+            headers={"Retry-After": "1"}
+        )
+    overloaded = False
+    try:
+        with UnitOfWork() as uow:
+            yield uow.session
+    except (OperationalError, TimeoutError):
+        overloaded = True
+        raise
+    finally:
+        db_limiter.release(overloaded=overloaded)
\ No newline at end of file
@@ -0,0 +1,180 @@
+import os
+
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import HTTPException, Request, Response
+from typing import Dict, List
+
+
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "100"))
+
+
+def format_http_date(value: datetime) -> str:
+    """
+    Formats a datetime as an RFC 7231 HTTP-date (e.g. for Last-Modified).
+
+    Args:
+        value (datetime): The datetime to format. Naive values are assumed
+        to be in UTC.
+
+    Returns:
+        str: The HTTP-date representation of the value.
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def parse_http_date(value: str | None) -> datetime | None:
+    """
+    Parses an HTTP-date header value (e.g. If-Modified-Since).
+
+    Args:
+        value (str | None): The raw header value.
+
+    Returns:
+        datetime | None: The parsed timezone-aware datetime, or None if the
+        header is missing or malformed.
+    """
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def check_not_modified(
+    request: Request,
+    response: Response,
+    last_modified: datetime | None
+) -> Response | None:
+    """
+    Applies Last-Modified / If-Modified-Since handling to a single-resource
+    GET.
+
+    The Last-Modified header is set on the outgoing response. If the client
+    sent an If-Modified-Since header and the resource has not changed since
+    then, a bodiless 304 response is returned and should be sent as is.
+
+    Args:
+        request (Request): The incoming request.
+        response (Response): The response the route will send.
+        last_modified (datetime | None): The resource modification time.
+
+    Returns:
+        Response | None: A 304 Not Modified response, or None if the full
+        resource must be sent.
+    """
+    if last_modified is None:
+        return None
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    header_value = format_http_date(last_modified)
+    response.headers["Last-Modified"] = header_value
+
+    since = parse_http_date(request.headers.get("if-modified-since"))
+    if since is None:
+        return None
+    # HTTP-dates only carry whole seconds.
+    if last_modified.replace(microsecond=0) > since:
+        return None
+    return Response(status_code=304, headers={"Last-Modified": header_value})
+
+
+def parse_id_list(value: str, max_size: int = MAX_BATCH_SIZE) -> List[int]:
+    """
+    Parses a comma-separated list of IDs given as a query parameter
+    (e.g. `?ids=1,2,3`).
+
+    Args:
+        value (str): The raw query parameter value.
+        max_size (int): The maximum number of distinct IDs accepted.
+
+    Returns:
+        List[int]: The IDs in the order given, without duplicates.
+
+    Raises:
+        HTTPException: 400 if an ID is not an integer or if there are more
+        than `max_size` IDs.
+    """
+    try:
+        ids = [int(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="ids must be a comma-separated list of integers"
+        )
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > max_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {max_size} ids can be requested at once"
+        )
+    return ids
+
+
+def set_missing_ids(response: Response, missing_ids: List[int]) -> None:
+    """
+    Reports the IDs of a batch request that were not found in the
+    X-Missing-Ids response header.
+
+    Args:
+        response (Response): The response the route will send.
+        missing_ids (List[int]): The IDs that were not found.
+    """
+    if missing_ids:
+        response.headers["X-Missing-Ids"] = ",".join(map(str, missing_ids))
+
+
+def parse_quality_values(value: str) -> Dict[str, float]:
+    """
+    Parses a header listing values with optional q-values, such as Accept
+    or Accept-Encoding (e.g. "application/msgpack, application/json;q=0.5").
+
+    Args:
+        value (str): The raw header value.
+
+    Returns:
+        Dict[str, float]: The q-value of each (lowercased) value listed.
+        Values without a q-value have 1 and malformed q-values count as 0.
+    """
+    qualities = {}
+    for part in value.split(","):
+        item, _, params = part.strip().partition(";")
+        item = item.strip().lower()
+        if not item:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, param_value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(param_value)
+                except ValueError:
+                    q = 0.0
+        qualities[item] = q
+    return qualities
+
+
+def check_window(begin: datetime | None, end: datetime | None) -> None:
+    """
+    Validates a time window given as `from`/`to` query parameters.
+
+    Raises:
+        HTTPException: 400 if the window ends before it begins.
+    """
+    if begin is None or end is None:
+        return
+    if begin.tzinfo is None:
+        begin = begin.replace(tzinfo=timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if begin > end:
+        raise HTTPException(
+            status_code=400,
+            detail="from must not be after to"
+        )
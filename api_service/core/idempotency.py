@@ -0,0 +1,178 @@
+import base64
+import hashlib
+import os
+
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Callable, Coroutine
+
+from core.cache import cache
+from core.negotiation import MsgPackResponse, MsgPackRoute, prefers_msgpack
+from core.ratelimit import client_key
+
+
+# Seconds a response is replayed for. Clients must not retry a request
+# with the same key after that.
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "86400"))
+# Seconds a request holds its key while it runs. If its process dies, the
+# key becomes usable again after that.
+IDEMPOTENCY_LOCK_TTL = float(os.getenv("IDEMPOTENCY_LOCK_TTL", "60"))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+# Routes accepting an Idempotency-Key declare it with
+# `openapi_extra={IDEMPOTENT_KEY: True}`, which also documents it.
+IDEMPOTENT_KEY = "x-idempotent"
+
+
+def fingerprint(request: Request, body: bytes) -> str:
+    """
+    Identifies the content of a request: its method, path, query string,
+    body and the media type negotiated from its Accept header (the stored
+    response is replayed as is, so it must be in the encoding the retry
+    asks for). A key may only be reused for the very same request.
+    """
+    media_type = (
+        MsgPackResponse.media_type
+        if prefers_msgpack(request.headers.get("accept"))
+        else JSONResponse.media_type
+    )
+    digest = hashlib.sha256()
+    for part in (
+        request.method.encode(),
+        request.url.path.encode(),
+        request.url.query.encode(),
+        media_type.encode(),
+        body
+    ):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def _replay(stored: dict) -> Response:
+    response = Response(
+        content=base64.b64decode(stored["body"]),
+        status_code=stored["status"],
+        headers=dict(stored["headers"])
+    )
+    response.headers[REPLAYED_HEADER] = "true"
+    return response
+
+
+def _check_stored(stored: dict, request_fingerprint: str) -> Response:
+    if stored["fingerprint"] != request_fingerprint:
+        raise HTTPException(
+            status_code=422,
+            detail=f"{IDEMPOTENCY_HEADER} already used for a different request"
+        )
+    if stored["status"] is None:
+        raise HTTPException(
+            status_code=409,
+            detail=f"A request with this {IDEMPOTENCY_HEADER} is in progress",
+            headers={"Retry-After": "1"}
+        )
+    return _replay(stored)
+
+
+class IdempotentRoute(MsgPackRoute):
+    """
+    Route making retries of its requests safe when clients send an
+    Idempotency-Key header (only on routes declaring IDEMPOTENT_KEY).
+
+    The first request with a key runs and its successful response is
+    stored in the cache for IDEMPOTENCY_TTL seconds, together with the
+    request fingerprint. A retry with the same key gets the stored response
+    back (with `Idempotent-Replayed: true`) without running the route: no
+    service logic, no database session, no rate limit cost. Keys are scoped
+    to the client (see core.ratelimit.client_key).
+
+    A retry arriving while the first request still runs gets a 409, and a
+    key reused for a different request (or asking for another encoding, see
+    core.negotiation) a 422. Errors are not stored: a retry
+    after one runs the request again.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs) -> None:
+        super().__init__(path, endpoint, **kwargs)
+        if not (self.openapi_extra and self.openapi_extra.get(IDEMPOTENT_KEY)):
+            return
+        parameters = self.openapi_extra.get("parameters", [])
+        if any(p.get("name") == IDEMPOTENCY_HEADER for p in parameters):
+            return
+        self.responses = {
+            409: {
+                "description": f"A request with the same "
+                               f"{IDEMPOTENCY_HEADER} is in progress"
+            },
+            **self.responses
+        }
+        # Copied: including a router builds new routes sharing the dict.
+        self.openapi_extra = {
+            **self.openapi_extra,
+            "parameters": [*parameters, {
+                "name": IDEMPOTENCY_HEADER,
+                "in": "header",
+                "required": False,
+                "description": "A unique value (e.g. a UUID) per logical "
+                               "request. Retries sent with the same value "
+                               "replay the first response instead of "
+                               "running the request again.",
+                "schema": {
+                    "type": "string",
+                    "maxLength": IDEMPOTENCY_KEY_MAX_LENGTH
+                }
+            }]
+        }
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        route_handler = super().get_route_handler()
+        if not (self.openapi_extra and self.openapi_extra.get(IDEMPOTENT_KEY)):
+            return route_handler
+
+        async def handler(request: Request) -> Response:
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if key is None:
+                return await route_handler(request)
+            if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"{IDEMPOTENCY_HEADER} must have 1 to "
+                           f"{IDEMPOTENCY_KEY_MAX_LENGTH} characters"
+                )
+            cache_key = f"idempotency:{client_key(request)}:{key}"
+            request_fingerprint = fingerprint(request, await request.body())
+            # The cache may be remote (Redis): it is called from a thread.
+            stored = await run_in_threadpool(cache.get, cache_key)
+            if stored is not None:
+                return _check_stored(stored, request_fingerprint)
+            in_progress = {"fingerprint": request_fingerprint, "status": None}
+            if not await run_in_threadpool(
+                cache.add, cache_key, in_progress, IDEMPOTENCY_LOCK_TTL
+            ):
+                stored = await run_in_threadpool(cache.get, cache_key)
+                return _check_stored(stored or in_progress, request_fingerprint)
+
+            try:
+                response = await route_handler(request)
+            except BaseException:
+                await run_in_threadpool(cache.delete, cache_key)
+                raise
+            if response.status_code >= 400 or not hasattr(response, "body"):
+                await run_in_threadpool(cache.delete, cache_key)
+                return response
+            await run_in_threadpool(cache.set, cache_key, {
+                "fingerprint": request_fingerprint,
+                "status": response.status_code,
+                "headers": [
+                    (name, value)
+                    for name, value in response.headers.items()
+                    if name != "content-length"
+                ],
+                "body": base64.b64encode(response.body).decode()
+            }, IDEMPOTENCY_TTL)
+            return response
+
+        return handler
@@ -0,0 +1,276 @@
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import time
+import uuid
+
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.metrics import registry
+
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# "json" (one object per line, for the log pipeline) or "text" (for
+# reading in a terminal).
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+# Records waiting to be written at most. Records logged while the queue is
+# full are dropped (and counted) rather than slowing requests down.
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Fraction of the requests logged. Failed (5xx) and slow requests are
+# always logged.
+LOG_REQUEST_SAMPLE_RATE = float(os.getenv("LOG_REQUEST_SAMPLE_RATE", "1"))
+LOG_SLOW_REQUEST_MS = float(os.getenv("LOG_SLOW_REQUEST_MS", "1000"))
+# Fraction of the requests whose SQL statements are all logged (0 only
+# logs slow statements). Outside of requests, each statement is sampled.
+LOG_SQL_SAMPLE_RATE = float(os.getenv("LOG_SQL_SAMPLE_RATE", "0"))
+# Statements taking at least this long are always logged (0 disables it).
+LOG_SLOW_QUERY_MS = float(os.getenv("LOG_SLOW_QUERY_MS", "200"))
+# Characters of a statement logged at most. Parameters are never logged.
+LOG_SQL_MAX_LENGTH = int(os.getenv("LOG_SQL_MAX_LENGTH", "2000"))
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# Request IDs sent by clients or proxies are kept when they look like one.
+_REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9._:-]{1,128}")
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"
+
+# The attributes every LogRecord has; the others were passed with `extra`.
+_RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "request_id"}
+
+
+request_logger = logging.getLogger("api.request")
+sql_logger = logging.getLogger("api.sql")
+
+# The ID of the current request, added to every record logged while
+# handling it (see RequestLoggingMiddleware).
+request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+# Whether the SQL statements of the current request are logged; None
+# outside of requests.
+sql_sampled: ContextVar[bool | None] = ContextVar("sql_sampled", default=None)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as single-line JSON objects: the time, level, logger,
+    message and request ID, plus the fields passed with `extra`.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(
+                record.created, timezone.utc
+            ).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for name, value in record.__dict__.items():
+            if name not in _RECORD_ATTRIBUTES:
+                entry[name] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        elif record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    def __init__(self, log_queue: queue.Queue) -> None:
+        """
+        Hands records over to the listener thread. The calling thread only
+        resolves the message and the request ID; formatting and writing
+        happen on the listener thread.
+        """
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The record is shared with other handlers: it is copied, and its
+        # arguments and traceback (which may change or hold frames) are
+        # turned into text now.
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._formatter.formatException(record.exc_info)
+            record.exc_info = None
+        record.request_id = request_id.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_handler: _NonBlockingQueueHandler | None = None
+_listener: QueueListener | None = None
+
+
+def configure_logging() -> None:
+    """
+    Sends the records of every logger (the application's, uvicorn's,
+    SQLAlchemy's) to standard output through a queue, so logging never
+    waits on I/O. Does nothing if logging is already configured.
+
+    Uvicorn's own access log is turned off: RequestLoggingMiddleware logs
+    the requests instead, with their ID and duration.
+    """
+    global _handler, _listener
+    if _listener is not None:
+        return
+    output = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter(TEXT_FORMAT))
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    _handler = _NonBlockingQueueHandler(log_queue)
+    _listener = QueueListener(log_queue, output)
+    _listener.start()
+
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(LOG_LEVEL)
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logger = logging.getLogger(name)
+        logger.handlers.clear()
+        logger.propagate = True
+    logging.getLogger("uvicorn.access").disabled = True
+
+
+def stop_logging() -> None:
+    """
+    Writes the records still queued and stops the listener thread.
+    """
+    global _listener
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_handler)
+    _listener.stop()
+    _listener = None
+
+
+def new_request_id(incoming: str | None = None) -> str:
+    """
+    The ID of a request: the one sent by the client or a proxy if it is
+    valid, a new random one otherwise.
+
+    Args:
+        incoming (str | None): The X-Request-ID header of the request.
+    """
+    if incoming and _REQUEST_ID_PATTERN.fullmatch(incoming):
+        return incoming
+    return uuid.uuid4().hex
+
+
+def log_query(statement: str, seconds: float, executemany: bool) -> None:
+    """
+    Logs a SQL statement if it is slow, or if its request (or the statement
+    itself, outside of requests) is sampled. Called after every statement,
+    so the common case returns at once.
+
+    Args:
+        statement (str): The SQL statement.
+        seconds (float): The time it took.
+        executemany (bool): Whether it was run for several rows of
+        parameters.
+    """
+    duration_ms = seconds * 1000
+    slow = 0 < LOG_SLOW_QUERY_MS <= duration_ms
+    if not slow:
+        if LOG_SQL_SAMPLE_RATE <= 0:
+            return
+        sampled = sql_sampled.get()
+        if sampled is None:
+            sampled = random.random() < LOG_SQL_SAMPLE_RATE
+        if not sampled:
+            return
+    sql_logger.log(
+        logging.WARNING if slow else logging.INFO,
+        statement[:LOG_SQL_MAX_LENGTH],
+        extra={
+            "duration_ms": round(duration_ms, 3),
+            "executemany": executemany
+        }
+    )
+
+
+class RequestLoggingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Gives each request an ID, returned in the X-Request-ID header and
+        added to everything logged while handling it, and logs the request
+        once answered (sampled, see LOG_REQUEST_SAMPLE_RATE).
+
+        Args:
+            app (ASGIApp): The application to wrap.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        incoming = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                incoming = value.decode("latin-1")
+                break
+        current_id = new_request_id(incoming)
+        id_token = request_id.set(current_id)
+        sql_token = sql_sampled.set(
+            LOG_SQL_SAMPLE_RATE > 0 and random.random() < LOG_SQL_SAMPLE_RATE
+        )
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = current_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            if (
+                status >= 500
+                or duration_ms >= LOG_SLOW_REQUEST_MS
+                or random.random() < LOG_REQUEST_SAMPLE_RATE
+            ):
+                request_logger.log(
+                    logging.ERROR if status >= 500 else logging.INFO,
+                    "%s %s %s", scope["method"], scope["path"], status,
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status,
+                        "duration_ms": round(duration_ms, 3)
+                    }
+                )
+            sql_sampled.reset(sql_token)
+            request_id.reset(id_token)
+
+
+registry.counter(
+    "log_records_dropped_total",
+    "Log records dropped because the log queue was full.",
+    lambda: _handler.dropped if _handler is not None else 0
+)
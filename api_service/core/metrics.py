@@ -0,0 +1,58 @@
+import threading
+
+from typing import Callable, Dict, Tuple
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """
+        A minimal registry of metrics rendered in the Prometheus text
+        exposition format.
+
+        Metrics are registered with a callback returning their current value,
+        which is only called when the metrics are scraped, so recording them
+        costs nothing on the request path.
+        """
+        self._metrics: Dict[str, Tuple[str, str, Callable[[], float]]] = {}
+        self._lock = threading.Lock()
+
+    def _register(
+        self,
+        type: str,
+        name: str,
+        help: str,
+        func: Callable[[], float]
+    ) -> None:
+        with self._lock:
+            self._metrics[name] = (type, help, func)
+
+    def gauge(self, name: str, help: str, func: Callable[[], float]) -> None:
+        """
+        Registers a gauge (a value that may go up and down).
+        """
+        self._register("gauge", name, help, func)
+
+    def counter(self, name: str, help: str, func: Callable[[], float]) -> None:
+        """
+        Registers a counter (a monotonically increasing total).
+        """
+        self._register("counter", name, help, func)
+
+    def render(self) -> str:
+        """
+        Renders every registered metric.
+
+        Returns:
+            str: The metrics in the Prometheus text exposition format.
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        lines = []
+        for name, (type, help, func) in metrics:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {type}")
+            lines.append(f"{name} {float(func())}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,220 @@
+from datetime import datetime, timezone
+from fastapi import Request, Response
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, get_request_handler
+from pydantic import TypeAdapter
+from typing import Any, Callable, Coroutine, Dict
+
+from core.http import parse_quality_values
+
+try:
+    import msgpack
+except ImportError:  # MessagePack is optional: only JSON is served without it.
+    msgpack = None
+
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+def prefers_msgpack(accept: str | None) -> bool:
+    """
+    Tells whether a client asked for MessagePack rather than JSON.
+
+    MessagePack is chosen when the Accept header lists it with a q-value at
+    least as high as the one JSON gets (explicitly or through "*/*" or
+    "application/*").
+
+    Args:
+        accept (str | None): The request's Accept header.
+
+    Returns:
+        bool: True to answer in MessagePack.
+    """
+    if not accept or msgpack is None:
+        return False
+    qualities = parse_quality_values(accept)
+    msgpack_q = max(qualities.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES)
+    if msgpack_q <= 0:
+        return False
+    json_q = qualities.get(
+        "application/json",
+        qualities.get("application/*", qualities.get("*/*", 0.0))
+    )
+    return msgpack_q >= json_q
+
+
+def _parse_datetime(value: Any) -> Any:
+    if not isinstance(value, str):
+        return value
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return value
+    # Naive datetimes are stored in UTC.
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+Converter = Callable[[Any], Any]
+
+
+def datetime_restorer(schema: Dict[str, Any]) -> Converter | None:
+    """
+    Builds the function turning the dates of JSON-compatible content back
+    into datetimes, from the JSON schema of the content: the strings whose
+    schema has the "date-time" format, wherever they are nested.
+
+    Args:
+        schema (Dict[str, Any]): The serialization JSON schema of the
+        response model, with its `$defs`.
+
+    Returns:
+        Converter | None: The function, or None if the content holds no
+        dates.
+    """
+    definitions = schema.get("$defs", {})
+    converters: Dict[str, Converter | None] = {}
+
+    def build(node: Dict[str, Any]) -> Converter | None:
+        if "$ref" in node:
+            name = node["$ref"].rsplit("/", 1)[-1]
+            if name not in converters:
+                # Recursive models refer to themselves while being built.
+                converters[name] = lambda value: (
+                    converters[name](value) if converters[name] else value
+                )
+                converters[name] = build(definitions[name])
+            return converters[name]
+        alternatives = [
+            converter
+            for key in ("anyOf", "oneOf", "allOf")
+            for converter in map(build, node.get(key, []))
+            if converter is not None
+        ]
+        if alternatives:
+            # Each converter only touches the values of its own type.
+            def convert_any(value: Any) -> Any:
+                for converter in alternatives:
+                    value = converter(value)
+                return value
+            return convert_any if len(alternatives) > 1 else alternatives[0]
+        if node.get("format") == "date-time":
+            return _parse_datetime
+        if node.get("type") == "array" and "items" in node:
+            item = build(node["items"])
+            if item is None:
+                return None
+            return lambda value: (
+                [item(element) for element in value]
+                if isinstance(value, list) else value
+            )
+        properties = {
+            key: converter
+            for key, converter in (
+                (key, build(child))
+                for key, child in node.get("properties", {}).items()
+            )
+            if converter is not None
+        }
+        additional = node.get("additionalProperties")
+        others = build(additional) if isinstance(additional, dict) else None
+        if not properties and others is None:
+            return None
+
+        def convert_object(value: Any) -> Any:
+            if not isinstance(value, dict):
+                return value
+            return {
+                key: properties.get(key, others or _unchanged)(element)
+                for key, element in value.items()
+            }
+        return convert_object
+
+    return build(schema)
+
+
+def _unchanged(value: Any) -> Any:
+    return value
+
+
+class MsgPackResponse(Response):
+    media_type = "application/msgpack"
+    # Turns the dates of the content back into datetimes (see
+    # datetime_restorer); set for each route from its response model.
+    restore_datetimes: Converter | None = None
+
+    def render(self, content: Any) -> bytes:
+        """
+        Encodes JSON-compatible content (as produced from the response
+        model) in MessagePack, with dates as timestamp extension values.
+        """
+        if self.restore_datetimes is not None:
+            content = self.restore_datetimes(content)
+        return msgpack.packb(content, datetime=True)
+
+
+class MsgPackRoute(APIRoute):
+    """
+    Route serving its response model in MessagePack to clients that send
+    `Accept: application/msgpack`, and in JSON otherwise.
+
+    Both encodings go through the same validation and serialization of the
+    response model, so they carry the same fields. Routers opt in with
+    `APIRouter(route_class=MsgPackRoute)`; routes with a custom response
+    class, and every route when the `msgpack` package is not installed,
+    only serve JSON.
+    """
+
+    def _msgpack_response_class(self) -> type[MsgPackResponse]:
+        """
+        The response class of the route's MessagePack answers, restoring
+        the dates declared by its response model.
+        """
+        if self.response_field is None:
+            return MsgPackResponse
+        schema = TypeAdapter(
+            self.response_field.field_info.annotation
+        ).json_schema(mode="serialization")
+        restore = datetime_restorer(schema)
+        if restore is None:
+            return MsgPackResponse
+        return type(
+            "MsgPackResponse",
+            (MsgPackResponse,),
+            {"restore_datetimes": staticmethod(restore)}
+        )
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        json_handler = super().get_route_handler()
+        response_class = self.response_class
+        if isinstance(response_class, DefaultPlaceholder):
+            response_class = response_class.value
+        if msgpack is None or response_class is not JSONResponse:
+            return json_handler
+
+        msgpack_handler = get_request_handler(
+            dependant=self.dependant,
+            body_field=self.body_field,
+            status_code=self.status_code,
+            response_class=self._msgpack_response_class(),
+            response_field=self.secure_cloned_response_field,
+            response_model_include=self.response_model_include,
+            response_model_exclude=self.response_model_exclude,
+            response_model_by_alias=self.response_model_by_alias,
+            response_model_exclude_unset=self.response_model_exclude_unset,
+            response_model_exclude_defaults=self.response_model_exclude_defaults,
+            response_model_exclude_none=self.response_model_exclude_none,
+            dependency_overrides_provider=self.dependency_overrides_provider,
+            embed_body_fields=self._embed_body_fields,
+        )
+
+        async def handler(request: Request) -> Response:
+            if prefers_msgpack(request.headers.get("accept")):
+                response = await msgpack_handler(request)
+            else:
+                response = await json_handler(request)
+            response.headers.add_vary_header("Accept")
+            return response
+
+        return handler
@@ -0,0 +1,343 @@
+import hashlib
+import math
+import os
+import threading
+import time
+
+from fastapi import HTTPException, Request
+from typing import Iterator
+
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+# Budget of a client across all routes: bucket size and refill per second.
+RATE_LIMIT_CAPACITY = float(os.getenv("RATE_LIMIT_CAPACITY", "120"))
+RATE_LIMIT_REFILL_RATE = float(os.getenv("RATE_LIMIT_REFILL_RATE", "10"))
+# Budget of a client on a single route.
+RATE_LIMIT_ROUTE_CAPACITY = float(os.getenv("RATE_LIMIT_ROUTE_CAPACITY", "60"))
+RATE_LIMIT_ROUTE_REFILL_RATE = float(os.getenv("RATE_LIMIT_ROUTE_REFILL_RATE", "5"))
+# Maximum number of requests a client may have in flight at once.
+RATE_LIMIT_MAX_CONCURRENCY = int(os.getenv("RATE_LIMIT_MAX_CONCURRENCY", "10"))
+
+# Cost of a route that does not declare one. Routes declare their cost with
+# `openapi_extra={RATE_LIMIT_COST_KEY: <cost>}`, which also documents it; a
+# cost of 0 exempts the route.
+DEFAULT_COST = 1
+# Cost of the endpoints returning whole tables.
+LIST_COST = int(os.getenv("RATE_LIMIT_LIST_COST", "10"))
+RATE_LIMIT_COST_KEY = "x-rate-limit-cost"
+
+
+class InMemoryBackend:
+    def __init__(self, max_keys: int = 100_000):
+        """
+        Keeps token buckets and concurrency counters in process memory.
+
+        Only suitable when a single process serves the API; use a shared
+        backend otherwise.
+
+        Args:
+            max_keys (int): Number of buckets above which idle buckets
+            (which would be full again anyway) are dropped.
+        """
+        self.max_keys = max_keys
+        self._buckets: dict[str, tuple[float, float, float, float]] = {}
+        self._in_flight: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _evict_idle(self, now: float) -> None:
+        self._buckets = {
+            key: bucket
+            for key, bucket in self._buckets.items()
+            if (now - bucket[1]) * bucket[3] < bucket[2]
+        }
+
+    def consume(
+        self,
+        buckets: list[tuple[str, float, float]],
+        cost: float
+    ) -> float:
+        """
+        Takes `cost` tokens from each of several buckets, or from none of
+        them when one lacks tokens, so a rejected request never spends the
+        budget of another bucket.
+
+        Args:
+            buckets (list[tuple[str, float, float]]): The key, size and
+            refill rate (tokens added back per second) of each bucket.
+            cost (float): Tokens taken by the request.
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise the number of
+            seconds until every bucket holds enough tokens.
+        """
+        now = time.monotonic()
+        with self._lock:
+            levels = []
+            wait = 0.0
+            for key, capacity, refill_rate in buckets:
+                tokens, updated, _, _ = self._buckets.get(
+                    key, (capacity, now, capacity, refill_rate)
+                )
+                tokens = min(capacity, tokens + (now - updated) * refill_rate)
+                if tokens < cost:
+                    wait = max(wait, (cost - tokens) / refill_rate)
+                levels.append(tokens)
+            for (key, capacity, refill_rate), tokens in zip(buckets, levels):
+                if not wait:
+                    tokens -= cost
+                self._buckets[key] = (tokens, now, capacity, refill_rate)
+            if len(self._buckets) > self.max_keys:
+                self._evict_idle(now)
+            return wait
+
+    def acquire(self, key: str, limit: int) -> bool:
+        """
+        Takes one of the `limit` concurrency slots of a key.
+
+        Returns:
+            bool: True if a slot was taken, False if all are in use.
+        """
+        with self._lock:
+            in_flight = self._in_flight.get(key, 0)
+            if in_flight >= limit:
+                return False
+            self._in_flight[key] = in_flight + 1
+            return True
+
+    def release(self, key: str) -> None:
+        """
+        Gives back a concurrency slot taken with `acquire`.
+        """
+        with self._lock:
+            in_flight = self._in_flight.get(key, 0) - 1
+            if in_flight > 0:
+                self._in_flight[key] = in_flight
+            else:
+                self._in_flight.pop(key, None)
+
+
+_TOKEN_BUCKET_SCRIPT = """
+local cost = tonumber(ARGV[1])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i])
+    local refill_rate = tonumber(ARGV[2 * i + 1])
+    local bucket = redis.call('HMGET', key, 'tokens', 'updated')
+    local tokens = tonumber(bucket[1]) or capacity
+    local updated = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - updated) * refill_rate)
+    if tokens < cost then
+        wait = math.max(wait, (cost - tokens) / refill_rate)
+    end
+    levels[i] = tokens
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i])
+    local refill_rate = tonumber(ARGV[2 * i + 1])
+    local tokens = levels[i]
+    if wait == 0 then
+        tokens = tokens - cost
+    end
+    redis.call('HSET', key, 'tokens', tokens, 'updated', now)
+    redis.call('EXPIRE', key, math.ceil(capacity / refill_rate) + 1)
+end
+return tostring(wait)
+"""
+
+_ACQUIRE_SCRIPT = """
+local in_flight = redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[2]))
+if in_flight > tonumber(ARGV[1]) then
+    redis.call('DECR', KEYS[1])
+    return 0
+end
+return 1
+"""
+
+# Never goes below zero: a slot released after its counter expired (see
+# RedisBackend.slot_ttl) would otherwise hand out an extra slot.
+_RELEASE_SCRIPT = """
+local in_flight = tonumber(redis.call('GET', KEYS[1]) or '0')
+if in_flight > 1 then
+    redis.call('DECR', KEYS[1])
+else
+    redis.call('DEL', KEYS[1])
+end
+"""
+
+
+class RedisBackend:
+    def __init__(self, client, prefix: str = "ratelimit:", slot_ttl: int = 300):
+        """
+        Keeps token buckets and concurrency counters in Redis (or any
+        server speaking its protocol and Lua scripting), so every API
+        process shares the same budgets. Each operation is a single atomic
+        script call.
+
+        Args:
+            client: A `redis.Redis` compatible client.
+            prefix (str): Prefix of the keys written.
+            slot_ttl (int): Seconds after which the concurrency counter of an
+            idle client expires, so slots leaked by a crashed process are
+            eventually recovered.
+        """
+        self.client = client
+        self.prefix = prefix
+        self.slot_ttl = slot_ttl
+        self._consume = client.register_script(_TOKEN_BUCKET_SCRIPT)
+        self._acquire = client.register_script(_ACQUIRE_SCRIPT)
+        self._release = client.register_script(_RELEASE_SCRIPT)
+
+    def consume(
+        self,
+        buckets: list[tuple[str, float, float]],
+        cost: float
+    ) -> float:
+        """
+        Takes `cost` tokens from each of several buckets, or from none of
+        them. See InMemoryBackend.consume.
+        """
+        args = [cost]
+        for _, capacity, refill_rate in buckets:
+            args += [capacity, refill_rate]
+        wait = self._consume(
+            keys=[f"{self.prefix}bucket:{key}" for key, _, _ in buckets],
+            args=args
+        )
+        return float(wait)
+
+    def acquire(self, key: str, limit: int) -> bool:
+        """
+        Takes one of the `limit` concurrency slots of a key.
+        """
+        return bool(self._acquire(
+            keys=[f"{self.prefix}inflight:{key}"],
+            args=[limit, self.slot_ttl]
+        ))
+
+    def release(self, key: str) -> None:
+        """
+        Gives back a concurrency slot taken with `acquire`.
+        """
+        self._release(keys=[f"{self.prefix}inflight:{key}"])
+
+
+def create_backend(name: str = RATE_LIMIT_BACKEND):
+    """
+    Creates the rate limit backend selected by configuration.
+
+    Args:
+        name (str): "memory" or "redis".
+
+    Returns:
+        The backend instance.
+    """
+    if name == "memory":
+        return InMemoryBackend()
+    if name == "redis":
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError(
+                "RATE_LIMIT_BACKEND=redis requires the 'redis' package"
+            )
+        return RedisBackend(redis.Redis.from_url(RATE_LIMIT_REDIS_URL))
+    raise ValueError(f"Unknown rate limit backend: {name}")
+
+
+def client_key(request: Request) -> str:
+    """
+    Identifies the client of a request: by API key when one is sent (only a
+    hash of it is used), otherwise by IP address.
+    """
+    api_key = request.headers.get("x-api-key")
+    if api_key:
+        return "key:" + hashlib.sha256(api_key.encode()).hexdigest()[:32]
+    host = request.client.host if request.client else "unknown"
+    return f"ip:{host}"
+
+
+class RateLimiter:
+    def __init__(self, backend=None, enabled: bool = RATE_LIMIT_ENABLED):
+        """
+        FastAPI dependency enforcing per-client token-bucket limits and
+        concurrency quotas.
+
+        Every request takes its route's cost from two buckets of the client:
+        one shared by all routes and one for the route itself, or from
+        neither when one of them is empty. A request
+        also holds one of the client's concurrency slots until its response
+        is sent. Rejected requests get a 429 with Retry-After.
+
+        Args:
+            backend: The storage for buckets and counters (see
+            InMemoryBackend and RedisBackend). Defaults to the configured one.
+            enabled (bool): Whether limits are enforced.
+        """
+        self.backend = backend if backend is not None else create_backend()
+        self.enabled = enabled
+
+    @staticmethod
+    def route_cost(request: Request) -> int:
+        route = request.scope.get("route")
+        openapi_extra = getattr(route, "openapi_extra", None) or {}
+        return openapi_extra.get(RATE_LIMIT_COST_KEY, DEFAULT_COST)
+
+    def check(self, request: Request) -> str | None:
+        """
+        Takes the cost of a request from the client's budgets and a
+        concurrency slot.
+
+        Returns:
+            str | None: The key of the concurrency slot taken, to be
+            released, or None if the request is not limited.
+
+        Raises:
+            HTTPException: 429 if a budget or the concurrency quota is
+            exhausted.
+        """
+        cost = self.route_cost(request)
+        if not self.enabled or cost <= 0:
+            return None
+        client = client_key(request)
+        route = getattr(request.scope.get("route"), "path", request.url.path)
+        wait = self.backend.consume(
+            [
+                (client, RATE_LIMIT_CAPACITY, RATE_LIMIT_REFILL_RATE),
+                (
+                    f"{client}:{request.method}:{route}",
+                    RATE_LIMIT_ROUTE_CAPACITY,
+                    RATE_LIMIT_ROUTE_REFILL_RATE
+                )
+            ],
+            cost
+        )
+        if wait > 0:
+            raise HTTPException(
+                status_code=429,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(math.ceil(wait))}
+            )
+        if not self.backend.acquire(client, RATE_LIMIT_MAX_CONCURRENCY):
+            raise HTTPException(
+                status_code=429,
+                detail="Too many concurrent requests",
+                headers={"Retry-After": "1"}
+            )
+        return client
+
+    def __call__(self, request: Request) -> Iterator[None]:
+        slot = self.check(request)
+        try:
+            yield
+        finally:
+            if slot is not None:
+                self.backend.release(slot)
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,58 @@
+import logging
+import threading
+
+from typing import Callable
+
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    def __init__(self, name: str, interval: float, func: Callable[[], object]):
+        """
+        Runs a function periodically in a daemon thread, off the request path.
+
+        Args:
+            name (str): A name for the task, used for the thread and logs.
+            interval (float): Seconds to wait between two runs.
+            func (Callable[[], object]): The function to run. Exceptions are
+            logged and do not stop the task.
+        """
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.func()
+            except Exception:
+                logger.exception("Periodic task %s failed", self.name)
+
+    def start(self) -> None:
+        """
+        Starts the task. Does nothing if it is already running.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=self.name,
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """
+        Stops the task, waiting for an ongoing run to finish.
+
+        Args:
+            timeout (float | None): Maximum seconds to wait for the thread.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
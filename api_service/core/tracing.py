@@ -0,0 +1,293 @@
+import contextlib
+import functools
+import inspect
+import os
+import threading
+
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Any, Callable, ContextManager, Dict, TypeVar
+
+from core.logging import request_id
+
+try:
+    from opentelemetry import propagate, trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import (
+        BatchSpanProcessor,
+        SpanExportResult
+    )
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:  # OpenTelemetry is optional: tracing needs it.
+    trace = None
+
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+# Fraction of the traces recorded. Requests coming with a sampled W3C
+# `traceparent` are always recorded, so a trace is never cut in pieces.
+TRACING_SAMPLE_RATE = float(os.getenv("TRACING_SAMPLE_RATE", "0.1"))
+# "otlp" sends spans to a collector over HTTP (set
+# OTEL_EXPORTER_OTLP_ENDPOINT, default http://localhost:4318; requires the
+# opentelemetry-exporter-otlp-proto-http package). "file" appends them to
+# TRACING_FILE_PATH, one JSON object per line.
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "otlp")
+TRACING_FILE_PATH = os.getenv("TRACING_FILE_PATH", "traces.jsonl")
+TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "project-api")
+# Characters of a statement recorded at most. Parameters are never recorded.
+TRACING_SQL_MAX_LENGTH = int(os.getenv("TRACING_SQL_MAX_LENGTH", "2000"))
+
+T = TypeVar("T")
+
+_tracer = trace.get_tracer("api_service") if trace is not None else None
+_provider = None
+
+
+class FileSpanExporter:
+    def __init__(self, path: str) -> None:
+        """
+        Appends finished spans to a file, one JSON object per line, for
+        environments without a collector.
+
+        Args:
+            path (str): The file written to.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans) -> "SpanExportResult":
+        lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+        with self._lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(lines)
+        return SpanExportResult.SUCCESS
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+    def shutdown(self) -> None:
+        pass
+
+
+def create_exporter(name: str = TRACING_EXPORTER):
+    """
+    Creates the span exporter selected by configuration.
+
+    Args:
+        name (str): "otlp" or "file".
+
+    Returns:
+        The exporter instance.
+    """
+    if name == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+                OTLPSpanExporter
+            )
+        except ImportError:
+            raise RuntimeError(
+                "TRACING_EXPORTER=otlp requires the "
+                "'opentelemetry-exporter-otlp-proto-http' package"
+            )
+        return OTLPSpanExporter()
+    if name == "file":
+        return FileSpanExporter(TRACING_FILE_PATH)
+    raise ValueError(f"Unknown tracing exporter: {name}")
+
+
+def configure_tracing() -> None:
+    """
+    Starts recording traces, if TRACING_ENABLED. Spans are exported in
+    batches from a background thread. Does nothing if tracing is already
+    configured.
+    """
+    global _provider
+    if not TRACING_ENABLED or _provider is not None:
+        return
+    if trace is None:
+        raise RuntimeError(
+            "TRACING_ENABLED requires the 'opentelemetry-sdk' package"
+        )
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": TRACING_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(TRACING_SAMPLE_RATE))
+    )
+    _provider.add_span_processor(BatchSpanProcessor(create_exporter()))
+    trace.set_tracer_provider(_provider)
+
+
+def stop_tracing() -> None:
+    """
+    Exports the spans still buffered and stops the exporter thread.
+    """
+    global _provider
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+
+
+def start_span(
+    name: str,
+    attributes: Dict[str, Any] | None = None
+) -> ContextManager:
+    """
+    Runs a block in a span, which starts a new trace if there is no
+    current one (e.g. for a job run by the worker).
+
+        with start_span("job export", {"job.id": job.id}):
+            ...
+
+    Args:
+        name (str): The name of the span.
+        attributes (Dict[str, Any] | None): Attributes set on the span.
+    """
+    if not TRACING_ENABLED or _tracer is None:
+        return contextlib.nullcontext()
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+
+def _traced_function(name: str, func: Callable) -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # Only sampled traces get spans: elsewhere a call costs one lookup.
+        if not trace.get_current_span().is_recording():
+            return func(*args, **kwargs)
+        with _tracer.start_as_current_span(name):
+            return func(*args, **kwargs)
+
+    wrapper.__traced__ = True
+    return wrapper
+
+
+def traced(cls: T) -> T:
+    """
+    Class decorator running each public method of a class in a span named
+    after the class and the method (e.g. `ProjectService.create_project`),
+    as a child of the current span. Methods only get spans within sampled
+    traces, and the class is left untouched when tracing is disabled.
+
+    Args:
+        cls: The class (a service or a repository).
+    """
+    if not TRACING_ENABLED or trace is None:
+        return cls
+    for name, member in list(vars(cls).items()):
+        if (
+            name.startswith("_")
+            or not inspect.isfunction(member)
+            or getattr(member, "__traced__", False)
+        ):
+            continue
+        setattr(cls, name, _traced_function(f"{cls.__name__}.{name}", member))
+    return cls
+
+
+def instrument_engine(engine) -> None:
+    """
+    Records every SQL statement run within a sampled trace as a span: the
+    operation, the statement (without its parameters) and the number of
+    rows returned or affected, when the driver reports it.
+
+    Args:
+        engine: The SQLAlchemy engine.
+    """
+    if not TRACING_ENABLED or trace is None:
+        return
+    system = engine.dialect.name
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_statement_span(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        span = None
+        if trace.get_current_span().is_recording():
+            operation = (statement.split(None, 1) or ["SQL"])[0].upper()
+            span = _tracer.start_span(
+                operation,
+                kind=SpanKind.CLIENT,
+                attributes={
+                    "db.system": system,
+                    "db.operation": operation,
+                    "db.statement": statement[:TRACING_SQL_MAX_LENGTH],
+                    "db.executemany": executemany
+                }
+            )
+        conn.info.setdefault("trace_spans", []).append(span)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end_statement_span(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        span = conn.info["trace_spans"].pop()
+        if span is None:
+            return
+        if cursor.rowcount >= 0:
+            span.set_attribute("db.row_count", cursor.rowcount)
+        span.end()
+
+    @event.listens_for(engine, "handle_error")
+    def _fail_statement_span(context):
+        spans = (
+            context.connection.info.get("trace_spans")
+            if context.connection is not None else None
+        )
+        span = spans.pop() if spans else None
+        if span is None:
+            return
+        span.record_exception(context.original_exception)
+        span.set_status(Status(StatusCode.ERROR))
+        span.end()
+
+
+class TracingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Runs each request in a server span named after its route (e.g.
+        `GET /project/{project_id}`), continuing the trace of the caller
+        when the request carries a W3C `traceparent` header. Service,
+        repository and SQL spans are its children.
+
+        Args:
+            app (ASGIApp): The application to wrap.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        carrier = {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in scope["headers"]
+        }
+        method = scope["method"]
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with _tracer.start_as_current_span(
+            method,
+            context=propagate.extract(carrier),
+            kind=SpanKind.SERVER,
+            attributes={
+                "http.request.method": method,
+                "url.path": scope["path"]
+            }
+        ) as span:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                if span.is_recording():
+                    route = scope.get("route")
+                    if route is not None:
+                        span.update_name(f"{method} {route.path}")
+                        span.set_attribute("http.route", route.path)
+                    span.set_attribute("http.response.status_code", status)
+                    if request_id.get():
+                        span.set_attribute("request.id", request_id.get())
+                    if status >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
@@ -0,0 +1,3 @@
+from jobs.base import HANDLERS, JobContext, JobHandler, job_handler
+# Importing the handlers registers them.
+from jobs import handlers
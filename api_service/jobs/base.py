@@ -0,0 +1,99 @@
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass
+from pydantic import BaseModel
+from sqlmodel import Session
+from typing import Any, Callable, Dict, Optional, Type
+
+from models.job import Job
+
+
+class JobContext:
+    def __init__(
+        self,
+        session: Session,
+        job: Job,
+        executor: Executor | None = None,
+        batch_size: int = 500
+    ) -> None:
+        """
+        What a job handler gets to do its work: a session, the job being run
+        and a process pool for CPU-bound steps.
+
+        Handlers work in batches of `batch_size` items and call
+        `checkpoint()` after each one, which commits the batch together with
+        the job's progress. A batch is therefore the most work a failure can
+        lose, and the progress polled by clients always matches what has
+        been committed.
+
+        Args:
+            session (Session): The worker's session.
+            job (Job): The job being run.
+            executor (Executor | None): The pool CPU-bound steps run in. When
+            None they run in the worker process.
+            batch_size (int): The number of items handled per transaction.
+        """
+        self.session = session
+        self.job = job
+        self.executor = executor
+        self.batch_size = batch_size
+
+    def set_total(self, total: int) -> None:
+        """
+        Records the number of items the job will go through.
+        """
+        self.job.total = total
+        self.session.add(self.job)
+
+    def checkpoint(self, done: int) -> None:
+        """
+        Commits the current batch and advances the job's progress by `done`
+        items. It also tells other workers the job is still alive.
+        """
+        self.job.progress += done
+        self.session.add(self.job)
+        self.session.commit()
+
+    def submit(self, func: Callable, *args) -> Future:
+        """
+        Runs a CPU-bound function in the process pool, so the worker can keep
+        querying the database meanwhile. The function and its arguments must
+        be picklable (e.g. a module-level function given plain tuples).
+
+        Returns:
+            Future: The future result of the call.
+        """
+        if self.executor is None:
+            future = Future()
+            try:
+                future.set_result(func(*args))
+            except Exception as error:
+                future.set_exception(error)
+            return future
+        return self.executor.submit(func, *args)
+
+
+@dataclass(frozen=True)
+class JobHandler:
+    func: Callable[[JobContext, BaseModel], Optional[Dict[str, Any]]]
+    payload_model: Type[BaseModel]
+
+
+HANDLERS: Dict[str, JobHandler] = {}
+
+
+def job_handler(name: str, payload_model: Type[BaseModel]):
+    """
+    Registers a function as the handler of a job type.
+
+    The handler is called with a JobContext and the job's payload, validated
+    with `payload_model` (payloads are also validated when jobs are
+    enqueued). It returns the job's result, stored as JSON.
+
+    Args:
+        name (str): The job type, as given when enqueuing.
+        payload_model (Type[BaseModel]): The model of the job's payload.
+    """
+    def register(func):
+        HANDLERS[name] = JobHandler(func=func, payload_model=payload_model)
+        return func
+    return register
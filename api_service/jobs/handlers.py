@@ -0,0 +1,231 @@
+import csv
+import io
+import os
+
+from datetime import timedelta
+from pydantic import BaseModel, Field
+from sqlmodel import func, select
+from typing import Any, Dict, List, Optional
+
+from core import audit
+from jobs.base import JobContext, job_handler
+from models.audit import AuditAction, AuditEntity
+from models.project import Project
+from repositories.project import ProjectRepository, UserProjectRepository
+from repositories.summary import ProjectSummaryRepository
+from repositories.user import UserRepository
+from services.exceptions import NotFoundError
+from services.purge import PurgeService, SOFT_DELETE_RETENTION_DAYS
+
+
+JOB_EXPORT_DIR = os.getenv("JOB_EXPORT_DIR", "exports")
+
+EXPORT_COLUMNS = (
+    "id", "name", "description", "status", "begin_date", "end_date",
+    "updated_at", "deleted_at", "user_ids"
+)
+
+
+class PurgeTombstonesPayload(BaseModel):
+    retention_days: int = Field(default=SOFT_DELETE_RETENTION_DAYS, ge=0)
+
+
+@job_handler("purge_tombstones", PurgeTombstonesPayload)
+def purge_tombstones(
+    context: JobContext,
+    payload: PurgeTombstonesPayload
+) -> Dict[str, Any]:
+    """
+    Purges old tombstones on demand, in the job's batch size. Each batch is
+    a checkpoint, so a long purge is never taken for a stale job.
+    """
+    purged = PurgeService(session=context.session).purge_tombstones(
+        retention=timedelta(days=payload.retention_days),
+        batch_size=context.batch_size,
+        commit=context.checkpoint
+    )
+    return {"purged": purged}
+
+
+class AddUsersToProjectPayload(BaseModel):
+    project_id: int
+    user_ids: List[int] = Field(min_length=1)
+
+
+@job_handler("add_users_to_project", AddUsersToProjectPayload)
+def add_users_to_project(
+    context: JobContext,
+    payload: AddUsersToProjectPayload
+) -> Dict[str, Any]:
+    """
+    Adds any number of users to a project, one batch of users per
+    transaction. Users that are already members, even ones added while the
+    job runs, are skipped and users that don't exist are reported in the
+    result.
+    """
+    session = context.session
+    project_repo = ProjectRepository(session=session)
+    project = project_repo.get_by_id(id=payload.project_id)
+    if project is None:
+        raise NotFoundError("Project", [payload.project_id])
+    user_repo = UserRepository(session=session)
+    user_project_repo = UserProjectRepository(session=session)
+    summary_repo = ProjectSummaryRepository(session=session)
+    user_ids = list(dict.fromkeys(payload.user_ids))
+    context.set_total(len(user_ids))
+
+    added = 0
+    missing_ids = []
+    for start in range(0, len(user_ids), context.batch_size):
+        batch = user_ids[start:start + context.batch_size]
+        found_ids = {user.id for user in user_repo.get_many(ids=batch)}
+        missing_ids.extend(id for id in batch if id not in found_ids)
+        new_ids = user_project_repo.add_many(
+            user_ids=[id for id in batch if id in found_ids],
+            project_id=project.id
+        )
+        if new_ids:
+            project_repo.touch(project)
+            summary_repo.refresh([project.id])
+            for id in new_ids:
+                audit.record(
+                    session, AuditEntity.PROJECT, project.id,
+                    AuditAction.ADD_MEMBER, audit.diff({}, {"user_id": id})
+                )
+            added += len(new_ids)
+        context.checkpoint(len(batch))
+    return {
+        "added": added,
+        "already_members": len(user_ids) - added - len(missing_ids),
+        "missing_ids": missing_ids
+    }
+
+
+class RefreshProjectSummariesPayload(BaseModel):
+    pass
+
+
+@job_handler("refresh_project_summaries", RefreshProjectSummariesPayload)
+def refresh_project_summaries(
+    context: JobContext,
+    payload: RefreshProjectSummariesPayload
+) -> Dict[str, Any]:
+    """
+    Rebuilds the summaries of every project, one keyset-paginated batch of
+    projects per transaction. Writes keep the summaries current; this
+    backfills them (e.g. after an upgrade or a bulk import) and repairs
+    any drift.
+    """
+    session = context.session
+    summary_repo = ProjectSummaryRepository(session=session)
+    context.set_total(session.exec(select(func.count(Project.id))).one())
+    refreshed = 0
+    last_id = 0
+    while True:
+        project_ids = summary_repo.get_project_ids_after(
+            after_id=last_id,
+            limit=context.batch_size
+        )
+        if not project_ids:
+            break
+        summary_repo.refresh(project_ids)
+        context.checkpoint(len(project_ids))
+        refreshed += len(project_ids)
+        last_id = project_ids[-1]
+    return {"refreshed": refreshed}
+
+
+def format_csv_rows(rows: List[tuple]) -> str:
+    """
+    Formats rows as CSV. It runs in the process pool.
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+class ExportProjectsPayload(BaseModel):
+    include_deleted: bool = False
+    filename: Optional[str] = Field(
+        default=None,
+        pattern=r"^[\w.-]+\.csv$"
+    )
+
+
+@job_handler("export_projects", ExportProjectsPayload)
+def export_projects(
+    context: JobContext,
+    payload: ExportProjectsPayload
+) -> Dict[str, Any]:
+    """
+    Exports the projects and their members to a CSV file in JOB_EXPORT_DIR.
+
+    Projects are read in keyset-paginated batches. Each batch is formatted
+    in the process pool while the next one is read from the database.
+    Plain columns are read rather than entities: each checkpoint commits,
+    which would expire the entities of the batch read meanwhile and reload
+    them one by one.
+    """
+    session = context.session
+    member_repo = UserProjectRepository(session=session)
+    statement = (
+        select(
+            Project.id,
+            Project.name,
+            Project.description,
+            Project.status,
+            Project.begin_date,
+            Project.end_date,
+            Project.updated_at,
+            Project.deleted_at
+        )
+        .order_by(Project.id)
+        .limit(context.batch_size)
+    )
+    count = select(func.count()).select_from(Project)
+    if not payload.include_deleted:
+        statement = statement.where(Project.deleted_at.is_(None))
+        count = count.where(Project.deleted_at.is_(None))
+    context.set_total(session.exec(count).one())
+
+    os.makedirs(JOB_EXPORT_DIR, exist_ok=True)
+    filename = payload.filename or f"projects-{context.job.id}.csv"
+    path = os.path.join(JOB_EXPORT_DIR, filename)
+    rows = 0
+    last_id = 0
+    pending = None
+    with open(f"{path}.part", "w", newline="") as file:
+        csv.writer(file).writerow(EXPORT_COLUMNS)
+        while True:
+            projects = session.exec(
+                statement.where(Project.id > last_id)
+            ).all()
+            if pending is not None:
+                future, size = pending
+                file.write(future.result())
+                context.checkpoint(size)
+                pending = None
+            if not projects:
+                break
+            members = member_repo.get_user_ids_by_project_ids(
+                [project.id for project in projects]
+            )
+            batch = [
+                (
+                    project.id,
+                    project.name,
+                    project.description,
+                    project.status.value if project.status else None,
+                    project.begin_date.isoformat() if project.begin_date else None,
+                    project.end_date.isoformat() if project.end_date else None,
+                    project.updated_at.isoformat(),
+                    project.deleted_at.isoformat() if project.deleted_at else None,
+                    ";".join(map(str, sorted(members[project.id])))
+                )
+                for project in projects
+            ]
+            pending = (context.submit(format_csv_rows, batch), len(batch))
+            rows += len(batch)
+            last_id = projects[-1].id
+    os.replace(f"{path}.part", path)
+    return {"path": path, "rows": rows}
@@ -1,27 +1,114 @@
-from fastapi import FastAPI
+import os
 
-from core.db import create_db_and_tables
-from routers import role, user, project
+from datetime import datetime, timezone
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
+from sqlmodel import Session
+
+from core.audit import AuditActorMiddleware, audit_writer
+from core.compression import COMPRESSION_ENABLED, CompressionMiddleware
+from core.db import create_db_and_tables, engine
+from core.logging import RequestLoggingMiddleware, configure_logging, stop_logging
+from core.metrics import registry
+from core.ratelimit import RATE_LIMIT_COST_KEY, rate_limiter
+from core.scheduler import PeriodicTask
+from core.tracing import (
+    TRACING_ENABLED,
+    TracingMiddleware,
+    configure_tracing,
+    stop_tracing
+)
+from routers import role, user, project, search, job, audit
+from services.audit import AuditService
+from services.purge import PurgeService
+
+
+PURGE_INTERVAL_SECONDS = int(os.getenv("PURGE_INTERVAL_SECONDS", "3600"))
+# Seconds between two runs of the audit log partition maintenance (0 only
+# runs it at startup).
+AUDIT_MAINTENANCE_INTERVAL_SECONDS = int(
+    os.getenv("AUDIT_MAINTENANCE_INTERVAL_SECONDS", "86400")
+)
+# Whether the tables and audit log partitions are already set up, so
+# processes skip it at startup. serve.py sets it for the processes it runs
+# once it has set them up itself.
+SCHEMA_READY = os.getenv("SCHEMA_READY", "false").lower() == "true"
 
 
 app = FastAPI(
     title="Project Managment API",
     description="API for Project Management",
-    version="1.0.0"
+    version="1.0.0",
+    dependencies=[Depends(rate_limiter)]
 )
 
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+app.add_middleware(AuditActorMiddleware)
+if TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+# Outermost, so the logged duration covers the whole request.
+app.add_middleware(RequestLoggingMiddleware)
+
 
 app.include_router(project.router)
 app.include_router(role.router)
 app.include_router(user.router)
+app.include_router(search.router)
+app.include_router(job.router)
+app.include_router(audit.router)
+
+
+def purge_tombstones() -> None:
+    with Session(engine) as session:
+        PurgeService(session=session).purge_tombstones()
+
+
+purge_task = PeriodicTask(
+    name="purge-tombstones",
+    interval=PURGE_INTERVAL_SECONDS,
+    func=purge_tombstones
+)
+
+
+def maintain_audit_partitions() -> None:
+    with Session(engine) as session:
+        AuditService(session=session).maintain_partitions(
+            today=datetime.now(timezone.utc).date()
+        )
+
+
+audit_maintenance_task = PeriodicTask(
+    name="audit-partitions",
+    interval=AUDIT_MAINTENANCE_INTERVAL_SECONDS,
+    func=maintain_audit_partitions
+)
 
 
 @app.on_event("startup")
 def on_startup():
-    create_db_and_tables()
+    configure_logging()
+    configure_tracing()
+    if not SCHEMA_READY:
+        create_db_and_tables()
+        maintain_audit_partitions()
+    audit_writer.start()
+    if PURGE_INTERVAL_SECONDS > 0:
+        purge_task.start()
+    if AUDIT_MAINTENANCE_INTERVAL_SECONDS > 0:
+        audit_maintenance_task.start()
+
 
+@app.on_event("shutdown")
+def on_shutdown():
+    purge_task.stop()
+    audit_maintenance_task.stop()
+    audit_writer.stop()
+    stop_tracing()
+    stop_logging()
 
-@app.get("/info", tags=["API"])
+
+@app.get("/info", tags=["API"], openapi_extra={RATE_LIMIT_COST_KEY: 0})
 def get_info():
     return {
         "name": "Project Management API",
@@ -30,9 +117,26 @@ def get_info():
     }
 
 
-@app.get("/healthcheck", tags=["API"])
+@app.get(
+    "/healthcheck",
+    tags=["API"],
+    openapi_extra={RATE_LIMIT_COST_KEY: 0}
+)
 def healthcheck():
     return {
         "status": "ok",
         "message": "API is running"
     }
+
+
+@app.get(
+    "/metrics",
+    tags=["API"],
+    response_class=PlainTextResponse,
+    openapi_extra={RATE_LIMIT_COST_KEY: 0}
+)
+def metrics():
+    """
+    Operational metrics in the Prometheus text exposition format.
+    """
+    return registry.render()
@@ -0,0 +1,160 @@
+import enum
+
+from pydantic import BaseModel
+from sqlalchemy import (
+    BigInteger,
+    DDL,
+    DateTime,
+    Enum as SQLAlchemyEnum,
+    Index,
+    Integer,
+    JSON,
+    event
+)
+from sqlmodel import Field, SQLModel
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from core.db import DATABASE_BACKEND
+
+
+class AuditEntity(str, enum.Enum):
+    PROJECT = "project"
+    USER = "user"
+    ROLE = "role"
+
+
+class AuditAction(str, enum.Enum):
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+    ADD_MEMBER = "add_member"
+    REMOVE_MEMBER = "remove_member"
+
+
+# On Postgres the log is partitioned by month of `occurred_at` (see
+# repositories/audit.py), and the partition key must be part of the primary
+# key of a partitioned table. SQLite keeps a plain table, whose single
+# integer primary key is its rowid.
+AUDIT_PARTITIONED = DATABASE_BACKEND == "postgresql"
+
+
+class AuditEntry(SQLModel, table=True):
+    """
+    One change to a project, user or role, as recorded by the services.
+    Rows are only ever inserted: updates and deletes are rejected by a
+    trigger, and old entries go away with their whole partition.
+    """
+    __tablename__ = "audit_log"
+    __table_args__ = (
+        Index(
+            "ix_audit_log_entity",
+            "entity",
+            "entity_id",
+            "occurred_at"
+        ),
+        {
+            "postgresql_partition_by": "RANGE (occurred_at)",
+            "extend_existing": True
+        }
+    )
+
+    id: int | None = Field(
+        default=None,
+        primary_key=True,
+        sa_type=BigInteger().with_variant(Integer, "sqlite"),
+        sa_column_kwargs={"autoincrement": True}
+    )
+    occurred_at: datetime = Field(
+        primary_key=AUDIT_PARTITIONED,
+        index=True,
+        sa_type=DateTime(timezone=True)
+    )
+    # Who made the change: the hashed API key or the IP address of the
+    # client (see core.ratelimit.client_key), or None for background work.
+    actor: Optional[str] = Field(default=None, index=True)
+    entity: AuditEntity = Field(
+        sa_type=SQLAlchemyEnum(AuditEntity, native_enum=False, length=16)
+    )
+    entity_id: int
+    action: AuditAction = Field(
+        sa_type=SQLAlchemyEnum(AuditAction, native_enum=False, length=16)
+    )
+    # The fields changed, as {"field": {"old": ..., "new": ...}}.
+    changes: Dict[str, Any] = Field(default_factory=dict, sa_type=JSON)
+
+
+# Append-only: the log is written by the audit writer and never modified.
+event.listen(
+    AuditEntry.__table__,
+    "after_create",
+    DDL(
+        "CREATE OR REPLACE FUNCTION audit_log_append_only() "
+        "RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN "
+        "RAISE EXCEPTION 'audit_log is append-only'; "
+        "END $$"
+    ).execute_if(dialect="postgresql")
+)
+event.listen(
+    AuditEntry.__table__,
+    "after_create",
+    DDL(
+        "CREATE TRIGGER audit_log_append_only "
+        "BEFORE UPDATE OR DELETE ON audit_log "
+        "FOR EACH ROW EXECUTE FUNCTION audit_log_append_only()"
+    ).execute_if(dialect="postgresql")
+)
+# Rows outside of every monthly partition land here rather than failing.
+event.listen(
+    AuditEntry.__table__,
+    "after_create",
+    DDL(
+        "CREATE TABLE audit_log_default PARTITION OF audit_log DEFAULT"
+    ).execute_if(dialect="postgresql")
+)
+for operation in ("UPDATE", "DELETE"):
+    event.listen(
+        AuditEntry.__table__,
+        "after_create",
+        DDL(
+            f"CREATE TRIGGER audit_log_no_{operation.lower()} "
+            f"BEFORE {operation} ON audit_log "
+            "BEGIN SELECT RAISE(ABORT, 'audit_log is append-only'); END"
+        ).execute_if(dialect="sqlite")
+    )
+
+
+class AuditEntryPublic(BaseModel):
+    id: int
+    occurred_at: datetime
+    actor: Optional[str] = None
+    entity: AuditEntity
+    entity_id: int
+    action: AuditAction
+    changes: Dict[str, Any]
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "id": 1042,
+                    "occurred_at": "2024-03-01T17:05:12+00:00",
+                    "actor": "ip:203.0.113.7",
+                    "entity": "project",
+                    "entity_id": 1,
+                    "action": "update",
+                    "changes": {
+                        "status": {"old": "Planning", "new": "In Progress"}
+                    }
+                }
+            ]
+        },
+        "from_attributes": True
+    }
+
+
+class AuditPage(BaseModel):
+    entries: List[AuditEntryPublic]
+    # Pass it as `cursor` to get the next (older) page; None on the last
+    # page.
+    next_cursor: Optional[str] = None
@@ -0,0 +1,168 @@
+from sqlalchemy import DDL, DateTime, Index, event, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import func
+from sqlalchemy.schema import CreateColumn, CreateIndex
+from sqlalchemy.sql.functions import FunctionElement
+from sqlmodel import Field, SQLModel
+from datetime import datetime
+from typing import Iterable, Optional
+
+
+class write_time(FunctionElement):
+    """
+    The time of the statement writing a row, for `updated_at` and
+    `deleted_at`.
+
+    On Postgres `now()` is the start of the transaction, so a row written
+    late in a long transaction would get a timestamp older than rows
+    committed meanwhile, and sync clients reading `updated_since` from the
+    newest timestamp they saw would skip it. `clock_timestamp()` is read
+    when the row is written instead.
+
+    SQLite's CURRENT_TIMESTAMP only has seconds, and its text sorts before
+    the same time bound by a query (which has microseconds), so a row
+    stamped in the cursor's second was skipped: SQLite gets the time in the
+    format SQLAlchemy binds instead.
+    """
+    type = DateTime(timezone=True)
+    name = "write_time"
+    inherit_cache = True
+
+
+@compiles(write_time)
+def _write_time(element, compiler, **kwargs) -> str:
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(write_time, "sqlite")
+def _write_time_sqlite(element, compiler, **kwargs) -> str:
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
+@compiles(write_time, "postgresql")
+def _write_time_postgresql(element, compiler, **kwargs) -> str:
+    return "clock_timestamp()"
+
+
+class UpdatedAtMixin(SQLModel):
+    # Set by every insert and update, including on tables created with an
+    # older server default.
+    updated_at: Optional[datetime] = Field(
+        default=None,
+        nullable=False,
+        index=True,
+        sa_type=DateTime(timezone=True),
+        sa_column_kwargs={
+            "default": write_time(),
+            "server_default": write_time(),
+            "onupdate": write_time()
+        }
+    )
+
+
+class TimestampMixin(UpdatedAtMixin):
+    created_at: Optional[datetime] = Field(
+        default=None,
+        nullable=False,
+        sa_type=DateTime(timezone=True),
+        sa_column_kwargs={"server_default": func.now()}
+    )
+
+
+class SoftDeleteMixin(SQLModel):
+    deleted_at: Optional[datetime] = Field(
+        default=None,
+        sa_type=DateTime(timezone=True)
+    )
+
+
+def soft_delete_indexes(table_name: str) -> tuple[Index, Index]:
+    """
+    Builds the partial indexes used by soft-deletable tables.
+
+    Live-row queries (the default for every read) only scan the index over
+    rows without a tombstone, and the purge job only scans the index over
+    tombstones, so neither pays for the other.
+
+    Args:
+        table_name (str): The name of the table the indexes belong to.
+
+    Returns:
+        tuple[Index, Index]: The live-rows and tombstones indexes.
+    """
+    return (
+        Index(
+            f"ix_{table_name}_live_updated_at",
+            "updated_at",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL")
+        ),
+        Index(
+            f"ix_{table_name}_tombstones",
+            "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+            sqlite_where=text("deleted_at IS NOT NULL")
+        )
+    )
+
+
+# Postgres DDL run at startup, in order (see postgres_ddl): the schema the
+# models can't declare (generated columns, GIN and GiST indexes) and the
+# columns and indexes added since a table was first released.
+schema_upgrades: list[DDL] = []
+
+
+def postgres_ddl(table, statement: str) -> None:
+    """
+    Adds Postgres-only DDL to a table. It runs when the table is created,
+    and again at startup (see core.db.create_db_and_tables) so databases
+    created by an older version get it too: the statement must be
+    idempotent (`ADD COLUMN IF NOT EXISTS`, `CREATE INDEX IF NOT EXISTS`).
+
+    Args:
+        table: The table the statement belongs to.
+        statement (str): The DDL statement.
+    """
+    ddl = DDL(statement)
+    event.listen(table, "after_create", ddl.execute_if(dialect="postgresql"))
+    schema_upgrades.append(ddl)
+
+
+def postgres_upgrade(
+    table,
+    columns: Iterable[str] = (),
+    indexes: Iterable[str] = ()
+) -> None:
+    """
+    Adds columns and indexes of a model to tables created before they
+    existed, with `ADD COLUMN IF NOT EXISTS` and `CREATE INDEX IF NOT
+    EXISTS` statements built from the model (see postgres_ddl). Call it
+    before any DDL of the table that depends on them.
+
+    Args:
+        table: The table.
+        columns (Iterable[str]): The names of the columns added, with their
+        foreign keys.
+        indexes (Iterable[str]): The names of the indexes added.
+    """
+    dialect = postgresql.dialect()
+    preparer = dialect.identifier_preparer
+    name = preparer.format_table(table)
+    for column in columns:
+        column = table.c[column]
+        definition = str(CreateColumn(column).compile(dialect=dialect))
+        for foreign_key in column.foreign_keys:
+            definition += (
+                f" REFERENCES {preparer.format_table(foreign_key.column.table)}"
+                f" ({preparer.quote(foreign_key.column.name)})"
+            )
+        postgres_ddl(
+            table, f"ALTER TABLE {name} ADD COLUMN IF NOT EXISTS {definition}"
+        )
+    by_name = {index.name: index for index in table.indexes}
+    for index in indexes:
+        postgres_ddl(table, str(
+            CreateIndex(by_name[index], if_not_exists=True)
+            .compile(dialect=dialect)
+        ))
@@ -0,0 +1,115 @@
+import enum
+
+from pydantic import BaseModel, Field as PydanticField
+from sqlalchemy import Column, DateTime, Enum as SQLAlchemyEnum, Index, JSON, text
+from sqlmodel import Field, SQLModel
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from models.base import TimestampMixin
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "Queued"
+    RUNNING = "Running"
+    SUCCEEDED = "Succeeded"
+    FAILED = "Failed"
+
+
+class JobBase(SQLModel):
+    type: str = Field(index=True)
+    payload: Dict[str, Any] = Field(default_factory=dict, sa_type=JSON)
+
+
+class Job(JobBase, TimestampMixin, table=True):
+    __tablename__ = "job"
+    __table_args__ = (
+        # The worker only ever looks for claimable jobs.
+        Index(
+            "ix_job_claimable",
+            "id",
+            postgresql_where=text("status IN ('QUEUED', 'RUNNING')"),
+            sqlite_where=text("status IN ('QUEUED', 'RUNNING')")
+        ),
+        {
+            'extend_existing': True
+        }
+    )
+    __mapper_args__ = {"eager_defaults": True}
+
+    id: int | None = Field(default=None, primary_key=True)
+    status: JobStatus = Field(
+        default=JobStatus.QUEUED,
+        sa_column=Column(SQLAlchemyEnum(JobStatus), nullable=False)
+    )
+    progress: int = Field(default=0)
+    total: Optional[int] = Field(default=None)
+    attempts: int = Field(default=0)
+    result: Optional[Dict[str, Any]] = Field(default=None, sa_type=JSON)
+    error: Optional[str] = Field(default=None)
+    started_at: Optional[datetime] = Field(
+        default=None,
+        sa_type=DateTime(timezone=True)
+    )
+    finished_at: Optional[datetime] = Field(
+        default=None,
+        sa_type=DateTime(timezone=True)
+    )
+
+
+class JobCreate(JobBase):
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "type": "add_users_to_project",
+                    "payload": {"project_id": 1, "user_ids": [1, 2, 3]}
+                },
+                {
+                    "type": "export_projects",
+                    "payload": {}
+                },
+                {
+                    "type": "purge_tombstones",
+                    "payload": {"retention_days": 30}
+                },
+                {
+                    "type": "refresh_project_summaries",
+                    "payload": {}
+                }
+            ]
+        }
+    }
+
+
+class JobPublic(BaseModel):
+    job_id: int = PydanticField(validation_alias="id")
+    type: str = PydanticField(validation_alias="type")
+    status: JobStatus = PydanticField(validation_alias="status")
+    progress: int = PydanticField(validation_alias="progress")
+    total: Optional[int] = PydanticField(validation_alias="total")
+    result: Optional[Dict[str, Any]] = PydanticField(validation_alias="result")
+    error: Optional[str] = PydanticField(validation_alias="error")
+    created_at: Optional[datetime] = PydanticField(validation_alias="created_at")
+    started_at: Optional[datetime] = PydanticField(validation_alias="started_at")
+    finished_at: Optional[datetime] = PydanticField(validation_alias="finished_at")
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "job_id": 1,
+                    "type": "add_users_to_project",
+                    "status": "Running",
+                    "progress": 500,
+                    "total": 2000,
+                    "result": None,
+                    "error": None,
+                    "created_at": "2024-01-15T09:00:00+00:00",
+                    "started_at": "2024-01-15T09:00:01+00:00",
+                    "finished_at": None
+                }
+            ]
+        },
+        "from_attributes": True
+    }
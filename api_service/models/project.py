@@ -1,11 +1,26 @@
 import enum
 
 from pydantic import BaseModel, computed_field, Field as PydanticField
-from sqlalchemy import Column, DateTime, Enum as SQLAlchemyEnum
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Enum as SQLAlchemyEnum,
+    Index,
+    String,
+    text
+)
 from sqlalchemy.sql import func
 from sqlmodel import Field, Relationship, SQLModel
 from datetime import datetime
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional
+
+from models.base import (
+    SoftDeleteMixin,
+    TimestampMixin,
+    postgres_ddl,
+    postgres_upgrade,
+    soft_delete_indexes
+)
 
 
 class ProjectStatus(str, enum.Enum):
@@ -16,16 +31,44 @@ class ProjectStatus(str, enum.Enum):
     CANCELLED = "Cancelled"
 
 
-class UserProject(SQLModel, table=True):
+# Materialized paths are compared byte-wise, so that the descendants of a
+# project are one range of the path index whatever the database collation.
+PATH_TYPE = String().with_variant(String(collation="C"), "postgresql")
+
+
+def subtree_prefix(path: str, id: int) -> str:
+    """
+    The path prefix shared by all the descendants of a project.
+
+    Args:
+        path (str): The materialized path of the project.
+        id (int): The ID of the project.
+    """
+    return f"{path}{id}/"
+
+
+class UserProject(TimestampMixin, table=True):
     __tablename__ = "user_project"
+    # Fetch server-generated values (timestamps) with RETURNING on flush.
+    __mapper_args__ = {"eager_defaults": True}
     user_id: int | None = Field(
         default=None, foreign_key="user.id", primary_key=True
     )
+    # The primary key leads with user_id; this index serves the lookups by
+    # project (members of projects, rollups of subtrees).
     project_id: int | None = Field(
-        default=None, foreign_key="project.id", primary_key=True
+        default=None, foreign_key="project.id", primary_key=True, index=True
     )
 
 
+# Databases created before the timestamps and the project index.
+postgres_upgrade(
+    UserProject.__table__,
+    columns=("created_at", "updated_at"),
+    indexes=("ix_user_project_updated_at", "ix_user_project_project_id")
+)
+
+
 class ProjectBase(SQLModel):
     name: str = Field(index=True)
     description: Optional[str] = None
@@ -37,16 +80,106 @@ class ProjectBase(SQLModel):
     end_date: Optional[datetime] = Field(default=None)
 
 
-class Project(ProjectBase, table=True):
+class Project(ProjectBase, TimestampMixin, SoftDeleteMixin, table=True):
     __tablename__ = "project"
-    __table_args__ = {'extend_existing': True}
+    # Fetch server-generated values (timestamps) with RETURNING on flush.
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        *soft_delete_indexes("project"),
+        Index(
+            "ix_project_live_path",
+            "path",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL")
+        ),
+        {
+            'extend_existing': True
+        }
+    )
 
     id: int | None = Field(default=None, primary_key=True)
+    # Projects form a hierarchy (programs, projects, sub-projects). `path`
+    # is the materialized path of the project: the IDs of its ancestors,
+    # root first ("/" for a top-level project, "/1/5/" for a child of
+    # project 5 under project 1). The descendants of a project are the
+    # projects whose path starts with subtree_prefix().
+    parent_id: Optional[int] = Field(
+        default=None,
+        foreign_key="project.id",
+        index=True
+    )
+    path: str = Field(
+        default="/",
+        sa_column=Column(PATH_TYPE, nullable=False, server_default="/")
+    )
+
+    users: List["User"] = Relationship(
+        back_populates="projects",
+        link_model=UserProject,
+        sa_relationship_kwargs={
+            "secondaryjoin": "and_(User.id == UserProject.user_id, "
+                             "User.deleted_at.is_(None))"
+        }
+    )
+
+
+# Databases created before the timestamps, soft deletes and the hierarchy.
+# Existing projects are top-level ones, which the default path describes.
+postgres_upgrade(
+    Project.__table__,
+    columns=("created_at", "updated_at", "deleted_at", "parent_id", "path"),
+    indexes=(
+        "ix_project_updated_at",
+        "ix_project_live_updated_at",
+        "ix_project_tombstones",
+        "ix_project_parent_id",
+        "ix_project_live_path"
+    )
+)
+
+
+# Full-text search vector over name (weight A) and description (weight B).
+# It is a generated column, so Postgres keeps it current on every write,
+# and it is deliberately not mapped: it never leaves the database.
+postgres_ddl(
+    Project.__table__,
+    "ALTER TABLE project ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+    ") STORED"
+)
+postgres_ddl(
+    Project.__table__,
+    "CREATE INDEX IF NOT EXISTS ix_project_search_vector ON project "
+    "USING gin (search_vector)"
+)
 
-    users: List["User"] = Relationship(back_populates="projects", link_model=UserProject)
+
+# Active period as a range, so "active during a window" and "overlapping
+# projects" are answered with the && operator through a GiST index. A
+# missing date leaves the range unbounded on that side; inconsistent dates
+# (end before begin) leave it NULL, so the project never matches.
+postgres_ddl(
+    Project.__table__,
+    "ALTER TABLE project ADD COLUMN IF NOT EXISTS period tsrange "
+    "GENERATED ALWAYS AS ("
+    "CASE WHEN begin_date IS NULL OR end_date IS NULL "
+    "OR begin_date <= end_date "
+    "THEN tsrange(begin_date, end_date, '[]') END"
+    ") STORED"
+)
+postgres_ddl(
+    Project.__table__,
+    "CREATE INDEX IF NOT EXISTS ix_project_period ON project "
+    "USING gist (period) WHERE deleted_at IS NULL"
+)
 
 
 class ProjectCreate(ProjectBase):
+    parent_id: Optional[int] = None
+    user_ids: Optional[List[int]] = None
+
     model_config = {
         "json_schema_extra": {
             "examples": [
@@ -55,7 +188,9 @@ class ProjectCreate(ProjectBase):
                     "description": "Develop the next big thing.",
                     "status": "Planning",
                     "begin_date": "2024-01-15T09:00:00Z",
-                    "end_date": "2024-12-20T17:00:00Z"
+                    "end_date": "2024-12-20T17:00:00Z",
+                    "parent_id": None,
+                    "user_ids": [1, 2]
                 }
             ]
         },
@@ -69,6 +204,7 @@ class ProjectUpdate(SQLModel):
     status: Optional[ProjectStatus] = None
     begin_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
+    parent_id: Optional[int] = None
 
     model_config = {
         "json_schema_extra": {
@@ -87,20 +223,40 @@ class ProjectPublic(BaseModel):
     name: str = PydanticField(validation_alias="name")
     description: Optional[str] = PydanticField(validation_alias="description")
     status: ProjectStatus = PydanticField(validation_alias="status")
+    parent_id: Optional[int] = PydanticField(
+        validation_alias="parent_id",
+        default=None
+    )
     begin_date_internal: Optional[datetime] = PydanticField(validation_alias="begin_date", exclude=True)
     end_date_internal: Optional[datetime] = PydanticField(validation_alias="end_date", exclude=True)
     users: List[Any] = PydanticField(validation_alias="users", default_factory=list)
+    updated_at: Optional[datetime] = PydanticField(
+        validation_alias="updated_at",
+        default=None
+    )
+    deleted_at: Optional[datetime] = PydanticField(
+        validation_alias="deleted_at",
+        default=None
+    )
 
-    @computed_field
+    # ISO 8601 strings, documented (and sent in MessagePack) as dates.
+    @computed_field(json_schema_extra={"format": "date-time"})
     @property
-    def begin_date(self) -> str:
-        """Returns the begin date as an ISO 8601 formatted string."""
+    def begin_date(self) -> str | None:
+        """Returns the begin date as an ISO 8601 formatted string, if any."""
+        if self.begin_date_internal is None:
+            return None
         return self.begin_date_internal.isoformat()
 
-    @computed_field
+    @computed_field(json_schema_extra={"format": "date-time"})
     @property
-    def end_date(self) -> str:
-        """Returns the end date as an ISO 8601 formatted string."""
+    def end_date(self) -> str | None:
+        """
+        Returns the end date as an ISO 8601 formatted string, or None for
+        an open-ended project.
+        """
+        if self.end_date_internal is None:
+            return None
         return self.end_date_internal.isoformat()
 
     model_config = {
@@ -113,8 +269,86 @@ class ProjectPublic(BaseModel):
                     "status": "Completed",
                     "begin_date": "2023-01-10T09:00:00",
                     "end_date": "2023-11-30T17:00:00",
+                    "parent_id": None,
+                    "updated_at": "2023-11-30T17:05:12+00:00"
                 }
             ]
         },
         "from_attributes": True
-    }
\ No newline at end of file
+    }
+
+class ProjectOverlap(BaseModel):
+    project_id: int
+    project_name: str
+    other_project_id: int
+    other_project_name: str
+    overlap_begin: Optional[datetime] = None
+    overlap_end: Optional[datetime] = None
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "project_id": 1,
+                    "project_name": "Existing Project Alpha",
+                    "other_project_id": 4,
+                    "other_project_name": "New Super App",
+                    "overlap_begin": "2024-01-15T09:00:00",
+                    "overlap_end": "2024-03-01T17:00:00"
+                }
+            ]
+        },
+        "from_attributes": True
+    }
+
+
+class ProjectNode(BaseModel):
+    project_id: int
+    parent_id: Optional[int] = None
+    name: str
+    status: ProjectStatus
+    depth: int
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "project_id": 12,
+                    "parent_id": 5,
+                    "name": "Mobile Checkout",
+                    "status": "In Progress",
+                    "depth": 2
+                }
+            ]
+        }
+    }
+
+
+class ProjectRollup(BaseModel):
+    project_id: int
+    sub_projects: int
+    members: int
+    projects_by_status: Dict[ProjectStatus, int]
+    begin_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "project_id": 5,
+                    "sub_projects": 14,
+                    "members": 37,
+                    "projects_by_status": {
+                        "Planning": 3,
+                        "In Progress": 9,
+                        "Completed": 2,
+                        "On Hold": 1,
+                        "Cancelled": 0
+                    },
+                    "begin_date": "2024-01-15T09:00:00",
+                    "end_date": "2025-06-30T17:00:00"
+                }
+            ]
+        }
+    }
@@ -1,8 +1,16 @@
 from pydantic import BaseModel, Field as PydanticField
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import Index, text
 from sqlmodel import Field, Relationship, SQLModel
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
+from models.base import (
+    SoftDeleteMixin,
+    TimestampMixin,
+    postgres_ddl,
+    postgres_upgrade,
+    soft_delete_indexes
+)
 from models.user import User
 
 
@@ -11,10 +19,20 @@ class RoleBase(SQLModel):
     description: str | None = None
 
 
-class Role(RoleBase, table=True):
+class Role(RoleBase, TimestampMixin, SoftDeleteMixin, table=True):
     __tablename__ = "role"
+    # Fetch server-generated values (timestamps) with RETURNING on flush.
+    __mapper_args__ = {"eager_defaults": True}
     __table_args__ = (
-        UniqueConstraint("name", name="uq_role_name"),
+        # Deleted roles must not block re-creating a role with the same name.
+        Index(
+            "uq_role_name",
+            "name",
+            unique=True,
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL")
+        ),
+        *soft_delete_indexes("role"),
         {
             'extend_existing': True
         }
@@ -22,7 +40,31 @@ class Role(RoleBase, table=True):
 
     id: int | None = Field(default=None, primary_key=True)
 
-    users: List[User] = Relationship(back_populates="role")
+    users: List[User] = Relationship(
+        back_populates="role",
+        sa_relationship_kwargs={
+            "primaryjoin": "and_(Role.id == User.role_id, "
+                           "User.deleted_at.is_(None))"
+        }
+    )
+
+
+# Databases created before the timestamps and soft deletes. Their name
+# constraint covered deleted roles too: it is replaced by the partial index.
+postgres_upgrade(
+    Role.__table__,
+    columns=("created_at", "updated_at", "deleted_at"),
+    indexes=(
+        "ix_role_updated_at",
+        "ix_role_live_updated_at",
+        "ix_role_tombstones"
+    )
+)
+postgres_ddl(
+    Role.__table__,
+    "ALTER TABLE role DROP CONSTRAINT IF EXISTS uq_role_name"
+)
+postgres_upgrade(Role.__table__, indexes=("uq_role_name",))
 
 
 class RoleCreate(RoleBase):
@@ -56,6 +98,14 @@ class RolePublic(BaseModel):
     id: int = PydanticField(validation_alias='id')
     name: str = PydanticField(validation_alias='name')
     description: str = PydanticField(validation_alias='description')
+    updated_at: Optional[datetime] = PydanticField(
+        validation_alias='updated_at',
+        default=None
+    )
+    deleted_at: Optional[datetime] = PydanticField(
+        validation_alias='deleted_at',
+        default=None
+    )
 
     model_config = {
         "json_schema_extra": {
@@ -63,7 +113,8 @@ class RolePublic(BaseModel):
                 {
                     "id": 1,
                     "name": "Project Manager",
-                    "description": "Manages project lifecycle."
+                    "description": "Manages project lifecycle.",
+                    "updated_at": "2023-10-01T12:00:00+00:00"
                 }
             ]
         },
@@ -0,0 +1,39 @@
+import enum
+
+from pydantic import BaseModel
+from typing import Optional
+
+
+class SearchResultType(str, enum.Enum):
+    PROJECT = "project"
+    USER = "user"
+
+
+class SearchHit(BaseModel):
+    type: SearchResultType
+    id: int
+    title: str
+    detail: Optional[str] = None
+    rank: float
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "type": "project",
+                    "id": 1,
+                    "title": "Existing Project Alpha",
+                    "detail": "Maintenance phase.",
+                    "rank": 0.6079271
+                },
+                {
+                    "type": "user",
+                    "id": 1,
+                    "title": "Max Weber",
+                    "detail": "Software Engineer",
+                    "rank": 0.24317084
+                }
+            ]
+        },
+        "from_attributes": True
+    }
@@ -0,0 +1,79 @@
+from pydantic import BaseModel
+from sqlalchemy import Column, DateTime, Enum as SQLAlchemyEnum, JSON
+from sqlalchemy.sql import func
+from sqlmodel import Field, SQLModel
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from models.project import ProjectStatus
+
+
+class ProjectSummary(SQLModel, table=True):
+    """
+    Read model of the project dashboard: one denormalized row per live
+    project with its member count and role breakdown, so listing them
+    joins nothing. It is maintained by the writes that change a project or
+    its members (see repositories/summary.py) and can be rebuilt with the
+    `refresh_project_summaries` job.
+    """
+    __tablename__ = "project_summary"
+    __table_args__ = {
+        'extend_existing': True
+    }
+
+    project_id: int = Field(foreign_key="project.id", primary_key=True)
+    name: str
+    status: ProjectStatus = Field(
+        sa_column=Column(SQLAlchemyEnum(ProjectStatus), index=True)
+    )
+    member_count: int = Field(default=0)
+    # Live members per role ID. Role IDs rather than names, so renaming a
+    # role doesn't make the summaries stale.
+    role_counts: Dict[str, int] = Field(default_factory=dict, sa_type=JSON)
+    refreshed_at: Optional[datetime] = Field(
+        default=None,
+        nullable=False,
+        sa_type=DateTime(timezone=True),
+        sa_column_kwargs={"server_default": func.now()}
+    )
+
+
+class RoleHeadcount(BaseModel):
+    role_id: int
+    role_name: Optional[str] = None
+    members: int
+
+
+class ProjectSummaryPublic(BaseModel):
+    project_id: int
+    name: str
+    status: ProjectStatus
+    member_count: int
+    roles: List[RoleHeadcount]
+    refreshed_at: Optional[datetime] = None
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "project_id": 1,
+                    "name": "Existing Project Alpha",
+                    "status": "In Progress",
+                    "member_count": 5,
+                    "roles": [
+                        {
+                            "role_id": 1,
+                            "role_name": "Project Manager",
+                            "members": 1
+                        },
+                        {
+                            "role_id": 2,
+                            "role_name": "Developer",
+                            "members": 4
+                        }
+                    ],
+                    "refreshed_at": "2024-03-01T17:05:12+00:00"
+                }
+            ]
+        }
+    }
@@ -1,11 +1,18 @@
 from pydantic import BaseModel, computed_field, Field as PydanticField
-from sqlalchemy import Column, DateTime 
+from sqlalchemy import Column, DateTime
 from sqlalchemy.sql import func
 from sqlmodel import Field, Relationship, SQLModel
 from datetime import datetime
-from typing import List, Any, Optional
+from typing import Dict, List, Any, Optional
 
-from models.project import UserProject
+from models.base import (
+    SoftDeleteMixin,
+    UpdatedAtMixin,
+    postgres_ddl,
+    postgres_upgrade,
+    soft_delete_indexes
+)
+from models.project import ProjectStatus, UserProject
 
 
 class UserBase(SQLModel):
@@ -13,9 +20,16 @@ class UserBase(SQLModel):
     position: str
 
 
-class User(UserBase, table=True):
+class User(UserBase, UpdatedAtMixin, SoftDeleteMixin, table=True):
     __tablename__ = "user"
-    __table_args__ = {'extend_existing': True}
+    # Fetch server-generated values (timestamps) with RETURNING on flush.
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        *soft_delete_indexes("user"),
+        {
+            'extend_existing': True
+        }
+    )
 
     id: int | None = Field(default=None, primary_key=True)
     role_id: int = Field(nullable=False, foreign_key="role.id", index=True)
@@ -28,7 +42,44 @@ class User(UserBase, table=True):
     )
 
     role: Optional["Role"] = Relationship(back_populates="users")
-    projects: List["Project"] = Relationship(back_populates="users", link_model=UserProject)
+    projects: List["Project"] = Relationship(
+        back_populates="users",
+        link_model=UserProject,
+        sa_relationship_kwargs={
+            "secondaryjoin": "and_(Project.id == UserProject.project_id, "
+                             "Project.deleted_at.is_(None))"
+        }
+    )
+
+
+# Databases created before the timestamps and soft deletes.
+postgres_upgrade(
+    User.__table__,
+    columns=("updated_at", "deleted_at"),
+    indexes=(
+        "ix_user_updated_at",
+        "ix_user_live_updated_at",
+        "ix_user_tombstones"
+    )
+)
+
+
+# Full-text search vector over name (weight A) and position (weight B).
+# It is a generated column, so Postgres keeps it current on every write,
+# and it is deliberately not mapped: it never leaves the database.
+postgres_ddl(
+    User.__table__,
+    'ALTER TABLE "user" ADD COLUMN IF NOT EXISTS search_vector tsvector '
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(position, '')), 'B')"
+    ") STORED"
+)
+postgres_ddl(
+    User.__table__,
+    'CREATE INDEX IF NOT EXISTS ix_user_search_vector ON "user" '
+    "USING gin (search_vector)"
+)
 
 
 class UserCreate(UserBase):
@@ -73,13 +124,22 @@ class UserPublic(BaseModel):
         validation_alias='creation_date',
         exclude=True
     )
+    updated_at: Optional[datetime] = PydanticField(
+        validation_alias='updated_at',
+        default=None
+    )
+    deleted_at: Optional[datetime] = PydanticField(
+        validation_alias='deleted_at',
+        default=None
+    )
 
     @computed_field
     @property
     def role_name(self) -> Optional[str]:
         return self.role.name if self.role else None
     
-    @computed_field
+    # ISO 8601 strings, documented (and sent in MessagePack) as dates.
+    @computed_field(json_schema_extra={"format": "date-time"})
     @property
     def joined_at(self) -> str:
         """Returns the creation date as an ISO 8601 formatted string."""
@@ -93,9 +153,37 @@ class UserPublic(BaseModel):
                     "full_name": "Max Weber",
                     "job_title": "Software Engineer",
                     "role_name": "Project Manager",
-                    "joined_at": "2023-10-01T12:00:00"
+                    "joined_at": "2023-10-01T12:00:00",
+                    "updated_at": "2023-10-01T12:00:00+00:00"
                 }
             ]
         },
         "from_attributes": True
-    }
\ No newline at end of file
+    }
+
+class UserWorkload(BaseModel):
+    user_id: int
+    full_name: str
+    role_name: Optional[str] = None
+    active_projects: int
+    projects_by_status: Dict[ProjectStatus, int]
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "user_id": 1,
+                    "full_name": "Max Weber",
+                    "role_name": "Project Manager",
+                    "active_projects": 3,
+                    "projects_by_status": {
+                        "Planning": 1,
+                        "In Progress": 2,
+                        "Completed": 4,
+                        "On Hold": 0,
+                        "Cancelled": 0
+                    }
+                }
+            ]
+        }
+    }
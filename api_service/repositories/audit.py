@@ -0,0 +1,160 @@
+from datetime import date, datetime
+from sqlalchemy import insert, text, tuple_
+from sqlmodel import select
+
+from repositories.base import BaseRepository
+from models.audit import AuditAction, AuditEntity, AuditEntry
+
+
+def _month(value: date, offset: int = 0) -> date:
+    """
+    The first day of the month `offset` months after the month of `value`.
+    """
+    index = value.year * 12 + value.month - 1 + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """
+    The name of the partition holding the entries of a month.
+
+    Args:
+        month (date): Any day of the month.
+    """
+    return f"audit_log_p{month.year:04d}_{month.month:02d}"
+
+
+class AuditRepository(BaseRepository):
+    def __init__(self, session):
+        """
+        Initializes the audit repository.
+
+        Args:
+            session: The database session (sqlmodel.Session).
+        """
+        super().__init__(model=AuditEntry, session=session)
+
+    def append(self, entries: list[dict]) -> None:
+        """
+        Inserts audit entries with one multi-row statement.
+
+        Args:
+            entries: The entries, as dicts of AuditEntry columns (without
+                     `id`).
+        """
+        if entries:
+            self.session.exec(insert(AuditEntry.__table__), params=entries)
+
+    def get_page(
+        self,
+        entity: AuditEntity | None = None,
+        entity_id: int | None = None,
+        action: AuditAction | None = None,
+        actor: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        before: tuple[datetime, int] | None = None,
+        limit: int = 100
+    ) -> list[AuditEntry]:
+        """
+        Retrieves audit entries, most recent first.
+
+        Pages are keyset-paginated on (occurred_at, id), and the time
+        bounds let Postgres skip the partitions outside of them.
+
+        Args:
+            entity: Only entries about this kind of record, if given.
+            entity_id: Only entries about the record with this ID, if given.
+            action: Only entries of this action, if given.
+            actor: Only entries made by this client, if given.
+            since: Only entries that occurred at or after this moment.
+            until: Only entries that occurred before this moment.
+            before: The (occurred_at, id) of the last entry of the previous
+                    page; only older entries are returned.
+            limit: The maximum number of entries returned.
+
+        Returns:
+            A list of audit entries.
+        """
+        statement = select(AuditEntry)
+        if entity is not None:
+            statement = statement.where(AuditEntry.entity == entity)
+        if entity_id is not None:
+            statement = statement.where(AuditEntry.entity_id == entity_id)
+        if action is not None:
+            statement = statement.where(AuditEntry.action == action)
+        if actor is not None:
+            statement = statement.where(AuditEntry.actor == actor)
+        if since is not None:
+            statement = statement.where(AuditEntry.occurred_at >= since)
+        if until is not None:
+            statement = statement.where(AuditEntry.occurred_at < until)
+        if before is not None:
+            statement = statement.where(
+                AuditEntry.occurred_at <= before[0],
+                tuple_(AuditEntry.occurred_at, AuditEntry.id)
+                < tuple_(*before)
+            )
+        statement = statement.order_by(
+            AuditEntry.occurred_at.desc(),
+            AuditEntry.id.desc()
+        ).limit(limit)
+        return self.session.exec(statement).all()
+
+    def create_partitions(self, today: date, months_ahead: int) -> list[str]:
+        """
+        Creates the monthly partitions of the current month and the next
+        `months_ahead` months, if they don't exist yet (Postgres only).
+
+        Partitions must exist before their month begins: entries of a
+        month without a partition go to the default partition, and a
+        partition can no longer be created for a month the default one
+        has rows of.
+
+        Args:
+            today: The current date.
+            months_ahead: The number of months created in advance.
+
+        Returns:
+            The names of the partitions, existing or created.
+        """
+        if self.dialect != "postgresql":
+            return []
+        names = []
+        for offset in range(months_ahead + 1):
+            month = _month(today, offset)
+            name = partition_name(month)
+            self.session.exec(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF audit_log "
+                f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+                f"TO ('{_month(month, 1).isoformat()} 00:00:00+00')"
+            ))
+            names.append(name)
+        return names
+
+    def drop_partitions(self, older_than: date) -> list[str]:
+        """
+        Drops the monthly partitions of the months before the month of
+        `older_than` (Postgres only). Dropping a partition removes a month
+        of entries at once, without deleting rows one by one.
+
+        Args:
+            older_than: Any day of the oldest month kept.
+
+        Returns:
+            The names of the partitions dropped.
+        """
+        if self.dialect != "postgresql":
+            return []
+        oldest_kept = partition_name(older_than)
+        partitions = self.session.exec(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = 'audit_log' "
+            "AND child.relname LIKE 'audit\\_log\\_p%'"
+        )).scalars().all()
+        dropped = sorted(name for name in partitions if name < oldest_kept)
+        for name in dropped:
+            self.session.exec(text(f"DROP TABLE {name}"))
+        return dropped
@@ -1,7 +1,71 @@
-from sqlmodel import SQLModel, Session, select
+from datetime import datetime
+from sqlalchemy import Integer, any_, bindparam, inspect
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.util import identity_key
+from sqlmodel import SQLModel, Session, delete, select
+from typing import Callable
 
+from core.tracing import traced
+from models.base import write_time
 
+
+def in_ids(column, dialect: str, name: str = "ids"):
+    """
+    Builds the `column IN <list of IDs>` condition of a reusable statement,
+    bound to the parameter `name`.
+
+    On Postgres the IDs are sent as one array parameter
+    (`column = ANY(:ids)`), so the statement text is the same whatever the
+    number of IDs. Other databases get an expanding IN.
+
+    Args:
+        column: The column compared to the IDs.
+        dialect: The name of the database dialect.
+        name: The name of the bound parameter.
+    """
+    if dialect == "postgresql":
+        return column == any_(bindparam(name, type_=ARRAY(Integer)))
+    return column.in_(bindparam(name, expanding=True))
+
+
+# Kinds of constraint violations (see integrity_violation).
+UNIQUE_VIOLATION = "unique"
+FOREIGN_KEY_VIOLATION = "foreign_key"
+
+
+def integrity_violation(error: IntegrityError) -> str | None:
+    """
+    Tells which kind of constraint a write violated, so services can report
+    it precisely.
+
+    Args:
+        error: The error raised by the write.
+
+    Returns:
+        UNIQUE_VIOLATION (unique constraint or index, primary key),
+        FOREIGN_KEY_VIOLATION, or None for other constraints.
+    """
+    # Postgres reports the SQLSTATE; SQLite only a message.
+    code = getattr(error.orig, "pgcode", None)
+    message = str(error.orig)
+    if code == "23505" or message.startswith("UNIQUE constraint failed"):
+        return UNIQUE_VIOLATION
+    if code == "23503" or message.startswith("FOREIGN KEY constraint failed"):
+        return FOREIGN_KEY_VIOLATION
+    return None
+
+
+@traced
 class BaseRepository:
+    # Statements built once per model and reused (see _statement).
+    _statements: dict = {}
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        # Every repository gets spans for its own methods too.
+        super().__init_subclass__(**kwargs)
+        traced(cls)
+
     def __init__(self, model, session: Session):
         """
         Base class for repositories with generic CRUD implementations.
@@ -18,19 +82,120 @@ class BaseRepository:
             )
         self._model = model
         self.session = session
+        # Postgres-specific fast paths (array parameters, range and
+        # full-text columns) fall back to portable SQL on other databases.
+        self.dialect = session.get_bind().dialect.name
+        # Models with a `deleted_at` column are soft-deleted: delete() only
+        # writes a tombstone, reads skip tombstones unless asked otherwise
+        # and purge_deleted() removes old tombstones for good.
+        self.soft_delete = "deleted_at" in model.model_fields
+
+    def _statement(self, name: str, build: Callable):
+        """
+        Returns a statement built once per model and reused by every call.
+
+        A statement object memoizes its cache key, and its compiled form
+        comes from SQLAlchemy's compiled cache, so executing the same object
+        again with new parameters skips building the construct, generating
+        the key and compiling it. This roughly halves the client-side CPU of
+        single-row lookups (see benchmarks/queries.py).
+
+        Args:
+            name: Identifies the statement among the model's statements.
+            build: Builds the statement, with a `bindparam` for each value
+                   that varies between calls.
+        """
+        key = (self.dialect, self._model, name)
+        statement = self._statements.get(key)
+        if statement is None:
+            statement = self._statements[key] = build()
+        return statement
 
-    def get_by_id(self, id: int):
+    def _exclude_deleted(self, statement):
+        """
+        Restricts a select statement to live (non tombstoned) records when
+        the model is soft-deletable.
+        """
+        if not self.soft_delete:
+            return statement
+        return statement.where(self._model.deleted_at.is_(None))
+
+    def get_by_id(self, id: int, include_deleted: bool = False):
         """
         Retrieves a single record by its ID.
 
+        A record already loaded in the session is returned without a query,
+        like `Session.get` does; otherwise it is loaded with a reused
+        statement (see _statement).
+
         Args:
             id: The identifier of the record to search for.
+            include_deleted: Whether a soft-deleted record may be returned.
 
         Returns:
             An instance of the model if found, or None if it doesn't exist.
         """
-        return self.session.get(self._model, id)
+        object = self.session.identity_map.get(identity_key(self._model, id))
+        if object is not None and not inspect(object).expired:
+            if (
+                self.soft_delete
+                and not include_deleted
+                and object.deleted_at is not None
+            ):
+                return None
+            return object
+        live_only = self.soft_delete and not include_deleted
+        statement = self._statement(
+            "live_by_id" if live_only else "by_id",
+            lambda: self._by_id(live_only)
+        )
+        return self.session.exec(statement, params={"id": id}).first()
+
+    def _by_id(self, live_only: bool):
+        statement = select(self._model).where(
+            self._model.id == bindparam("id")
+        )
+        return self._exclude_deleted(statement) if live_only else statement
     
+    def get_many(self, ids: list[int], include_deleted: bool = False):
+        """
+        Retrieves several records by their IDs with a single query.
+
+        On Postgres the IDs are sent as one array parameter
+        (`WHERE id = ANY(:ids)`), so the statement text is the same whatever
+        the number of IDs (see in_ids).
+
+        Args:
+            ids: The identifiers of the records to search for. Duplicates are
+                 ignored.
+            include_deleted: Whether soft-deleted records may be returned.
+
+        Returns:
+            A list of the model instances found, in the order of `ids`. IDs
+            that don't exist are skipped.
+        """
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return []
+        live_only = self.soft_delete and not include_deleted
+        statement = self._statement(
+            "live_by_ids" if live_only else "by_ids",
+            lambda: self._by_ids(live_only)
+        )
+        found = {
+            object.id: object
+            for object in self.session.exec(
+                statement, params={"ids": ids}
+            ).all()
+        }
+        return [found[id] for id in ids if id in found]
+
+    def _by_ids(self, live_only: bool):
+        statement = select(self._model).where(
+            in_ids(self._model.id, self.dialect)
+        )
+        return self._exclude_deleted(statement) if live_only else statement
+
     def get_by_composite_id(self, *ids):
         """
         Retrieves a record by its composite ID.
@@ -43,17 +208,45 @@ class BaseRepository:
         """
         return self.session.get(self._model, ids)
 
-    def get_all(self):
+    def get_all(
+        self,
+        updated_since: datetime | None = None,
+        include_deleted: bool = False
+    ):
         """
         Retrieves a list of records.
 
+        Args:
+            updated_since: If provided, only records modified at or after
+                           this moment are returned (requires the model to
+                           have an indexed `updated_at` column).
+            include_deleted: Whether soft-deleted records (tombstones) are
+                             returned too. Sync consumers use it together
+                             with `updated_since` to learn about deletions.
+
         Returns:
             A list of model instances.
         """
-        statement = select(self._model)
-        results = self.session.exec(statement)
+        live_only = self.soft_delete and not include_deleted
+        since = updated_since is not None
+        statement = self._statement(
+            f"all:{live_only}:{since}",
+            lambda: self._all(live_only, since)
+        )
+        params = {"updated_since": updated_since} if since else {}
+        results = self.session.exec(statement, params=params)
         return results.all()
 
+    def _all(self, live_only: bool, since: bool):
+        statement = select(self._model)
+        if live_only:
+            statement = self._exclude_deleted(statement)
+        if since:
+            statement = statement.where(
+                self._model.updated_at >= bindparam("updated_since")
+            )
+        return statement
+
     def create(self, object):
         """
         Creates a new record in the database.
@@ -63,17 +256,21 @@ class BaseRepository:
                     containing the data to create the new record.
                     It is expected to be compatible with the model.
 
+        The record is only flushed: it is committed with the rest of the
+        unit of work (see core.db.UnitOfWork).
+
+        Errors are left to the unit of work, which rolls back once.
+
         Returns:
-            The newly created and refreshed model instance from the database or
-            None if an error occurs during the process..
+            The newly created model instance, with its generated values.
+
+        Raises:
+            IntegrityError: If the record violates a constraint. See
+            integrity_violation.
         """
-        try:
-            self.session.add(object)
-            self.session.commit()
-            self.session.refresh(object)
-            return object
-        except Exception as e:
-            return None
+        self.session.add(object)
+        self.session.flush()
+        return object
 
     def update(self, object):
         """
@@ -84,33 +281,99 @@ class BaseRepository:
                     containing the data to update. Only the fields present will
                     be updated.
 
+        The changes are only flushed: they are committed with the rest of the
+        unit of work (see core.db.UnitOfWork).
+
+        Errors are left to the unit of work, which rolls back once.
+
         Returns:
-            The updated model instance if successful, or None if the record was
-            not found or an error occurred.
+            The updated model instance.
+
+        Raises:
+            IntegrityError: If the changes violate a constraint. See
+            integrity_violation.
         """
-        try:
-            self.session.add(object)
-            self.session.commit()
-            self.session.refresh(object)
-            return object
-        except Exception as e:
-            return None
-        
+        self.session.add(object)
+        self.session.flush()
+        return object
+
+    def touch(self, object):
+        """
+        Marks a record as modified without changing any of its fields, so its
+        `updated_at` column is bumped when the session is next flushed.
+
+        Args:
+            object: The object to mark as modified.
+        """
+        object.updated_at = write_time()
+        self.session.add(object)
 
     def delete(self, object):
         """
         Deletes a record from the database.
 
+        Soft-deletable records are not removed but marked with a `deleted_at`
+        tombstone, which leaves dependent rows untouched. The deletion is
+        only flushed: it is committed with the rest of the unit of work.
+
         Args:
             object: The object to delete.
 
+        Errors are left to the unit of work, which rolls back once.
+
         Returns:
-            True if the deletion was successful, or False if an error occurred
-            or the record was not found.
+            True once the deletion is flushed.
         """
-        try:
+        if self.soft_delete:
+            object.deleted_at = write_time()
+            self.session.add(object)
+        else:
             self.session.delete(object)
-            self.session.commit()
-            return True
-        except Exception as e:
-            return False
\ No newline at end of file
+        self.session.flush()
+        return True
+
+    def _purgeable(self, older_than: datetime):
+        """
+        Builds the statement selecting the IDs of tombstones that can be
+        purged. Repositories whose rows may still be referenced override it.
+        """
+        return select(self._model.id).where(
+            self._model.deleted_at < older_than
+        )
+
+    def _purge_dependents(self, ids: list[int]) -> None:
+        """
+        Removes the rows that reference the given records before they are
+        purged. Repositories with dependent link tables override it.
+        """
+
+    def purge_deleted(self, older_than: datetime, limit: int) -> int:
+        """
+        Permanently removes one bounded batch of old tombstones.
+
+        Rows locked by concurrent transactions are skipped, so the purge never
+        waits on request traffic. The caller commits each batch, so that
+        locks are never held on more than `limit` rows.
+
+        Args:
+            older_than: Only tombstones written before this moment are purged.
+            limit: The maximum number of records removed in this batch.
+
+        Returns:
+            The number of records purged.
+        """
+        if not self.soft_delete:
+            return 0
+        statement = (
+            self._purgeable(older_than)
+            .order_by(self._model.deleted_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        ids = list(self.session.exec(statement).all())
+        if ids:
+            self._purge_dependents(ids)
+            self.session.exec(
+                delete(self._model).where(self._model.id.in_(ids))
+            )
+        return len(ids)
\ No newline at end of file
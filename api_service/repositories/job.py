@@ -0,0 +1,57 @@
+from datetime import datetime
+from sqlalchemy import and_, or_
+from sqlalchemy.sql import func
+from sqlmodel import select
+
+from repositories.base import BaseRepository
+from models.job import Job, JobStatus
+
+
+class JobRepository(BaseRepository):
+    def __init__(self, session):
+        """
+        Initializes the job repository.
+
+        Args:
+            session: The database session (sqlmodel.Session).
+        """
+        super().__init__(model=Job, session=session)
+
+    def claim_next(self, stale_before: datetime) -> Job | None:
+        """
+        Claims the oldest job waiting to run.
+
+        Queued jobs are claimable, and so are running jobs whose worker
+        stopped reporting before `stale_before` (their worker is assumed to
+        have died). Rows locked by other workers are skipped, so concurrent
+        workers never claim the same job nor wait on each other. The claim
+        is only flushed: the caller commits it.
+
+        Args:
+            stale_before: Running jobs not updated since this moment are
+                          claimed again.
+
+        Returns:
+            The claimed job, marked as running, or None if there is none.
+        """
+        statement = (
+            select(Job)
+            .where(or_(
+                Job.status == JobStatus.QUEUED,
+                and_(
+                    Job.status == JobStatus.RUNNING,
+                    Job.updated_at < stale_before
+                )
+            ))
+            .order_by(Job.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job = self.session.exec(statement).first()
+        if job is None:
+            return None
+        job.status = JobStatus.RUNNING
+        job.attempts += 1
+        job.progress = 0
+        job.started_at = func.now()
+        return self.update(job)
@@ -0,0 +1,162 @@
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlmodel import Session
+from typing import Any, Callable, Dict, Hashable, Iterable, List
+
+from repositories.project import UserProjectRepository
+from repositories.role import RoleRepository
+from repositories.user import UserRepository
+
+
+class DataLoader:
+    def __init__(self, batch_fn: Callable[[List[Hashable]], Dict[Hashable, Any]]):
+        """
+        Batches and caches lookups by key.
+
+        Keys requested with `load` are queued and fetched together, with a
+        single call to `batch_fn`, on the next `dispatch` (a "tick"). Results
+        are cached so each key is fetched at most once per loader.
+
+        Args:
+            batch_fn: A function receiving a list of keys and returning a
+                      dict with the value of each key found.
+        """
+        self._batch_fn = batch_fn
+        self._cache: Dict[Hashable, Any] = {}
+        self._queue: Dict[Hashable, None] = {}
+
+    def load(self, key: Hashable) -> None:
+        """
+        Queues a key to be fetched on the next dispatch, unless it is
+        already cached.
+        """
+        if key is not None and key not in self._cache:
+            self._queue[key] = None
+
+    def dispatch(self) -> None:
+        """
+        Fetches all queued keys with one call to the batch function. Keys
+        not found are cached as None.
+        """
+        if not self._queue:
+            return
+        keys = list(self._queue)
+        self._queue.clear()
+        found = self._batch_fn(keys)
+        for key in keys:
+            self._cache[key] = found.get(key)
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Returns the cached value of a key (None if not loaded or not found).
+        """
+        return self._cache.get(key)
+
+    def load_many(self, keys: Iterable[Hashable]) -> List[Any]:
+        """
+        Queues the given keys, dispatches and returns their values in order.
+        """
+        keys = list(keys)
+        for key in keys:
+            self.load(key)
+        self.dispatch()
+        return [self.get(key) for key in keys]
+
+    def prime(self, key: Hashable, value: Any) -> None:
+        """
+        Caches a value already at hand so it is never fetched.
+        """
+        self._cache[key] = value
+
+
+class Loaders:
+    def __init__(self, session: Session):
+        """
+        The request-scoped loaders used to resolve relationships in bulk.
+
+        Instead of letting `Project.users` and `User.role` lazy-load one
+        object at a time while responses are serialized, the services
+        collect the keys of every object in the response, fetch each entity
+        type with one `ANY(...)` query and set the relationships on the
+        objects. Use `get_loaders` to obtain the instance bound to a session.
+
+        Args:
+            session: The database session (sqlmodel.Session).
+        """
+        user_repo = UserRepository(session=session)
+        role_repo = RoleRepository(session=session)
+        user_project_repo = UserProjectRepository(session=session)
+
+        self.users = DataLoader(
+            lambda ids: {user.id: user for user in user_repo.get_many(ids)}
+        )
+        # Roles of deleted users or roles are still shown, like User.role.
+        self.roles = DataLoader(
+            lambda ids: {
+                role.id: role
+                for role in role_repo.get_many(ids, include_deleted=True)
+            }
+        )
+        self.project_members = DataLoader(
+            user_project_repo.get_user_ids_by_project_ids
+        )
+
+    def resolve_projects(self, projects: List[Any]) -> None:
+        """
+        Sets `users` on the given projects, and `role` on those users, with
+        one query per entity type.
+
+        Args:
+            projects: Project instances.
+        """
+        if not projects:
+            return
+        members = self.project_members.load_many(
+            project.id for project in projects
+        )
+        self.users.load_many(
+            user_id for user_ids in members for user_id in user_ids
+        )
+        users = []
+        for project, user_ids in zip(projects, members):
+            project_users = [
+                self.users.get(user_id)
+                for user_id in user_ids
+                if self.users.get(user_id) is not None
+            ]
+            set_committed_value(project, "users", project_users)
+            users.extend(project_users)
+        self.resolve_users(users)
+
+    def resolve_users(self, users: List[Any]) -> None:
+        """
+        Sets `role` on the given users with one query.
+
+        Args:
+            users: User instances.
+        """
+        if not users:
+            return
+        for user in users:
+            self.users.prime(user.id, user)
+        self.roles.load_many(user.role_id for user in users)
+        for user in users:
+            set_committed_value(user, "role", self.roles.get(user.role_id))
+
+
+def get_loaders(session: Session) -> Loaders:
+    """
+    Returns the loaders bound to a session, creating them on first use.
+
+    Sessions are request-scoped, so the loaders' identity caches are too.
+
+    Args:
+        session: The database session (sqlmodel.Session).
+
+    Returns:
+        Loaders: The loaders of the session.
+    """
+    loaders = session.info.get("loaders")
+    if loaders is None:
+        loaders = Loaders(session=session)
+        session.info["loaders"] = loaders
+    return loaders
@@ -1,5 +1,86 @@
-from repositories.base import BaseRepository
-from models.project import Project, UserProject
+from datetime import datetime, timezone
+from sqlalchemy import (
+    DateTime,
+    and_,
+    bindparam,
+    case,
+    cast,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    true,
+    update
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import delete, exists, func, select
+
+from repositories.base import BaseRepository, in_ids
+from models.base import write_time
+from models.project import Project, ProjectStatus, UserProject, subtree_prefix
+from models.summary import ProjectSummary
+from models.user import User
+
+
+def _timestamp(value: datetime | None) -> datetime | None:
+    """
+    Converts a datetime to the naive UTC timestamps the project dates are
+    stored as.
+    """
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _window(begin: datetime | None, end: datetime | None):
+    """
+    Builds the tsrange of a time window; a missing bound leaves it open.
+    """
+    return func.tsrange(
+        cast(_timestamp(begin), DateTime),
+        cast(_timestamp(end), DateTime),
+        "[]"
+    )
+
+
+def _period(table):
+    """
+    The `period` range column of a project table or alias (Postgres only).
+    """
+    return literal_column(f"{table.name}.period")
+
+
+def _has_period(table):
+    """
+    Portable equivalent of `period IS NOT NULL`: the dates are consistent.
+    """
+    return or_(
+        table.c.begin_date.is_(None),
+        table.c.end_date.is_(None),
+        table.c.begin_date <= table.c.end_date
+    )
+
+
+def _within(lower, upper, begin: datetime | None, end: datetime | None):
+    """
+    Portable equivalent of `[lower, upper] && [begin, end]`, where NULL
+    bounds are open.
+    """
+    conditions = []
+    if end is not None:
+        conditions.append(or_(lower.is_(None), lower <= _timestamp(end)))
+    if begin is not None:
+        conditions.append(or_(upper.is_(None), upper >= _timestamp(begin)))
+    return and_(true(), *conditions)
+
+
+def _in_subtree(prefix: str):
+    """
+    Matches the projects whose path starts with `prefix`, as one range of
+    the path index: such paths sort from the prefix up to the prefix with
+    its final "/" replaced by the next character, "0".
+    """
+    return and_(Project.path >= prefix, Project.path < prefix[:-1] + "0")
 
 
 class ProjectRepository(BaseRepository):
@@ -12,6 +93,292 @@ class ProjectRepository(BaseRepository):
         """
         super().__init__(model=Project, session=session)
 
+    def _purge_dependents(self, ids: list[int]) -> None:
+        """
+        Removes the memberships and summaries of the projects about to be
+        purged.
+        """
+        self.session.exec(
+            delete(UserProject).where(UserProject.project_id.in_(ids))
+        )
+        self.session.exec(
+            delete(ProjectSummary).where(ProjectSummary.project_id.in_(ids))
+        )
+
+    def _purgeable(self, older_than: datetime):
+        """
+        Deleted projects still referenced by a sub-project (even a deleted
+        one that has not been purged yet) are kept until it is gone.
+        """
+        child = Project.__table__.alias("child")
+        return super()._purgeable(older_than).where(
+            ~exists().where(child.c.parent_id == Project.id)
+        )
+
+    def touch_live(self, id: int) -> bool:
+        """
+        Marks a live project as modified with one UPDATE, which also tells
+        whether it exists and locks it until the end of the transaction.
+
+        Args:
+            id: The identifier of the project.
+
+        Returns:
+            False if the project doesn't exist or is deleted.
+        """
+        statement = self._statement(
+            "touch_live",
+            lambda: update(Project)
+            .where(
+                Project.id == bindparam("project_id"),
+                Project.deleted_at.is_(None)
+            )
+            .values(updated_at=write_time())
+            .execution_options(synchronize_session=False)
+        )
+        result = self.session.exec(statement, params={"project_id": id})
+        return result.rowcount == 1
+
+    def has_children(self, id: int) -> bool:
+        """
+        Checks whether a project has live sub-projects.
+
+        Args:
+            id: The identifier of the project.
+
+        Returns:
+            True if at least one live project has it as parent.
+        """
+        statement = select(
+            exists().where(
+                Project.parent_id == id,
+                Project.deleted_at.is_(None)
+            )
+        )
+        return self.session.exec(statement).one()
+
+    def get_subtree(self, project: Project) -> list:
+        """
+        Retrieves all the live descendants of a project, at any depth, with
+        one range scan of the path index.
+
+        Args:
+            project: The root of the subtree (not included).
+
+        Returns:
+            A list of rows with `project_id`, `parent_id`, `name`, `status`
+            and `path`, grouped by parent.
+        """
+        statement = (
+            select(
+                Project.id.label("project_id"),
+                Project.parent_id,
+                Project.name,
+                Project.status,
+                Project.path
+            )
+            .where(
+                _in_subtree(subtree_prefix(project.path, project.id)),
+                Project.deleted_at.is_(None)
+            )
+            .order_by(Project.path, Project.id)
+        )
+        return self.session.exec(statement).all()
+
+    def get_rollup(self, project: Project):
+        """
+        Aggregates a project and its live descendants in a single query:
+        the number of projects per status, the number of distinct live
+        members and the overall period.
+
+        Args:
+            project: The root of the subtree (included).
+
+        Returns:
+            A row with `projects`, `members`, `begin_date`, `end_date` and
+            one count per ProjectStatus name.
+        """
+        in_tree = and_(
+            or_(
+                Project.id == project.id,
+                _in_subtree(subtree_prefix(project.path, project.id))
+            ),
+            Project.deleted_at.is_(None)
+        )
+        members = (
+            select(func.count(UserProject.user_id.distinct()))
+            .join(Project, Project.id == UserProject.project_id)
+            .join(User, and_(
+                User.id == UserProject.user_id,
+                User.deleted_at.is_(None)
+            ))
+            .where(in_tree)
+            .scalar_subquery()
+        )
+        counts = [
+            func.count(Project.id).filter(Project.status == status)
+            .label(status.name)
+            for status in ProjectStatus
+        ]
+        statement = select(
+            func.count(Project.id).label("projects"),
+            members.label("members"),
+            func.min(Project.begin_date).label("begin_date"),
+            func.max(Project.end_date).label("end_date"),
+            *counts
+        ).where(in_tree)
+        return self.session.exec(statement).one()
+
+    def move_subtree(self, old_prefix: str, new_prefix: str) -> None:
+        """
+        Rewrites the paths of all the descendants of a moved project (live
+        or deleted) with one statement, replacing the old prefix of their
+        paths by the new one.
+
+        Args:
+            old_prefix: The subtree prefix of the project before the move.
+            new_prefix: The subtree prefix of the project after the move.
+        """
+        statement = (
+            update(Project)
+            .where(_in_subtree(old_prefix))
+            .values(path=literal(new_prefix) + func.substr(
+                Project.path,
+                len(old_prefix) + 1
+            ))
+            .execution_options(synchronize_session=False)
+        )
+        self.session.exec(statement)
+
+    def get_active(
+        self,
+        begin: datetime | None = None,
+        end: datetime | None = None
+    ) -> list[Project]:
+        """
+        Retrieves the live projects whose period overlaps a time window.
+
+        On Postgres the `period` range column is matched with `&&` through
+        its GiST index (see models/project.py); other databases compare the
+        dates.
+
+        Args:
+            begin: The start of the window (inclusive), or None for no start.
+            end: The end of the window (inclusive), or None for no end.
+
+        Returns:
+            A list of projects, by begin date.
+        """
+        table = Project.__table__
+        if self.dialect == "postgresql":
+            active = _period(table).op("&&")(_window(begin, end))
+        else:
+            active = and_(
+                _has_period(table),
+                _within(table.c.begin_date, table.c.end_date, begin, end)
+            )
+        statement = (
+            select(Project)
+            .where(active)
+            .order_by(Project.begin_date, Project.id)
+        )
+        return self.session.exec(self._exclude_deleted(statement)).all()
+
+    def get_overlaps_for_user(
+        self,
+        user_id: int,
+        begin: datetime | None = None,
+        end: datetime | None = None
+    ) -> list:
+        """
+        Finds the pairs of live projects of a user whose periods overlap.
+
+        The user's memberships are read through the user_project primary
+        key and paired with each other, so the cost depends on the user's
+        projects only.
+
+        Args:
+            user_id: The identifier of the user.
+            begin: Only overlaps after this moment are reported, if given.
+            end: Only overlaps before this moment are reported, if given.
+
+        Returns:
+            A list of rows with `project_id`, `project_name`,
+            `other_project_id`, `other_project_name`, `overlap_begin` and
+            `overlap_end`, one per pair.
+        """
+        membership = UserProject.__table__.alias("membership")
+        other_membership = UserProject.__table__.alias("other_membership")
+        project = Project.__table__.alias("booked")
+        other = Project.__table__.alias("other_booked")
+        if self.dialect == "postgresql":
+            overlap = _period(project).op("*")(_period(other))
+            overlap_begin = func.lower(overlap, type_=DateTime)
+            overlap_end = func.upper(overlap, type_=DateTime)
+            overlapping = _period(project).op("&&")(_period(other))
+        else:
+            # The later begin and the earlier end, NULL meaning open.
+            overlap_begin = case(
+                (project.c.begin_date.is_(None), other.c.begin_date),
+                (other.c.begin_date.is_(None), project.c.begin_date),
+                (
+                    project.c.begin_date > other.c.begin_date,
+                    project.c.begin_date
+                ),
+                else_=other.c.begin_date
+            )
+            overlap_end = case(
+                (project.c.end_date.is_(None), other.c.end_date),
+                (other.c.end_date.is_(None), project.c.end_date),
+                (project.c.end_date < other.c.end_date, project.c.end_date),
+                else_=other.c.end_date
+            )
+            overlapping = and_(
+                _has_period(project),
+                _has_period(other),
+                or_(
+                    project.c.begin_date.is_(None),
+                    other.c.end_date.is_(None),
+                    project.c.begin_date <= other.c.end_date
+                ),
+                or_(
+                    other.c.begin_date.is_(None),
+                    project.c.end_date.is_(None),
+                    other.c.begin_date <= project.c.end_date
+                )
+            )
+        statement = (
+            select(
+                project.c.id.label("project_id"),
+                project.c.name.label("project_name"),
+                other.c.id.label("other_project_id"),
+                other.c.name.label("other_project_name"),
+                overlap_begin.label("overlap_begin"),
+                overlap_end.label("overlap_end")
+            )
+            .select_from(membership)
+            .join(project, project.c.id == membership.c.project_id)
+            .join(other_membership, and_(
+                other_membership.c.user_id == membership.c.user_id,
+                other_membership.c.project_id > membership.c.project_id
+            ))
+            .join(other, other.c.id == other_membership.c.project_id)
+            .where(
+                membership.c.user_id == user_id,
+                project.c.deleted_at.is_(None),
+                other.c.deleted_at.is_(None),
+                overlapping
+            )
+            .order_by(literal_column("overlap_begin"), project.c.id, other.c.id)
+        )
+        if begin is not None or end is not None:
+            if self.dialect == "postgresql":
+                in_window = overlap.op("&&")(_window(begin, end))
+            else:
+                in_window = _within(overlap_begin, overlap_end, begin, end)
+            statement = statement.where(in_window)
+        return self.session.exec(statement).all()
+
 
 class UserProjectRepository(BaseRepository):
     def __init__(self, session):
@@ -21,4 +388,141 @@ class UserProjectRepository(BaseRepository):
         Args:
             session: The database session (sqlmodel.Session).
         """
-        super().__init__(model=UserProject, session=session)
\ No newline at end of file
+        super().__init__(model=UserProject, session=session)
+
+    def add(self, user_id: int, project_id: int) -> bool:
+        """
+        Adds a live user to a project with a single INSERT ... SELECT,
+        leaving the checks to the database: the user must be live, the
+        primary key rejects duplicate memberships and the foreign key
+        unknown projects.
+
+        Args:
+            user_id: The identifier of the user.
+            project_id: The identifier of the project.
+
+        Returns:
+            False if the user doesn't exist or is deleted.
+
+        Raises:
+            IntegrityError: If the user already is a member (unique
+            violation) or the project doesn't exist (foreign key
+            violation), which the unit of work rolls back.
+        """
+        statement = self._statement(
+            "add",
+            lambda: insert(UserProject.__table__).from_select(
+                ["user_id", "project_id"],
+                select(User.id, bindparam("project_id")).where(
+                    User.id == bindparam("user_id"),
+                    User.deleted_at.is_(None)
+                )
+            )
+        )
+        result = self.session.exec(
+            statement,
+            params={"user_id": user_id, "project_id": project_id}
+        )
+        return result.rowcount == 1
+
+    def add_many(self, user_ids: list[int], project_id: int) -> list[int]:
+        """
+        Adds several live users to a project with a single INSERT ... SELECT
+        that skips existing memberships (ON CONFLICT DO NOTHING), so users
+        who already are members, even ones added concurrently, never fail
+        the whole batch.
+
+        Args:
+            user_ids: The identifiers of the users.
+            project_id: The identifier of the project.
+
+        Returns:
+            The IDs of the users added: unknown or deleted users and
+            existing members are left out.
+
+        Raises:
+            IntegrityError: If the project doesn't exist (foreign key
+            violation), which the unit of work rolls back.
+        """
+        if not user_ids:
+            return []
+        dialect_insert = (
+            postgresql.insert if self.dialect == "postgresql"
+            else sqlite.insert
+        )
+        statement = self._statement(
+            "add_many",
+            lambda: dialect_insert(UserProject.__table__)
+            .from_select(
+                ["user_id", "project_id"],
+                select(User.id, bindparam("project_id")).where(
+                    in_ids(User.id, self.dialect),
+                    User.deleted_at.is_(None)
+                )
+            )
+            .on_conflict_do_nothing()
+            .returning(UserProject.__table__.c.user_id)
+        )
+        result = self.session.exec(
+            statement,
+            params={"ids": list(user_ids), "project_id": project_id}
+        )
+        return list(result.scalars())
+
+    def remove(self, user_id: int, project_id: int) -> bool:
+        """
+        Removes a live user from a project with a single DELETE.
+
+        Args:
+            user_id: The identifier of the user.
+            project_id: The identifier of the project.
+
+        Returns:
+            False if the user is not a member of the project, or is deleted.
+        """
+        statement = self._statement(
+            "remove",
+            lambda: delete(UserProject)
+            .where(
+                UserProject.user_id == bindparam("user_id"),
+                UserProject.project_id == bindparam("project_id"),
+                exists().where(
+                    User.id == UserProject.user_id,
+                    User.deleted_at.is_(None)
+                )
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = self.session.exec(
+            statement,
+            params={"user_id": user_id, "project_id": project_id}
+        )
+        return result.rowcount == 1
+
+    def get_user_ids_by_project_ids(
+        self,
+        project_ids: list[int]
+    ) -> dict[int, list[int]]:
+        """
+        Retrieves the members of several projects with a single query.
+
+        Args:
+            project_ids: The identifiers of the projects.
+
+        Returns:
+            A dict mapping each project ID to the IDs of its users (an empty
+            list for projects without members).
+        """
+        members = {project_id: [] for project_id in project_ids}
+        if not project_ids:
+            return members
+        statement = self._statement(
+            "user_ids_by_project_ids",
+            lambda: select(UserProject.project_id, UserProject.user_id).where(
+                in_ids(UserProject.project_id, self.dialect)
+            )
+        )
+        rows = self.session.exec(statement, params={"ids": list(project_ids)})
+        for project_id, user_id in rows.all():
+            members[project_id].append(user_id)
+        return members
@@ -1,5 +1,9 @@
+from datetime import datetime
+from sqlmodel import exists
+
 from repositories.base import BaseRepository
 from models.role import Role
+from models.user import User
 
 
 class RoleRepository(BaseRepository):
@@ -10,4 +14,13 @@ class RoleRepository(BaseRepository):
         Args:
             session: The database session (sqlmodel.Session).
         """
-        super().__init__(model=Role, session=session)
\ No newline at end of file
+        super().__init__(model=Role, session=session)
+
+    def _purgeable(self, older_than: datetime):
+        """
+        Deleted roles still referenced by a user (even a deleted one that
+        has not been purged yet) are kept until that user is gone.
+        """
+        return super()._purgeable(older_than).where(
+            ~exists().where(User.role_id == Role.id)
+        )
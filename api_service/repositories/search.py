@@ -0,0 +1,199 @@
+import re
+
+from sqlalchemy import and_, case, literal, literal_column, or_, union_all
+from sqlmodel import Session, func, select
+from typing import List
+
+from core.tracing import traced
+from models.project import Project
+from models.search import SearchResultType
+from models.user import User
+
+
+@traced
+class SearchRepository:
+    def __init__(self, session: Session):
+        """
+        Full-text search over the `search_vector` columns of the project
+        and user tables (see models/project.py and models/user.py).
+
+        Databases without full-text columns (SQLite) fall back to matching
+        word prefixes with LIKE, which scans the tables.
+
+        Args:
+            session: The database session (sqlmodel.Session).
+        """
+        self.session = session
+        self.dialect = session.get_bind().dialect.name
+
+    @staticmethod
+    def words(text: str) -> List[str]:
+        """
+        Splits free text into lowercase words.
+        """
+        return re.findall(r"[^\W_]+", text.lower())
+
+    @staticmethod
+    def build_tsquery(text: str) -> str | None:
+        """
+        Turns free text into a prefix-matching tsquery: every word must
+        match, and the words may be the beginning of a longer one (so
+        "dev eng" finds "Developer Engineering").
+
+        Args:
+            text: The text typed by the user.
+
+        Returns:
+            The tsquery expression, or None if the text has no words.
+        """
+        words = SearchRepository.words(text)
+        if not words:
+            return None
+        return " & ".join(f"{word}:*" for word in words)
+
+    def _branch(
+        self,
+        type: SearchResultType,
+        model,
+        vector_column: str,
+        detail,
+        query,
+        window: int
+    ):
+        vector = literal_column(vector_column)
+        rank = func.ts_rank(vector, query)
+        return (
+            select(
+                literal(type.value).label("type"),
+                model.id.label("id"),
+                model.name.label("title"),
+                detail.label("detail"),
+                rank.label("rank")
+            )
+            .where(vector.op("@@")(query), model.deleted_at.is_(None))
+            .order_by(rank.desc())
+            .limit(window)
+        )
+
+    def _like_branch(
+        self,
+        type: SearchResultType,
+        model,
+        detail,
+        words: List[str],
+        window: int
+    ):
+        def starts_word(column, word):
+            return or_(
+                column.ilike(f"{word}%"),
+                column.ilike(f"% {word}%")
+            )
+
+        # Same weights as the search vectors: the title (A) counts more
+        # than the detail (B).
+        rank = sum(
+            case((starts_word(model.name, word), 1.0), else_=0.0)
+            + case((starts_word(detail, word), 0.4), else_=0.0)
+            for word in words
+        ) / len(words)
+        return (
+            select(
+                literal(type.value).label("type"),
+                model.id.label("id"),
+                model.name.label("title"),
+                detail.label("detail"),
+                rank.label("rank")
+            )
+            .where(
+                and_(*(
+                    or_(starts_word(model.name, word), starts_word(detail, word))
+                    for word in words
+                )),
+                model.deleted_at.is_(None)
+            )
+            .order_by(rank.desc())
+            .limit(window)
+        )
+
+    def search(
+        self,
+        text: str,
+        types: List[SearchResultType],
+        limit: int,
+        offset: int
+    ) -> list:
+        """
+        Searches projects and users, best matches first.
+
+        Matching rows are found through the GIN indexes. Each entity type
+        contributes at most `offset + limit` of its best matches before the
+        results are merged, so a page never sorts more than that.
+
+        Args:
+            text: The text to search for.
+            types: The entity types to search.
+            limit: The maximum number of results.
+            offset: The number of results to skip.
+
+        Returns:
+            A list of rows with `type`, `id`, `title`, `detail` and `rank`.
+        """
+        tsquery = self.build_tsquery(text)
+        if tsquery is None or not types:
+            return []
+        window = offset + limit
+        branches = []
+        if self.dialect != "postgresql":
+            words = self.words(text)
+            if SearchResultType.PROJECT in types:
+                branches.append(self._like_branch(
+                    SearchResultType.PROJECT,
+                    Project,
+                    Project.description,
+                    words,
+                    window
+                ))
+            if SearchResultType.USER in types:
+                branches.append(self._like_branch(
+                    SearchResultType.USER,
+                    User,
+                    User.position,
+                    words,
+                    window
+                ))
+            return self._merge(branches, limit, offset)
+
+        query = func.to_tsquery("simple", tsquery)
+        if SearchResultType.PROJECT in types:
+            branches.append(self._branch(
+                SearchResultType.PROJECT,
+                Project,
+                "project.search_vector",
+                Project.description,
+                query,
+                window
+            ))
+        if SearchResultType.USER in types:
+            branches.append(self._branch(
+                SearchResultType.USER,
+                User,
+                '"user".search_vector',
+                User.position,
+                query,
+                window
+            ))
+        return self._merge(branches, limit, offset)
+
+    def _merge(self, branches: list, limit: int, offset: int) -> list:
+        # Each branch is wrapped in a subquery: SQLite does not accept
+        # ORDER BY/LIMIT on the members of a UNION.
+        results = union_all(
+            *(select(*branch.subquery().c) for branch in branches)
+        ).subquery()
+        statement = (
+            select(*results.c)
+            .order_by(results.c.rank.desc(), results.c.type, results.c.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        return self.session.exec(statement).all()
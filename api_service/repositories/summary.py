@@ -0,0 +1,167 @@
+from sqlalchemy import and_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import delete, func, select
+
+from repositories.base import BaseRepository, in_ids
+from models.project import Project, ProjectStatus, UserProject
+from models.summary import ProjectSummary
+from models.user import User
+
+
+class ProjectSummaryRepository(BaseRepository):
+    def __init__(self, session):
+        """
+        Initializes the project summary repository.
+
+        Args:
+            session: The database session (sqlmodel.Session).
+        """
+        super().__init__(model=ProjectSummary, session=session)
+
+    def _aggregate(self):
+        # One row per live project and role of its live members; a project
+        # without members gets one row with a NULL role and a count of 0.
+        return (
+            select(
+                Project.id,
+                Project.name,
+                Project.status,
+                User.role_id,
+                func.count(User.id)
+            )
+            .select_from(Project)
+            .outerjoin(UserProject, UserProject.project_id == Project.id)
+            .outerjoin(User, and_(
+                User.id == UserProject.user_id,
+                User.deleted_at.is_(None)
+            ))
+            .where(
+                in_ids(Project.id, self.dialect),
+                Project.deleted_at.is_(None)
+            )
+            .group_by(Project.id, Project.name, Project.status, User.role_id)
+        )
+
+    def _upsert(self):
+        insert = (
+            postgresql.insert if self.dialect == "postgresql"
+            else sqlite.insert
+        )
+        statement = insert(ProjectSummary)
+        return statement.on_conflict_do_update(
+            index_elements=[ProjectSummary.project_id],
+            set_={
+                "name": statement.excluded.name,
+                "status": statement.excluded.status,
+                "member_count": statement.excluded.member_count,
+                "role_counts": statement.excluded.role_counts,
+                "refreshed_at": func.now()
+            }
+        )
+
+    def refresh(self, project_ids: list[int]) -> None:
+        """
+        Recomputes the summaries of some projects from the projects, their
+        memberships and the roles of their members, in one aggregate query
+        and one upsert whatever the number of projects. Summaries of
+        projects that are deleted (or don't exist) are removed.
+
+        Writes call it with the projects they touched once their changes
+        are flushed, so the summaries are committed with them.
+
+        Args:
+            project_ids: The identifiers of the projects.
+        """
+        project_ids = list(dict.fromkeys(project_ids))
+        if not project_ids:
+            return
+        rows = self.session.exec(
+            self._statement("aggregate", self._aggregate),
+            params={"ids": project_ids}
+        ).all()
+        summaries = {}
+        for project_id, name, status, role_id, members in rows:
+            summary = summaries.setdefault(project_id, {
+                "project_id": project_id,
+                "name": name,
+                "status": status,
+                "member_count": 0,
+                "role_counts": {}
+            })
+            if role_id is not None:
+                summary["member_count"] += members
+                summary["role_counts"][str(role_id)] = members
+        if summaries:
+            self.session.exec(
+                self._statement("upsert", self._upsert),
+                params=list(summaries.values())
+            )
+        gone_ids = [id for id in project_ids if id not in summaries]
+        if gone_ids:
+            self.session.exec(
+                delete(ProjectSummary)
+                .where(ProjectSummary.project_id.in_(gone_ids))
+            )
+
+    def refresh_for_user(self, user_id: int) -> None:
+        """
+        Recomputes the summaries of all the projects of a user, after a
+        change to the user that alters their member counts or role
+        breakdowns (a new role, a deletion).
+
+        Args:
+            user_id: The identifier of the user.
+        """
+        statement = select(UserProject.project_id).where(
+            UserProject.user_id == user_id
+        )
+        self.refresh(list(self.session.exec(statement).all()))
+
+    def get_page(
+        self,
+        status: ProjectStatus | None = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> list[ProjectSummary]:
+        """
+        Retrieves summaries by project ID, one row per project.
+
+        Args:
+            status: Only the summaries of projects with this status are
+                    returned, if given.
+            limit: The maximum number of summaries returned.
+            offset: The number of summaries skipped.
+
+        Returns:
+            A list of project summaries.
+        """
+        statement = select(ProjectSummary)
+        if status is not None:
+            statement = statement.where(ProjectSummary.status == status)
+        statement = (
+            statement
+            .order_by(ProjectSummary.project_id)
+            .offset(offset)
+            .limit(limit)
+        )
+        return self.session.exec(statement).all()
+
+    def get_project_ids_after(self, after_id: int, limit: int) -> list[int]:
+        """
+        Retrieves the next batch of project IDs, live or deleted, for the
+        keyset-paginated rebuild of every summary.
+
+        Args:
+            after_id: Only IDs greater than this one are returned.
+            limit: The maximum number of IDs returned.
+
+        Returns:
+            A list of project IDs, in ascending order.
+        """
+        statement = (
+            select(Project.id)
+            .where(Project.id > after_id)
+            .order_by(Project.id)
+            .limit(limit)
+        )
+        return list(self.session.exec(statement).all())
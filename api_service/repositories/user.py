@@ -1,7 +1,20 @@
+from sqlalchemy import and_, exists, insert, literal, update
+from sqlmodel import delete, func, select
+
 from repositories.base import BaseRepository
+from models.project import Project, ProjectStatus, UserProject
+from models.role import Role
 from models.user import User
 
 
+# Statuses of the projects a user is still working on.
+ACTIVE_STATUSES = (
+    ProjectStatus.PLANNING,
+    ProjectStatus.IN_PROGRESS,
+    ProjectStatus.ON_HOLD,
+)
+
+
 class UserRepository(BaseRepository):
     def __init__(self, session):
         """
@@ -10,4 +23,124 @@ class UserRepository(BaseRepository):
         Args:
             session: The database session (sqlmodel.Session).
         """
-        super().__init__(model=User, session=session)
\ No newline at end of file
+        super().__init__(model=User, session=session)
+
+    def _live_role(self, role_id: int):
+        return and_(Role.id == role_id, Role.deleted_at.is_(None))
+
+    def create_with_live_role(self, user: User) -> User | None:
+        """
+        Inserts a user with a single INSERT ... SELECT from its role, so
+        the user is only created if the role exists and is not deleted (the
+        foreign key alone accepts deleted roles).
+
+        Args:
+            user: The user to create (not added to the session).
+
+        Returns:
+            The created user, with its generated values, or None if the
+            role doesn't exist or is deleted.
+        """
+        statement = (
+            insert(User)
+            .from_select(
+                ["name", "position", "role_id"],
+                select(
+                    literal(user.name),
+                    literal(user.position),
+                    Role.id
+                ).where(self._live_role(user.role_id))
+            )
+            .returning(User)
+        )
+        return self.session.scalars(statement).first()
+
+    def update_with_live_role(self, id: int, values: dict) -> User | None:
+        """
+        Updates a live user, including its role, with a single UPDATE that
+        only matches if the new role exists and is not deleted.
+
+        Args:
+            id: The identifier of the user.
+            values: The new values of the fields, with `role_id`.
+
+        Returns:
+            The updated user (the instance of the session, refreshed), or
+            None if the user or the role doesn't exist or is deleted.
+        """
+        statement = (
+            update(User)
+            .where(
+                User.id == id,
+                User.deleted_at.is_(None),
+                exists().where(self._live_role(values["role_id"]))
+            )
+            .values(**values)
+            .returning(User)
+            .execution_options(
+                synchronize_session=False,
+                populate_existing=True
+            )
+        )
+        return self.session.scalars(statement).first()
+
+    def _purge_dependents(self, ids: list[int]) -> None:
+        """
+        Removes the project memberships of the users about to be purged.
+        """
+        self.session.exec(
+            delete(UserProject).where(UserProject.user_id.in_(ids))
+        )
+
+    def get_workload(
+        self,
+        role_id: int | None = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> list:
+        """
+        Counts the live projects of each live user, per project status, in
+        a single aggregated query over user_project and project.
+
+        Args:
+            role_id: Only users with this role are counted, if given.
+            limit: The maximum number of users returned.
+            offset: The number of users to skip.
+
+        Returns:
+            A list of rows with `user_id`, `full_name`, `role_name`,
+            `active_projects` and one count per ProjectStatus name, most
+            loaded users first.
+        """
+        counts = [
+            func.count(Project.id).filter(Project.status == status)
+            .label(status.name)
+            for status in ProjectStatus
+        ]
+        active = func.count(Project.id).filter(
+            Project.status.in_(ACTIVE_STATUSES)
+        )
+        statement = (
+            select(
+                User.id.label("user_id"),
+                User.name.label("full_name"),
+                Role.name.label("role_name"),
+                active.label("active_projects"),
+                *counts
+            )
+            .select_from(User)
+            .outerjoin(Role, Role.id == User.role_id)
+            .outerjoin(UserProject, UserProject.user_id == User.id)
+            .outerjoin(Project, and_(
+                Project.id == UserProject.project_id,
+                Project.deleted_at.is_(None)
+            ))
+            .where(User.deleted_at.is_(None))
+            .group_by(User.id, Role.name)
+            .order_by(active.desc(), User.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        if role_id is not None:
+            statement = statement.where(User.role_id == role_id)
+        return self.session.exec(statement).all()
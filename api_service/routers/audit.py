@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session
+from datetime import datetime
+from typing import Optional
+
+from core.db import get_session
+from core.http import check_window
+from core.negotiation import MsgPackRoute
+from core.ratelimit import LIST_COST, RATE_LIMIT_COST_KEY
+from models.audit import AuditAction, AuditEntity, AuditPage
+from models.message import ErrorDetail
+from services.audit import AuditService
+from services.exceptions import InvalidCursorError
+
+
+router = APIRouter(
+    prefix="/audit",
+    tags=["audit"],
+    route_class=MsgPackRoute,
+)
+
+
+@router.get(
+    "/",
+    response_model=AuditPage,
+    status_code=200,
+    openapi_extra={RATE_LIMIT_COST_KEY: LIST_COST},
+    responses={
+        200: {
+            "description": "Audit entries retrieved successfully",
+            "model": AuditPage
+        },
+        400: {
+            "description": "Invalid cursor, or the window ends before it "
+                           "begins",
+            "model": ErrorDetail
+        }
+    }
+)
+def read_audit_log(
+    entity: Optional[AuditEntity] = None,
+    entity_id: Optional[int] = None,
+    action: Optional[AuditAction] = None,
+    actor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    session: Session = Depends(get_session)
+) -> AuditPage:
+    """
+    Retrieve who changed what: the changes made to projects (including
+    their members), users and roles, most recent first, with the fields
+    changed and their old and new values.
+    Pass the `next_cursor` of a page as `cursor` to get the next one. Use
+    `since` and `until` to only read a time window, which is also faster.
+    Entries are written shortly after the changes are committed.
+    """
+    check_window(since, until)
+    audit_service = AuditService(session=session)
+    try:
+        return audit_service.get_entries(
+            entity=entity,
+            entity_id=entity_id,
+            action=action,
+            actor=actor,
+            since=since,
+            until=until,
+            cursor=cursor,
+            limit=limit
+        )
+    except InvalidCursorError as error:
+        raise HTTPException(status_code=400, detail=str(error))
@@ -0,0 +1,82 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.orm import Session
+
+from core.db import get_session
+from core.negotiation import MsgPackRoute
+from models.job import JobCreate, JobPublic
+from models.message import ErrorDetail
+from services.exceptions import InvalidJobError
+from services.job import JobService
+
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["jobs"],
+    route_class=MsgPackRoute,
+)
+
+
+@router.post(
+    "/",
+    response_model=JobPublic,
+    status_code=202,
+    responses={
+        202: {
+            "description": "Job queued. Poll the URL in the Location header "
+                           "to follow its progress",
+            "model": JobPublic
+        },
+        422: {
+            "description": "Unknown job type or invalid payload",
+            "model": ErrorDetail
+        },
+        500: {
+            "description": "Error queuing job",
+            "model": ErrorDetail
+        }
+    }
+)
+def create_job(
+    job: JobCreate,
+    response: Response,
+    session: Session = Depends(get_session)
+) -> JobPublic:
+    """
+    Queue a long-running operation to be run by the worker.
+    """
+    job_service = JobService(session=session)
+    try:
+        job = job_service.enqueue_job(job)
+    except InvalidJobError as error:
+        raise HTTPException(status_code=422, detail=str(error))
+    response.headers["Location"] = f"{router.prefix}/{job.id}"
+    return job
+
+
+@router.get(
+    "/{job_id}",
+    response_model=JobPublic,
+    status_code=200,
+    responses={
+        200: {
+            "description": "Job retrieved successfully",
+            "model": JobPublic
+        },
+        404: {
+            "description": "Job not found",
+            "model": ErrorDetail
+        }
+    }
+)
+def read_job(
+    job_id: int,
+    session: Session = Depends(get_session)
+) -> JobPublic:
+    """
+    Retrieve a job, with its status and progress, by its ID.
+    """
+    job_service = JobService(session=session)
+    job = job_service.get_job_by_id(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -1,26 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
 from core.db import get_session
+from core.http import (
+    check_not_modified,
+    check_window,
+    parse_id_list,
+    set_missing_ids
+)
+from core.idempotency import IDEMPOTENT_KEY, IdempotentRoute
+from core.ratelimit import LIST_COST, RATE_LIMIT_COST_KEY
 from models.message import MessageResponse, ErrorDetail
-from models.project import ProjectCreate, ProjectPublic, ProjectUpdate
+from models.project import (
+    ProjectCreate,
+    ProjectNode,
+    ProjectPublic,
+    ProjectRollup,
+    ProjectStatus,
+    ProjectUpdate
+)
+from models.summary import ProjectSummaryPublic
+from services.exceptions import (
+    ConflictError,
+    InvalidParentError,
+    NotFoundError
+)
 from services.project import ProjectService, UserProjectService
 
 
 router = APIRouter(
     prefix="/project",
     tags=["project"],
+    route_class=IdempotentRoute,
 )
 @router.post(
     "/",
     response_model=ProjectPublic,
     status_code=200,
+    openapi_extra={IDEMPOTENT_KEY: True},
     responses={
         200: {
             "description": "Project created successfully",
             "model": ProjectPublic
         },
+        404: {
+            "description": "The parent project or some of the initial "
+                           "users were not found",
+            "model": ErrorDetail
+        },
         500: {
             "description": "Error creating project",
             "model": ErrorDetail
@@ -33,26 +62,137 @@ def create_project(
 ) -> ProjectPublic:
     """
     Create a new project.
+    Use `parent_id` to create it as a sub-project of another project and
+    `user_ids` to staff it with its initial team in the same request.
     """
     project_service = ProjectService(session=session)
-    project = project_service.create_project(project)
-    if not project:
-        raise HTTPException(status_code=500, detail="Error creating project")
+    try:
+        project = project_service.create_project(project)
+    except NotFoundError as error:
+        raise HTTPException(status_code=404, detail=str(error))
     return project
 
 
-@router.get("/", response_model=List[ProjectPublic], status_code=200)
+@router.get(
+    "/",
+    response_model=List[ProjectPublic],
+    status_code=200,
+    openapi_extra={RATE_LIMIT_COST_KEY: LIST_COST},
+    responses={
+        200: {
+            "description": "Projects retrieved successfully. When `ids` is "
+                           "given, the IDs not found are listed in the "
+                           "X-Missing-Ids header",
+            "model": List[ProjectPublic]
+        },
+        400: {
+            "description": "Invalid or too many ids",
+            "model": ErrorDetail
+        }
+    }
+)
 def read_projects(
+    response: Response,
+    ids: Optional[str] = Query(
+        default=None,
+        description="Comma-separated list of project IDs to retrieve"
+    ),
+    updated_since: Optional[datetime] = None,
+    include_deleted: bool = False,
     session: Session = Depends(get_session)
 ) -> List[ProjectPublic]:
     """
     Retrieve a list of projects.
+    Use `updated_since` to only fetch projects modified since the last sync
+    and `include_deleted` to also receive deleted projects (with `deleted_at`
+    set).
+    Use `ids` to fetch several projects by ID at once, in the given order
+    (`updated_since` is ignored then).
     """
     project_service = ProjectService(session=session)
-    projects = project_service.get_projects()
+    if ids is not None:
+        projects, missing_ids = project_service.get_projects_by_ids(
+            ids=parse_id_list(ids),
+            include_deleted=include_deleted
+        )
+        set_missing_ids(response, missing_ids)
+        return projects
+    projects = project_service.get_projects(
+        updated_since=updated_since,
+        include_deleted=include_deleted
+    )
     return projects
 
 
+@router.get(
+    "/active",
+    response_model=List[ProjectPublic],
+    status_code=200,
+    openapi_extra={RATE_LIMIT_COST_KEY: LIST_COST},
+    responses={
+        200: {
+            "description": "Active projects retrieved successfully",
+            "model": List[ProjectPublic]
+        },
+        400: {
+            "description": "The window ends before it begins",
+            "model": ErrorDetail
+        }
+    }
+)
+def read_active_projects(
+    begin: Optional[datetime] = Query(
+        default=None,
+        alias="from",
+        description="Start of the window (open if omitted)"
+    ),
+    end: Optional[datetime] = Query(
+        default=None,
+        alias="to",
+        description="End of the window (open if omitted)"
+    ),
+    session: Session = Depends(get_session)
+) -> List[ProjectPublic]:
+    """
+    Retrieve the projects active during a time window, i.e. whose begin and
+    end dates overlap it. A project without an end date is active from its
+    begin date on.
+    """
+    check_window(begin, end)
+    project_service = ProjectService(session=session)
+    return project_service.get_active_projects(begin=begin, end=end)
+
+
+@router.get(
+    "/summary",
+    response_model=List[ProjectSummaryPublic],
+    status_code=200,
+    openapi_extra={RATE_LIMIT_COST_KEY: LIST_COST},
+    responses={
+        200: {
+            "description": "Project summaries retrieved successfully",
+            "model": List[ProjectSummaryPublic]
+        }
+    }
+)
+def read_project_summaries(
+    status: Optional[ProjectStatus] = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    offset: int = Query(default=0, ge=0),
+    session: Session = Depends(get_session)
+) -> List[ProjectSummaryPublic]:
+    """
+    Retrieve the dashboard view of the projects: name, status, member count
+    and members per role, one precomputed row per project, by project ID.
+    """
+    project_service = ProjectService(session=session)
+    return project_service.get_summaries(
+        status=status,
+        limit=limit,
+        offset=offset
+    )
+
+
 @router.get(
     "/{project_id}",
     response_model=ProjectPublic,
@@ -62,6 +202,9 @@ def read_projects(
             "description": "Project retrieved successfully",
             "model": ProjectPublic
         },
+        304: {
+            "description": "Project not modified since If-Modified-Since"
+        },
         404: {
             "description": "Project not found",
             "model": ErrorDetail
@@ -70,6 +213,8 @@ def read_projects(
 )
 def read_project(
     project_id: int,
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session)
 ) -> ProjectPublic:
     """
@@ -79,9 +224,74 @@ def read_project(
     project = project_service.get_project_by_id(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
+    not_modified = check_not_modified(request, response, project.updated_at)
+    if not_modified:
+        return not_modified
     return project
 
 
+@router.get(
+    "/{project_id}/subtree",
+    response_model=List[ProjectNode],
+    status_code=200,
+    openapi_extra={RATE_LIMIT_COST_KEY: LIST_COST},
+    responses={
+        200: {
+            "description": "Sub-projects retrieved successfully",
+            "model": List[ProjectNode]
+        },
+        404: {
+            "description": "Project not found",
+            "model": ErrorDetail
+        }
+    }
+)
+def read_project_subtree(
+    project_id: int,
+    session: Session = Depends(get_session)
+) -> List[ProjectNode]:
+    """
+    Retrieve all the sub-projects of a project, at any depth, grouped by
+    parent. `depth` is 1 for the direct children of the project.
+    """
+    project_service = ProjectService(session=session)
+    subtree = project_service.get_subtree(project_id)
+    if subtree is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return subtree
+
+
+@router.get(
+    "/{project_id}/rollup",
+    response_model=ProjectRollup,
+    status_code=200,
+    responses={
+        200: {
+            "description": "Rollup computed successfully",
+            "model": ProjectRollup
+        },
+        404: {
+            "description": "Project not found",
+            "model": ErrorDetail
+        }
+    }
+)
+def read_project_rollup(
+    project_id: int,
+    session: Session = Depends(get_session)
+) -> ProjectRollup:
+    """
+    Sum up a project together with all its sub-projects: how many there
+    are per status, how many distinct users work on them and the period
+    they span.
+    """
+    project_service = ProjectService(session=session)
+    rollup = project_service.get_rollup(project_id)
+    if rollup is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return rollup
+
+
 @router.put(
     "/{project_id}",
     response_model=ProjectPublic,
@@ -92,7 +302,12 @@ def read_project(
             "model": ProjectPublic
         },
         400: {
-            "description": "Project not found",
+            "description": "Project not found, or moved under one of its "
+                           "sub-projects",
+            "model": ErrorDetail
+        },
+        404: {
+            "description": "Parent project not found",
             "model": ErrorDetail
         }
     }
@@ -104,9 +319,16 @@ def update_project(
 ) -> ProjectPublic:
     """
     Update a project by its ID.
+    Set `parent_id` to move the project, with its sub-projects, under
+    another project (or `null` to make it a top-level project).
     """
     project_service = ProjectService(session=session)
-    project = project_service.update_project(project_id, project_update)
+    try:
+        project = project_service.update_project(project_id, project_update)
+    except NotFoundError as error:
+        raise HTTPException(status_code=404, detail=str(error))
+    except InvalidParentError as error:
+        raise HTTPException(status_code=400, detail=str(error))
     if not project:
         raise HTTPException(status_code=400, detail="Project not found")
     return project
@@ -122,7 +344,7 @@ def update_project(
             "model": MessageResponse
         },
         400: {
-            "description": "Project not found",
+            "description": "Project not found or with sub-projects",
             "model": ErrorDetail
         }
     }
@@ -137,7 +359,10 @@ def delete_project(
     project_service = ProjectService(session=session)
     is_deleted = project_service.delete_project(project_id)
     if not is_deleted:
-        raise HTTPException(status_code=400, detail="Project not found")
+        raise HTTPException(
+            status_code=400,
+            detail="Project not found or with sub-projects"
+        )
     return {"message": "Project deleted successfully"}
 
 
@@ -145,13 +370,18 @@ def delete_project(
     "/{project_id}/user",
     response_model=MessageResponse,
     status_code=200,
+    openapi_extra={IDEMPOTENT_KEY: True},
     responses={
         200: {
             "description": "User added to project successfully",
             "model": MessageResponse
         },
-        500: {
-            "description": "Error adding user to project",
+        404: {
+            "description": "User or project not found",
+            "model": ErrorDetail
+        },
+        409: {
+            "description": "The user already is a member of the project",
             "model": ErrorDetail
         }
     }
@@ -165,12 +395,15 @@ def add_user_to_project(
     Add a user to a project.
     """
     user_project_service = UserProjectService(session=session)
-    is_added = user_project_service.add_user_to_project(
-        user_id=user_id,
-        project_id=project_id
-    )
-    if not is_added:
-        raise HTTPException(status_code=500, detail="Error adding user to project")
+    try:
+        user_project_service.add_user_to_project(
+            user_id=user_id,
+            project_id=project_id
+        )
+    except NotFoundError as error:
+        raise HTTPException(status_code=404, detail=str(error))
+    except ConflictError as error:
+        raise HTTPException(status_code=409, detail=str(error))
     return MessageResponse(message="User added to project successfully")
 
 
@@ -183,8 +416,9 @@ def add_user_to_project(
             "description": "User removed from project successfully",
             "model": MessageResponse
         },
-        500: {
-            "description": "Error removing user from project",
+        404: {
+            "description": "Project not found, or the user is not a member "
+                           "of it",
             "model": ErrorDetail
         }
     }
@@ -198,10 +432,11 @@ def remove_user_from_project(
     Remove a user from a project.
     """
     user_project_service = UserProjectService(session=session)
-    is_removed = user_project_service.remove_user_from_project(
-        user_id=user_id,
-        project_id=project_id
-    )
-    if not is_removed:
-        raise HTTPException(status_code=500, detail="Error removing user from project")
+    try:
+        user_project_service.remove_user_from_project(
+            user_id=user_id,
+            project_id=project_id
+        )
+    except NotFoundError as error:
+        raise HTTPException(status_code=404, detail=str(error))
     return MessageResponse(message="User removed from project successfully")
\ No newline at end of file
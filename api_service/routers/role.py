@@ -1,16 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
 from core.db import get_session
+from core.http import check_not_modified, parse_id_list, set_missing_ids
+from core.negotiation import MsgPackRoute
+from core.ratelimit import LIST_COST, RATE_LIMIT_COST_KEY
 from models.role import RoleCreate, RolePublic, RoleUpdate
 from models.message import MessageResponse, ErrorDetail
+from services.exceptions import ConflictError
 from services.role import RoleService
 
 
 router = APIRouter(
     prefix="/role",
     tags=["role"],
+    route_class=MsgPackRoute,
 )
 
 
@@ -23,6 +29,10 @@ router = APIRouter(
             "description": "Role created successfully",
             "model": RolePublic
         },
+        409: {
+            "description": "A role with this name already exists",
+            "model": ErrorDetail
+        },
         500: {
             "description": "Error creating role",
             "model": ErrorDetail
@@ -37,19 +47,61 @@ def create_role(
     Create a new role.
     """
     role_service = RoleService(session=session)
-    role = role_service.create_role(role)
-    if not role:
-        raise HTTPException(status_code=500, detail="Error creating role")
+    try:
+        role = role_service.create_role(role)
+    except ConflictError as error:
+        raise HTTPException(status_code=409, detail=str(error))
     return role
 
 
-@router.get("/", response_model=List[RolePublic], status_code=200)
-def read_roles(session: Session = Depends(get_session)) -> List[RolePublic]:
+@router.get(
+    "/",
+    response_model=List[RolePublic],
+    status_code=200,
+    openapi_extra={RATE_LIMIT_COST_KEY: LIST_COST},
+    responses={
+        200: {
+            "description": "Roles retrieved successfully. When `ids` is "
+                           "given, the IDs not found are listed in the "
+                           "X-Missing-Ids header",
+            "model": List[RolePublic]
+        },
+        400: {
+            "description": "Invalid or too many ids",
+            "model": ErrorDetail
+        }
+    }
+)
+def read_roles(
+    response: Response,
+    ids: Optional[str] = Query(
+        default=None,
+        description="Comma-separated list of role IDs to retrieve"
+    ),
+    updated_since: Optional[datetime] = None,
+    include_deleted: bool = False,
+    session: Session = Depends(get_session)
+) -> List[RolePublic]:
     """
     Retrieve a list of roles.
+    Use `updated_since` to only fetch roles modified since the last sync
+    and `include_deleted` to also receive deleted roles (with `deleted_at`
+    set).
+    Use `ids` to fetch several roles by ID at once, in the given order
+    (`updated_since` is ignored then).
     """
     role_service = RoleService(session=session)
-    roles = role_service.get_roles()
+    if ids is not None:
+        roles, missing_ids = role_service.get_roles_by_ids(
+            ids=parse_id_list(ids),
+            include_deleted=include_deleted
+        )
+        set_missing_ids(response, missing_ids)
+        return roles
+    roles = role_service.get_roles(
+        updated_since=updated_since,
+        include_deleted=include_deleted
+    )
     return roles
 
 
@@ -62,6 +114,9 @@ def read_roles(session: Session = Depends(get_session)) -> List[RolePublic]:
             "description": "Role retrieved successfully",
             "model": RolePublic
         },
+        304: {
+            "description": "Role not modified since If-Modified-Since"
+        },
         404: {
             "description": "Role not found",
             "model": ErrorDetail
@@ -70,6 +125,8 @@ def read_roles(session: Session = Depends(get_session)) -> List[RolePublic]:
 )
 def read_role(
     role_id: int,
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session)
 ) -> RolePublic:
     """
@@ -79,6 +136,9 @@ def read_role(
     role = role_service.get_role_by_id(role_id)
     if not role:
         raise HTTPException(status_code=404, detail="Role not found")
+    not_modified = check_not_modified(request, response, role.updated_at)
+    if not_modified:
+        return not_modified
     return role
 
 
@@ -94,6 +154,10 @@ def read_role(
         400: {
             "description": "Role not found",
             "model": ErrorDetail
+        },
+        409: {
+            "description": "A role with this name already exists",
+            "model": ErrorDetail
         }
     }
 )
@@ -106,7 +170,10 @@ def update_role(
     Update a role by its ID.
     """
     role_service = RoleService(session=session)
-    updated_role = role_service.update_role(role_id, role)
+    try:
+        updated_role = role_service.update_role(role_id, role)
+    except ConflictError as error:
+        raise HTTPException(status_code=409, detail=str(error))
     if not updated_role:
         raise HTTPException(status_code=400, detail="Role not found")
     return updated_role
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session
+from typing import List, Optional
+
+from core.db import get_session
+from core.negotiation import MsgPackRoute
+from models.search import SearchHit, SearchResultType
+from services.search import SearchService
+
+
+router = APIRouter(
+    prefix="/search",
+    tags=["search"],
+    route_class=MsgPackRoute,
+)
+
+
+@router.get("/", response_model=List[SearchHit], status_code=200)
+def search(
+    q: str = Query(min_length=1, max_length=200),
+    type: Optional[SearchResultType] = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0, le=10000),
+    session: Session = Depends(get_session)
+) -> List[SearchHit]:
+    """
+    Search projects by name and description and users by name and position.
+    Partial words match (e.g. `q=dev` finds "Developer"). Results are ranked
+    and paginated with `limit` and `offset`.
+    """
+    search_service = SearchService(session=session)
+    return search_service.search(q=q, type=type, limit=limit, offset=offset)
@@ -1,16 +1,28 @@
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
 from sqlmodel import Session
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
 from core.db import get_session
-from models.user import UserCreate, UserPublic, UserUpdate
+from core.http import (
+    check_not_modified,
+    check_window,
+    parse_id_list,
+    set_missing_ids
+)
+from core.idempotency import IDEMPOTENT_KEY, IdempotentRoute
+from core.ratelimit import LIST_COST, RATE_LIMIT_COST_KEY
+from models.project import ProjectOverlap
+from models.user import UserCreate, UserPublic, UserUpdate, UserWorkload
 from models.message import MessageResponse, ErrorDetail
+from services.exceptions import NotFoundError
 from services.user import UserService
 
 
 router = APIRouter(
     prefix="/user",
     tags=["user"],
+    route_class=IdempotentRoute,
 )
 
 
@@ -18,11 +30,16 @@ router = APIRouter(
     "/", 
     response_model=UserPublic,
     status_code=200,
+    openapi_extra={IDEMPOTENT_KEY: True},
     responses={
         200: {
             "description": "User created successfully",
             "model": UserPublic
         },
+        404: {
+            "description": "Role not found",
+            "model": ErrorDetail
+        },
         500: {
             "description": "Error creating user",
             "model": ErrorDetail
@@ -37,22 +54,98 @@ def create_user(
     Create a new user.
     """
     user_service = UserService(session=session)
-    user = user_service.create_user(user)
-    if not user:
-        raise HTTPException(status_code=500, detail="Error creating user")
+    try:
+        user = user_service.create_user(user)
+    except NotFoundError as error:
+        raise HTTPException(status_code=404, detail=str(error))
     return user
 
 
-@router.get("/", response_model=List[UserPublic], status_code=200)
-def read_users(session: Session = Depends(get_session)) -> List[UserPublic]:
+@router.get(
+    "/",
+    response_model=List[UserPublic],
+    status_code=200,
+    openapi_extra={RATE_LIMIT_COST_KEY: LIST_COST},
+    responses={
+        200: {
+            "description": "Users retrieved successfully. When `ids` is "
+                           "given, the IDs not found are listed in the "
+                           "X-Missing-Ids header",
+            "model": List[UserPublic]
+        },
+        400: {
+            "description": "Invalid or too many ids",
+            "model": ErrorDetail
+        }
+    }
+)
+def read_users(
+    response: Response,
+    ids: Optional[str] = Query(
+        default=None,
+        description="Comma-separated list of user IDs to retrieve"
+    ),
+    updated_since: Optional[datetime] = None,
+    include_deleted: bool = False,
+    session: Session = Depends(get_session)
+) -> List[UserPublic]:
     """
     Retrieve a list of users.
+    Use `updated_since` to only fetch users modified since the last sync
+    and `include_deleted` to also receive deleted users (with `deleted_at`
+    set).
+    Use `ids` to fetch several users by ID at once, in the given order
+    (`updated_since` is ignored then).
     """
     user_service = UserService(session=session)
-    users = user_service.get_users()
+    if ids is not None:
+        users, missing_ids = user_service.get_users_by_ids(
+            ids=parse_id_list(ids),
+            include_deleted=include_deleted
+        )
+        set_missing_ids(response, missing_ids)
+        return users
+    users = user_service.get_users(
+        updated_since=updated_since,
+        include_deleted=include_deleted
+    )
     return users
 
 
+@router.get(
+    "/workload",
+    response_model=List[UserWorkload],
+    status_code=200,
+    openapi_extra={RATE_LIMIT_COST_KEY: LIST_COST},
+    responses={
+        200: {
+            "description": "Workload report computed successfully",
+            "model": List[UserWorkload]
+        }
+    }
+)
+def read_workload(
+    role_id: Optional[int] = Query(
+        default=None,
+        description="Only report users with this role"
+    ),
+    limit: int = Query(default=50, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    session: Session = Depends(get_session)
+) -> List[UserWorkload]:
+    """
+    Report how many projects each user is on, per project status, most
+    loaded users first. `active_projects` counts the projects planned, in
+    progress or on hold.
+    """
+    user_service = UserService(session=session)
+    return user_service.get_workload(
+        role_id=role_id,
+        limit=limit,
+        offset=offset
+    )
+
+
 @router.get(
     "/{user_id}",
     response_model=UserPublic,
@@ -62,6 +155,9 @@ def read_users(session: Session = Depends(get_session)) -> List[UserPublic]:
             "description": "User queried successfully",
             "model": UserPublic
         },
+        304: {
+            "description": "User not modified since If-Modified-Since"
+        },
         404: {
             "description": "User not found",
             "model": ErrorDetail
@@ -70,6 +166,8 @@ def read_users(session: Session = Depends(get_session)) -> List[UserPublic]:
 )
 def read_user(
     user_id: int,
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session)
 ) -> UserPublic:
     """
@@ -79,9 +177,62 @@ def read_user(
     user = user_service.get_user_by_id(id=user_id)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
+    not_modified = check_not_modified(request, response, user.updated_at)
+    if not_modified:
+        return not_modified
     return user
 
 
+@router.get(
+    "/{user_id}/overlaps",
+    response_model=List[ProjectOverlap],
+    status_code=200,
+    responses={
+        200: {
+            "description": "Overlapping projects retrieved successfully",
+            "model": List[ProjectOverlap]
+        },
+        400: {
+            "description": "The window ends before it begins",
+            "model": ErrorDetail
+        },
+        404: {
+            "description": "User not found",
+            "model": ErrorDetail
+        }
+    }
+)
+def read_user_overlaps(
+    user_id: int,
+    begin: Optional[datetime] = Query(
+        default=None,
+        alias="from",
+        description="Only report overlaps after this moment"
+    ),
+    end: Optional[datetime] = Query(
+        default=None,
+        alias="to",
+        description="Only report overlaps before this moment"
+    ),
+    session: Session = Depends(get_session)
+) -> List[ProjectOverlap]:
+    """
+    Check whether a user is booked on projects whose periods overlap.
+    Every pair of overlapping projects is listed with the overlapping
+    period.
+    """
+    check_window(begin, end)
+    user_service = UserService(session=session)
+    overlaps = user_service.get_project_overlaps(
+        id=user_id,
+        begin=begin,
+        end=end
+    )
+    if overlaps is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return overlaps
+
+
 @router.put(
     "/{user_id}",
     response_model=UserPublic,
@@ -94,6 +245,10 @@ def read_user(
         400: {
             "description": "User not found or update failed",
             "model": ErrorDetail
+        },
+        404: {
+            "description": "Role not found",
+            "model": ErrorDetail
         }
     }
 )
@@ -107,7 +262,13 @@ def update_user(
     Only fields provided in the request body will be updated.
     """
     user_service = UserService(session=session)
-    updated_user = user_service.update_user(id=user_id, user_update=user_update)
+    try:
+        updated_user = user_service.update_user(
+            id=user_id,
+            user_update=user_update
+        )
+    except NotFoundError as error:
+        raise HTTPException(status_code=404, detail=str(error))
     if updated_user is None:
         raise HTTPException(status_code=400, detail="User not found or update failed")
     return updated_user
@@ -143,9 +304,6 @@ def delete_user(
 
     if is_deleted is None:
         raise HTTPException(status_code=400, detail="User not found")
-    elif is_deleted is False:
-        raise HTTPException(status_code=500, detail="Error deleting user")
-    else:
-        return MessageResponse(
-            message=f"User with id {user_id} deleted successfully"
-        )
\ No newline at end of file
+    return MessageResponse(
+        message=f"User with id {user_id} deleted successfully"
+    )
\ No newline at end of file
@@ -0,0 +1,171 @@
+import logging
+import multiprocessing
+import os
+
+from uvicorn import Config, Server
+from uvicorn.supervisors.multiprocess import Multiprocess, Process
+
+from core.cache import CACHE_BACKEND
+from core.logging import configure_logging
+from core.ratelimit import RATE_LIMIT_BACKEND, RATE_LIMIT_ENABLED
+
+
+SERVE_HOST = os.getenv("SERVE_HOST", "0.0.0.0")
+SERVE_PORT = int(os.getenv("SERVE_PORT", "8000"))
+# Number of API processes (0 runs one per CPU).
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "0")) or os.cpu_count()
+# Database connections all the API processes may hold together. PostgreSQL
+# accepts 100 by default; the rest is left to the job worker and admin
+# sessions.
+DB_POOL_BUDGET = int(os.getenv("DB_POOL_BUDGET", "60"))
+# Seconds a stopping process has to finish its in-flight requests.
+SERVE_GRACEFUL_TIMEOUT = int(os.getenv("SERVE_GRACEFUL_TIMEOUT", "30"))
+# Seconds a new process has to start serving during a reload.
+SERVE_STARTUP_TIMEOUT = int(os.getenv("SERVE_STARTUP_TIMEOUT", "60"))
+
+
+logger = logging.getLogger("uvicorn.error")
+
+spawn = multiprocessing.get_context("spawn")
+
+
+def pool_settings(workers: int, budget: int = DB_POOL_BUDGET) -> dict[str, int]:
+    """
+    Splits the global connection budget between the API processes.
+
+    Each process keeps half of its share open and opens the rest only under
+    load, so idle processes don't hold on to connections.
+
+    Args:
+        workers (int): The number of API processes.
+        budget (int): The connections all the processes may hold together.
+
+    Returns:
+        dict[str, int]: The pool settings of each process, as environment
+        variables read by core.db.
+    """
+    share = max(1, budget // workers)
+    pool_size = max(1, share // 2)
+    return {
+        "DB_POOL_SIZE": pool_size,
+        "DB_MAX_OVERFLOW": share - pool_size
+    }
+
+
+class ReadyServer(Server):
+    def __init__(self, config: Config, ready) -> None:
+        """
+        A uvicorn server that reports when it accepts requests.
+
+        Args:
+            config (Config): The server configuration.
+            ready: A multiprocessing event set once the application has
+            started and the server listens.
+        """
+        super().__init__(config=config)
+        self.ready = ready
+
+    async def startup(self, sockets=None) -> None:
+        await super().startup(sockets=sockets)
+        if self.started:
+            self.ready.set()
+
+
+class RollingMultiprocess(Multiprocess):
+    """
+    Uvicorn's process supervisor, with a reload that never leaves the
+    listening socket without ready processes.
+    """
+
+    def restart_all(self) -> None:
+        """
+        Replaces the processes one at a time on SIGHUP.
+
+        Each replacement (running the code deployed at that point) is started
+        first; the process it replaces is only stopped once the replacement
+        serves, and then finishes its in-flight requests. If a replacement
+        fails to start, the reload is abandoned and the remaining processes
+        keep running the previous code.
+        """
+        for index, process in enumerate(self.processes):
+            ready = spawn.Event()
+            replacement = Process(
+                self.config,
+                ReadyServer(self.config, ready).run,
+                self.sockets
+            )
+            replacement.start()
+            if not ready.wait(SERVE_STARTUP_TIMEOUT):
+                logger.error(
+                    "Child process [%s] did not start, reload abandoned",
+                    replacement.pid
+                )
+                replacement.kill()
+                replacement.join()
+                return
+            self.processes[index] = replacement
+            process.terminate()
+            process.join()
+        logger.info("Reloaded %s child processes", len(self.processes))
+
+
+def main() -> None:
+    workers = max(1, WEB_CONCURRENCY)
+    # The processes inherit the environment, so core.db sizes their pools
+    # from it. Explicit settings win.
+    for name, value in pool_settings(workers).items():
+        os.environ.setdefault(name, str(value))
+
+    config = Config(
+        "main:app",
+        host=SERVE_HOST,
+        port=SERVE_PORT,
+        workers=workers,
+        proxy_headers=True,
+        timeout_graceful_shutdown=SERVE_GRACEFUL_TIMEOUT
+    )
+    config.configure_logging()
+    configure_logging()
+    if DB_POOL_BUDGET < workers:
+        logger.warning(
+            "DB_POOL_BUDGET=%s is lower than the %s processes: each still "
+            "gets a connection", DB_POOL_BUDGET, workers
+        )
+    if workers > 1:
+        if CACHE_BACKEND == "memory":
+            logger.warning(
+                "CACHE_BACKEND=memory: each of the %s processes keeps its "
+                "own cache", workers
+            )
+        if RATE_LIMIT_ENABLED and RATE_LIMIT_BACKEND == "memory":
+            logger.warning(
+                "RATE_LIMIT_BACKEND=memory: each of the %s processes "
+                "enforces its own limits", workers
+            )
+
+    # The tables (and the audit log partitions) are created once here
+    # rather than by every process starting at once, which would race on
+    # the DDL. The application is imported late so the pool settings above
+    # apply to it.
+    import main as application
+    application.create_db_and_tables()
+    application.maintain_audit_partitions()
+    application.engine.dispose()
+    # The processes skip it then: they read the flag when they import the
+    # application, and a single process reuses the module imported here.
+    os.environ["SCHEMA_READY"] = "true"
+    application.SCHEMA_READY = True
+
+    socket = config.bind_socket()
+    if workers == 1:
+        Server(config=config).run(sockets=[socket])
+        return
+    RollingMultiprocess(
+        config,
+        target=Server(config=config).run,
+        sockets=[socket]
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import base64
+import binascii
+import os
+
+from datetime import date, datetime
+from sqlmodel import Session
+
+from core.tracing import traced
+from models.audit import AuditAction, AuditEntity, AuditEntryPublic, AuditPage
+from repositories.audit import AuditRepository
+from services.exceptions import InvalidCursorError
+
+
+# Monthly partitions of the audit log created in advance (Postgres).
+AUDIT_PARTITIONS_AHEAD = int(os.getenv("AUDIT_PARTITIONS_AHEAD", "2"))
+# Months of audit entries kept, the current one included (0 keeps them
+# all). Older months are dropped a partition at a time (Postgres).
+AUDIT_RETENTION_MONTHS = int(os.getenv("AUDIT_RETENTION_MONTHS", "0"))
+
+
+def encode_cursor(occurred_at: datetime, id: int) -> str:
+    """
+    Encodes the position of an audit entry as an opaque cursor.
+    """
+    value = f"{occurred_at.isoformat()}|{id}"
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decodes a cursor made by encode_cursor.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed.
+    """
+    try:
+        occurred_at, id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        )
+        return datetime.fromisoformat(occurred_at), int(id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as error:
+        raise InvalidCursorError("Invalid cursor") from error
+
+
+@traced
+class AuditService:
+    def __init__(self, session: Session) -> None:
+        """
+        Initializes the AuditService with the given database session.
+
+        Args:
+            session (Session): The database session for interacting with the
+            database.
+        """
+        self.session = session
+        self.repo = AuditRepository(session=session)
+
+    def get_entries(
+        self,
+        entity: AuditEntity | None = None,
+        entity_id: int | None = None,
+        action: AuditAction | None = None,
+        actor: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        cursor: str | None = None,
+        limit: int = 100
+    ) -> AuditPage:
+        """
+        Retrieves a page of the audit log, most recent entries first.
+
+        Args:
+            entity (AuditEntity | None): Only entries about this kind of
+            record, if given.
+            entity_id (int | None): Only entries about the record with this
+            ID, if given.
+            action (AuditAction | None): Only entries of this action, if
+            given.
+            actor (str | None): Only entries made by this client, if given.
+            since (datetime | None): Only entries that occurred at or after
+            this moment.
+            until (datetime | None): Only entries that occurred before this
+            moment.
+            cursor (str | None): The `next_cursor` of the previous page.
+            limit (int): The maximum number of entries returned.
+
+        Returns:
+            AuditPage: The entries, and the cursor of the next page if there
+            may be one.
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed.
+        """
+        entries = self.repo.get_page(
+            entity=entity,
+            entity_id=entity_id,
+            action=action,
+            actor=actor,
+            since=since,
+            until=until,
+            before=decode_cursor(cursor) if cursor else None,
+            limit=limit
+        )
+        next_cursor = None
+        if len(entries) == limit:
+            next_cursor = encode_cursor(entries[-1].occurred_at, entries[-1].id)
+        return AuditPage(
+            entries=[
+                AuditEntryPublic.model_validate(entry) for entry in entries
+            ],
+            next_cursor=next_cursor
+        )
+
+    def maintain_partitions(
+        self,
+        today: date,
+        months_ahead: int = AUDIT_PARTITIONS_AHEAD,
+        retention_months: int = AUDIT_RETENTION_MONTHS
+    ) -> dict[str, list[str]]:
+        """
+        Creates the upcoming monthly partitions of the audit log and drops
+        the ones past the retention (Postgres only), in one transaction.
+
+        Args:
+            today (date): The current date.
+            months_ahead (int): The number of months created in advance.
+            retention_months (int): The number of months kept, 0 to keep
+            them all.
+
+        Returns:
+            dict[str, list[str]]: The partitions `created` (or already
+            there) and `dropped`.
+        """
+        created = self.repo.create_partitions(today, months_ahead)
+        dropped = []
+        if retention_months > 0:
+            index = today.year * 12 + today.month - retention_months
+            dropped = self.repo.drop_partitions(
+                older_than=date(index // 12, index % 12 + 1, 1)
+            )
+        self.session.commit()
+        return {"created": created, "dropped": dropped}
@@ -0,0 +1,51 @@
+from typing import List
+
+
+class ServiceError(Exception):
+    """
+    Base class of the errors services raise when a failure must be reported
+    more precisely than by returning None.
+    """
+
+
+class NotFoundError(ServiceError):
+    def __init__(self, entity: str, ids: List[int]):
+        """
+        Raised when records an operation depends on do not exist.
+
+        Args:
+            entity (str): The kind of record (e.g. "User").
+            ids (List[int]): The IDs that were not found.
+        """
+        self.entity = entity
+        self.ids = ids
+        super().__init__(
+            f"{entity} not found: {', '.join(map(str, ids))}"
+        )
+
+
+class InvalidJobError(ServiceError):
+    """
+    Raised when a job is enqueued with an unknown type or a payload its
+    handler does not accept.
+    """
+
+
+class InvalidParentError(ServiceError):
+    """
+    Raised when a project would be moved under itself or one of its
+    sub-projects.
+    """
+
+
+class InvalidCursorError(ServiceError):
+    """
+    Raised when a pagination cursor was not issued by the API.
+    """
+
+
+class ConflictError(ServiceError):
+    """
+    Raised when a write conflicts with an existing record, e.g. a duplicate
+    name or membership.
+    """
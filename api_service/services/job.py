@@ -0,0 +1,103 @@
+import traceback
+
+from datetime import datetime
+from pydantic import ValidationError
+from sqlalchemy.sql import func
+from sqlmodel import Session
+from typing import Any, Dict
+
+from core.tracing import traced
+from jobs import HANDLERS
+from models.job import Job, JobCreate, JobStatus
+from repositories.job import JobRepository
+from services.exceptions import InvalidJobError
+
+
+@traced
+class JobService:
+    def __init__(self, session: Session) -> None:
+        """
+        Initializes the JobService with the given database session.
+
+        Args:
+            session (Session): The database session for interacting with the
+            database.
+        """
+        self.session = session
+        self.repo = JobRepository(session=session)
+        self.model = Job
+
+    def enqueue_job(self, job: JobCreate) -> Job:
+        """
+        Queues a job for the worker.
+
+        Args:
+            job (JobCreate): The type of the job and its payload.
+
+        Returns:
+            Job: The queued Job instance.
+
+        Raises:
+            InvalidJobError: If the type is unknown or the payload invalid.
+        """
+        handler = HANDLERS.get(job.type)
+        if handler is None:
+            raise InvalidJobError(f"Unknown job type: {job.type}")
+        try:
+            payload = handler.payload_model.model_validate(job.payload)
+        except ValidationError as error:
+            raise InvalidJobError(
+                f"Invalid payload for {job.type}: {error}"
+            )
+        job_db = self.model(
+            type=job.type,
+            payload=payload.model_dump(mode="json")
+        )
+        return self.repo.create(object=job_db)
+
+    def get_job_by_id(self, id: int) -> Job | None:
+        """
+        Retrieves a job by its ID.
+
+        Args:
+            id (int): The ID of the job to retrieve.
+
+        Returns:
+            Job | None: The Job instance if found, otherwise None.
+        """
+        return self.repo.get_by_id(id=id)
+
+    def claim_next_job(self, stale_before: datetime) -> Job | None:
+        """
+        Claims the next job to run (see JobRepository.claim_next).
+
+        Args:
+            stale_before (datetime): Running jobs not updated since this
+            moment are claimed again.
+
+        Returns:
+            Job | None: The claimed job, or None if there is none.
+        """
+        return self.repo.claim_next(stale_before=stale_before)
+
+    def complete_job(self, job: Job, result: Dict[str, Any] | None) -> Job:
+        """
+        Marks a job as succeeded with its result.
+        """
+        job.status = JobStatus.SUCCEEDED
+        job.result = result
+        job.finished_at = func.now()
+        return self.repo.update(object=job)
+
+    def fail_job(self, job: Job, error: BaseException | str) -> Job:
+        """
+        Marks a job as failed, keeping the error for the client to see.
+        """
+        if isinstance(error, BaseException):
+            error = "".join(
+                traceback.format_exception_only(type(error), error)
+            ).strip()
+        job.status = JobStatus.FAILED
+        job.error = error
+        job.finished_at = func.now()
+        return self.repo.update(object=job)
@@ -1,11 +1,36 @@
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session
-from typing import List
+from typing import List, Tuple
 
-from models.project import Project, ProjectCreate, ProjectUpdate, UserProject
+from core import audit
+from core.tracing import traced
+from models.audit import AuditAction, AuditEntity
+from models.project import (
+    Project,
+    ProjectCreate,
+    ProjectNode,
+    ProjectRollup,
+    ProjectStatus,
+    ProjectUpdate,
+    UserProject,
+    subtree_prefix
+)
+from models.summary import ProjectSummaryPublic, RoleHeadcount
+from repositories.base import UNIQUE_VIOLATION, integrity_violation
+from repositories.loader import get_loaders
 from repositories.project import ProjectRepository, UserProjectRepository
+from repositories.summary import ProjectSummaryRepository
+from repositories.user import UserRepository
+from services.exceptions import (
+    ConflictError,
+    InvalidParentError,
+    NotFoundError
+)
 from services.user import UserService
 
 
+@traced
 class ProjectService:
     def __init__(self, session: Session):
         """
@@ -18,18 +43,30 @@ class ProjectService:
         self.session = session
         self.repo = ProjectRepository(session=session)
         self.model = Project
+        self.loaders = get_loaders(session)
+        self.user_repo = UserRepository(session=session)
+        self.summary_repo = ProjectSummaryRepository(session=session)
     
-    def create_project(self, project: ProjectCreate) -> Project | None:
+    def create_project(self, project: ProjectCreate) -> Project:
         """
         Creates a new project in the database.
 
+        If `user_ids` is given, the project is created with those users as
+        its initial team: all the users are validated with one query and
+        the project and its memberships are inserted in the same
+        transaction.
+
         Args:
             project (ProjectCreate): The project data to create, provided as a
             SQLmodel instance.
 
         Returns:
-            Project | None: The created project instance after saving it to the
-            database, or None if an error occurs during creation.
+            Project: The created project instance after saving it to the
+            database.
+
+        Raises:
+            NotFoundError: If the parent project or some of the `user_ids`
+            don't exist.
         """
         project_db = self.model(
             name=project.name,
@@ -38,8 +75,64 @@ class ProjectService:
             begin_date=project.begin_date,
             end_date=project.end_date
         )
-        return self.repo.create(object=project_db)
+        if project.parent_id is not None:
+            parent = self._get_parent(project.parent_id)
+            project_db.parent_id = parent.id
+            project_db.path = subtree_prefix(parent.path, parent.id)
+        if project.user_ids:
+            user_ids = list(dict.fromkeys(project.user_ids))
+            users = self.user_repo.get_many(ids=user_ids)
+            if len(users) < len(user_ids):
+                found_ids = {user.id for user in users}
+                raise NotFoundError(
+                    "User",
+                    [id for id in user_ids if id not in found_ids]
+                )
+            project_db.users = users
+        created_project = self.repo.create(object=project_db)
+        self.summary_repo.refresh([created_project.id])
+        audit.record(
+            self.session, AuditEntity.PROJECT, created_project.id,
+            AuditAction.CREATE, audit.diff({}, project.model_dump())
+        )
+        return created_project
     
+    def _get_parent(self, id: int) -> Project:
+        parent = self.repo.get_by_id(id=id)
+        if not parent:
+            raise NotFoundError("Project", [id])
+        return parent
+
+    def _move_project(self, project: Project, parent_id: int | None) -> None:
+        """
+        Moves a project, with all its sub-projects, under another parent
+        (or to the top level if `parent_id` is None).
+
+        Raises:
+            NotFoundError: If the parent project doesn't exist.
+            InvalidParentError: If the parent is the project itself or one
+            of its sub-projects.
+        """
+        if parent_id == project.parent_id:
+            return
+        old_prefix = subtree_prefix(project.path, project.id)
+        if parent_id is None:
+            path = "/"
+        else:
+            parent = self._get_parent(parent_id)
+            path = subtree_prefix(parent.path, parent.id)
+            if path.startswith(old_prefix):
+                raise InvalidParentError(
+                    "A project cannot be moved under itself or one of its "
+                    "sub-projects"
+                )
+        self.repo.move_subtree(
+            old_prefix=old_prefix,
+            new_prefix=subtree_prefix(path, project.id)
+        )
+        project.parent_id = parent_id
+        project.path = path
+
     def get_project_by_id(self, id: int) -> Project | None:
         """
         Retrieves a project by its ID.
@@ -53,15 +146,182 @@ class ProjectService:
         """
         return self.repo.get_by_id(id=id)
     
-    def get_projects(self) -> List[Project]:
+    def get_projects_by_ids(
+        self,
+        ids: List[int],
+        include_deleted: bool = False
+    ) -> Tuple[List[Project], List[int]]:
+        """
+        Retrieves several projects by their IDs with a single query.
+
+        Args:
+            ids (List[int]): The IDs of the projects to retrieve.
+            include_deleted (bool): Whether deleted projects are returned too.
+
+        Returns:
+            Tuple[List[Project], List[int]]: The projects found, in the order
+            of `ids`, and the IDs that were not found.
+        """
+        projects = self.repo.get_many(ids=ids, include_deleted=include_deleted)
+        self.loaders.resolve_projects(projects)
+        found_ids = {project.id for project in projects}
+        missing_ids = [id for id in dict.fromkeys(ids) if id not in found_ids]
+        return projects, missing_ids
+
+    def get_projects(
+        self,
+        updated_since: datetime | None = None,
+        include_deleted: bool = False
+    ) -> List[Project]:
         """
         Retrieves all projects from the database.
 
+        Args:
+            updated_since (datetime | None): If provided, only projects
+            modified at or after this moment are returned.
+            include_deleted (bool): Whether deleted projects are returned too.
+
         Returns:
             List[Project]: A list of all project instances in the database.
         """
-        return self.repo.get_all()
+        projects = self.repo.get_all(
+            updated_since=updated_since,
+            include_deleted=include_deleted
+        )
+        self.loaders.resolve_projects(projects)
+        return projects
+
+    def get_active_projects(
+        self,
+        begin: datetime | None = None,
+        end: datetime | None = None
+    ) -> List[Project]:
+        """
+        Retrieves the projects active at some point of a time window, i.e.
+        whose begin and end dates overlap it.
+
+        Args:
+            begin (datetime | None): The start of the window, or None for
+            no start.
+            end (datetime | None): The end of the window, or None for no end.
+
+        Returns:
+            List[Project]: The active projects, by begin date.
+        """
+        projects = self.repo.get_active(begin=begin, end=end)
+        self.loaders.resolve_projects(projects)
+        return projects
     
+    def get_summaries(
+        self,
+        status: ProjectStatus | None = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[ProjectSummaryPublic]:
+        """
+        Retrieves the dashboard summaries of the live projects, read from
+        the project_summary table instead of being built from the projects,
+        their members and their roles.
+
+        Args:
+            status (ProjectStatus | None): If provided, only the projects
+            with this status are returned.
+            limit (int): The maximum number of summaries returned.
+            offset (int): The number of summaries skipped.
+
+        Returns:
+            List[ProjectSummaryPublic]: The summaries, by project ID, with
+            the names of the roles (loaded with one query).
+        """
+        summaries = self.summary_repo.get_page(
+            status=status,
+            limit=limit,
+            offset=offset
+        )
+        self.loaders.roles.load_many(
+            int(role_id)
+            for summary in summaries
+            for role_id in summary.role_counts
+        )
+        return [
+            ProjectSummaryPublic(
+                project_id=summary.project_id,
+                name=summary.name,
+                status=summary.status,
+                member_count=summary.member_count,
+                roles=[
+                    RoleHeadcount(
+                        role_id=int(role_id),
+                        role_name=getattr(
+                            self.loaders.roles.get(int(role_id)), "name", None
+                        ),
+                        members=members
+                    )
+                    for role_id, members in sorted(
+                        summary.role_counts.items(),
+                        key=lambda item: int(item[0])
+                    )
+                ],
+                refreshed_at=summary.refreshed_at
+            )
+            for summary in summaries
+        ]
+
+    def get_subtree(self, id: int) -> List[ProjectNode] | None:
+        """
+        Retrieves all the sub-projects of a project, at any depth.
+
+        Args:
+            id (int): The ID of the project.
+
+        Returns:
+            List[ProjectNode] | None: The sub-projects, grouped by parent,
+            with their depth below the project (1 for its children), or None
+            if the project was not found.
+        """
+        project = self.repo.get_by_id(id=id)
+        if not project:
+            return None
+        depth = project.path.count("/")
+        return [
+            ProjectNode(
+                project_id=row.project_id,
+                parent_id=row.parent_id,
+                name=row.name,
+                status=row.status,
+                depth=row.path.count("/") - depth
+            )
+            for row in self.repo.get_subtree(project)
+        ]
+
+    def get_rollup(self, id: int) -> ProjectRollup | None:
+        """
+        Sums up a project together with all its sub-projects: their number
+        per status, their distinct members and their overall period.
+
+        Args:
+            id (int): The ID of the project.
+
+        Returns:
+            ProjectRollup | None: The rollup, or None if the project was not
+            found.
+        """
+        project = self.repo.get_by_id(id=id)
+        if not project:
+            return None
+        row = self.repo.get_rollup(project)
+        return ProjectRollup(
+            project_id=project.id,
+            sub_projects=row.projects - 1,
+            members=row.members,
+            projects_by_status={
+                status: getattr(row, status.name)
+                for status in ProjectStatus
+            },
+            begin_date=row.begin_date,
+            end_date=row.end_date
+        )
+
     def update_project(
         self,
         id: int,
@@ -75,9 +335,16 @@ class ProjectService:
             project_update (ProjectUpdate): The data to update the project
             with, provided as a SQLModel model.
 
+        Setting `parent_id` moves the project, with all its sub-projects.
+
         Returns:
             Project | None: The updated project instance, or None if not found
-            or unable to update.
+            or there is nothing to update.
+
+        Raises:
+            NotFoundError: If the new parent project doesn't exist.
+            InvalidParentError: If the new parent is the project itself or
+            one of its sub-projects.
         """
         project = self.repo.get_by_id(id=id)
         if not project:
@@ -85,37 +352,49 @@ class ProjectService:
         update_data = project_update.model_dump(exclude_unset=True)
         if not update_data:
             return None
+        changes = audit.diff(
+            {field: getattr(project, field) for field in update_data},
+            update_data
+        )
+        if "parent_id" in update_data:
+            self._move_project(project, update_data.pop("parent_id"))
         for field, value in update_data.items():
             setattr(project, field, value)
 
         updated_project = self.repo.update(object=project)
-        
-        if not updated_project:
-            return None
-        
+        if "name" in update_data or "status" in update_data:
+            self.summary_repo.refresh([updated_project.id])
+        audit.record(
+            self.session, AuditEntity.PROJECT, id,
+            AuditAction.UPDATE, changes
+        )
         return updated_project
     
     def delete_project(self, id: int) -> bool | None:
         """
-        Deletes a project by its ID.
+        Deletes a project by its ID, only if it has no sub-projects.
 
         Args:
             id (int): The ID of the project to delete.
 
         Returns:
-            bool | None: True if the project was successfully deleted, False if
-            an error occurred during deletion, or None if the project was not
-            found.
+            bool | None: True if the project was deleted, or None if it was
+            not found or still has sub-projects.
         """
         project = self.repo.get_by_id(id=id)
         if not project:
             return None
-        is_deleted = self.repo.delete(object=project)
-        if is_deleted:
-            return True
-        return False
+        if self.repo.has_children(id=id):
+            return None
+        self.repo.delete(object=project)
+        self.summary_repo.refresh([id])
+        audit.record(
+            self.session, AuditEntity.PROJECT, id, AuditAction.DELETE
+        )
+        return True
     
 
+@traced
 class UserProjectService:
     def __init__(self, session: Session) -> UserProject | None:
         """
@@ -130,67 +409,74 @@ class UserProjectService:
         self.model = UserProject
         self.project_service = ProjectService(session=session)
         self.user_service = UserService(session=session)
+        self.summary_repo = self.project_service.summary_repo
     
-    def add_user_to_project(self, user_id: int, project_id: int):
+    def add_user_to_project(self, user_id: int, project_id: int) -> bool:
         """
         Adds a user to a project.
 
+        Nothing is read beforehand: the project is touched and the
+        membership inserted, and the database tells whether the project,
+        the user or the membership existed. Concurrent requests therefore
+        can't both add the same membership.
+
         Args:
             user_id (int): The ID of the user to add.
             project_id (int): The ID of the project to add the user to.
 
         Returns:
-            UserProject: The created UserProject instance, or None if the user
-            is already added or not found.
+            bool: True once the user is added.
+
+        Raises:
+            NotFoundError: If the project or the user doesn't exist.
+            ConflictError: If the user already is a member of the project.
         """
-        user = self.user_service.get_user_by_id(id=user_id)
-        if not user:
-            return None
-        project = self.project_service.get_project_by_id(id=project_id)
-        if not project:
-            return None
-        
-        existing_user_project = self.repo.get_by_composite_id(
-            user_id, project_id
+        # Membership is part of the project resource, so sync consumers
+        # must see the project as modified.
+        if not self.project_service.repo.touch_live(id=project_id):
+            raise NotFoundError("Project", [project_id])
+        try:
+            is_added = self.repo.add(user_id=user_id, project_id=project_id)
+        except IntegrityError as error:
+            if integrity_violation(error) == UNIQUE_VIOLATION:
+                raise ConflictError(
+                    f"User {user_id} already is a member of project "
+                    f"{project_id}"
+                )
+            raise
+        if not is_added:
+            raise NotFoundError("User", [user_id])
+        self.summary_repo.refresh([project_id])
+        audit.record(
+            self.session, AuditEntity.PROJECT, project_id,
+            AuditAction.ADD_MEMBER, audit.diff({}, {"user_id": user_id})
         )
-        if existing_user_project:
-            return None
-        
-        user_project = self.model(user_id=user_id, project_id=project_id)
-        return self.repo.create(object=user_project)
+        return True
 
-    def remove_user_from_project(
-        self,
-        user_id: int, 
-        project_id: int
-    ) -> bool | None:
+    def remove_user_from_project(self, user_id: int, project_id: int) -> bool:
         """
-        Removes a user from a project.
+        Removes a user from a project, with one UPDATE and one DELETE and no
+        reads beforehand.
 
         Args:
             user_id (int): The ID of the user to remove.
             project_id (int): The ID of the project to remove the user from.
 
         Returns:
-            bool | None: True if the user was successfully removed, False if an
-            error occurred during removal, or None if the user, project, or
-            the association between them was not found.
+            bool: True once the user is removed.
+
+        Raises:
+            NotFoundError: If the project doesn't exist, or the user is not
+            a member of it.
         """
-        user = self.user_service.get_user_by_id(id=user_id)
-        if not user:
-            return None
-        
-        project = self.project_service.get_project_by_id(id=project_id)
-        if not project:
-            return None
-        
-        existing_user_project = self.repo.get_by_composite_id(
-            user_id, project_id
+        if not self.project_service.repo.touch_live(id=project_id):
+            raise NotFoundError("Project", [project_id])
+        if not self.repo.remove(user_id=user_id, project_id=project_id):
+            raise NotFoundError("Membership", [user_id])
+        self.summary_repo.refresh([project_id])
+        audit.record(
+            self.session, AuditEntity.PROJECT, project_id,
+            AuditAction.REMOVE_MEMBER,
+            audit.diff({"user_id": user_id}, {"user_id": None})
         )
-        if not existing_user_project:
-            return None
-    
-        is_deleted = self.repo.delete(object=existing_user_project)
-        if is_deleted:
-            return True
-        return False
\ No newline at end of file
+        return True
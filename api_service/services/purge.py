@@ -0,0 +1,76 @@
+import os
+
+from datetime import datetime, timedelta, timezone
+from sqlmodel import Session
+from typing import Callable
+
+from core.tracing import traced
+from repositories.project import ProjectRepository
+from repositories.role import RoleRepository
+from repositories.user import UserRepository
+
+
+SOFT_DELETE_RETENTION_DAYS = int(os.getenv("SOFT_DELETE_RETENTION_DAYS", "30"))
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "500"))
+
+
+@traced
+class PurgeService:
+    def __init__(self, session: Session) -> None:
+        """
+        Initializes the PurgeService with the given database session.
+
+        Args:
+            session (Session): The database session for interacting with the
+            database.
+        """
+        self.session = session
+        # Users go first so that the roles they reference become purgeable
+        # in the same run.
+        self.repos = [
+            UserRepository(session=session),
+            ProjectRepository(session=session),
+            RoleRepository(session=session),
+        ]
+
+    def purge_tombstones(
+        self,
+        retention: timedelta = timedelta(days=SOFT_DELETE_RETENTION_DAYS),
+        batch_size: int = PURGE_BATCH_SIZE,
+        commit: Callable[[int], None] | None = None
+    ) -> int:
+        """
+        Permanently removes soft-deleted records older than the retention
+        window.
+
+        Each entity is purged in batches of at most `batch_size` rows, every
+        batch in its own short transaction, so the purge never holds many
+        locks at once.
+
+        Args:
+            retention (timedelta): How long tombstones are kept, giving sync
+            consumers time to observe deletions.
+            batch_size (int): The maximum number of rows removed per batch.
+            commit (Callable[[int], None] | None): Commits a batch, given
+            the number of rows it removed (e.g. a job checkpoint). Defaults
+            to committing the session.
+
+        Returns:
+            int: The total number of records purged.
+        """
+        older_than = datetime.now(timezone.utc) - retention
+        total = 0
+        for repo in self.repos:
+            while True:
+                purged = repo.purge_deleted(
+                    older_than=older_than,
+                    limit=batch_size
+                )
+                if commit is None:
+                    self.session.commit()
+                else:
+                    commit(purged)
+                total += purged
+                if purged < batch_size:
+                    break
+        return total
@@ -1,10 +1,25 @@
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session
-from typing import List
+from typing import List, Tuple
 
+from core import audit
+from core.tracing import traced
+from models.audit import AuditAction, AuditEntity
 from models.role import Role, RoleCreate, RoleUpdate
+from repositories.base import UNIQUE_VIOLATION, integrity_violation
 from repositories.role import RoleRepository
+from services.exceptions import ConflictError
 
 
+def _name_taken(error: IntegrityError, name: str | None) -> None:
+    # uq_role_name is the only unique constraint a role write can violate.
+    if integrity_violation(error) == UNIQUE_VIOLATION:
+        raise ConflictError(f"A role named {name!r} already exists")
+    raise error
+
+
+@traced
 class RoleService:
     def __init__(self, session: Session) -> None:
         """
@@ -18,7 +33,7 @@ class RoleService:
         self.repo = RoleRepository(session=session)
         self.model = Role
     
-    def create_role(self, role: RoleCreate) -> Role | None:
+    def create_role(self, role: RoleCreate) -> Role:
         """
         Creates a new role in the database.
 
@@ -27,14 +42,25 @@ class RoleService:
             to be created.
 
         Returns:
-            Role | None: The created Role instance after saving it to the
-            database, or None if an error occurs during creation.
+            Role: The created Role instance after saving it to the
+            database.
+
+        Raises:
+            ConflictError: If a live role already has this name.
         """
         role_db = self.model(
             name=role.name,
             description=role.description
         )
-        return self.repo.create(object=role_db)
+        try:
+            created_role = self.repo.create(object=role_db)
+        except IntegrityError as error:
+            _name_taken(error, role.name)
+        audit.record(
+            self.session, AuditEntity.ROLE, created_role.id,
+            AuditAction.CREATE, audit.diff({}, role.model_dump())
+        )
+        return created_role
     
     def get_role_by_id(self, id: int) -> Role | None:
         """
@@ -48,14 +74,47 @@ class RoleService:
         """
         return self.repo.get_by_id(id=id)
     
-    def get_roles(self) -> List[Role]:
+    def get_roles_by_ids(
+        self,
+        ids: List[int],
+        include_deleted: bool = False
+    ) -> Tuple[List[Role], List[int]]:
+        """
+        Retrieves several roles by their IDs with a single query.
+
+        Args:
+            ids (List[int]): The IDs of the roles to retrieve.
+            include_deleted (bool): Whether deleted roles are returned too.
+
+        Returns:
+            Tuple[List[Role], List[int]]: The roles found, in the order
+            of `ids`, and the IDs that were not found.
+        """
+        roles = self.repo.get_many(ids=ids, include_deleted=include_deleted)
+        found_ids = {role.id for role in roles}
+        missing_ids = [id for id in dict.fromkeys(ids) if id not in found_ids]
+        return roles, missing_ids
+
+    def get_roles(
+        self,
+        updated_since: datetime | None = None,
+        include_deleted: bool = False
+    ) -> List[Role]:
         """
         Retrieves all roles from the database.
 
+        Args:
+            updated_since (datetime | None): If provided, only roles
+            modified at or after this moment are returned.
+            include_deleted (bool): Whether deleted roles are returned too.
+
         Returns:
             List[Role]: A list of all role instances in the database.
         """
-        return self.repo.get_all()
+        return self.repo.get_all(
+            updated_since=updated_since,
+            include_deleted=include_deleted
+        )
     
     def update_role(self, id: int, role_update: RoleUpdate) -> Role | None:
         """
@@ -68,7 +127,10 @@ class RoleService:
 
         Returns:
             Role | None: The updated role instance, or None if the role was not
-            found or an error occurred during the update.
+            found or there is nothing to update.
+
+        Raises:
+            ConflictError: If another live role already has the new name.
         """
         role = self.repo.get_by_id(id=id)
         if not role:
@@ -76,14 +138,18 @@ class RoleService:
         update_data = role_update.model_dump(exclude_unset=True)
         if not update_data:
             return None
+        before = {field: getattr(role, field) for field in update_data}
         for field, value in update_data.items():
             setattr(role, field, value)
 
-        updated_role = self.repo.update(object=role)
-        
-        if not updated_role:
-            return None
-        
+        try:
+            updated_role = self.repo.update(object=role)
+        except IntegrityError as error:
+            _name_taken(error, update_data.get("name"))
+        audit.record(
+            self.session, AuditEntity.ROLE, id,
+            AuditAction.UPDATE, audit.diff(before, update_data)
+        )
         return updated_role
     
     def delete_role(self, id: int)  -> bool | None:
@@ -94,16 +160,16 @@ class RoleService:
             id (int): The ID of the role to delete.
 
         Returns:
-            bool | None: True if the role was successfully deleted, False if an
-            error occurred during deletion, or None if the role was not found
-            or is currently assigned to users.
+            bool | None: True if the role was deleted, or None if it was not
+            found or is currently assigned to users.
         """
         role = self.repo.get_by_id(id=id)
         if not role:
             return None
         if role.users:
             return None
-        is_deleted = self.repo.delete(object=role)
-        if is_deleted:
-            return True
-        return False
\ No newline at end of file
+        self.repo.delete(object=role)
+        audit.record(
+            self.session, AuditEntity.ROLE, id, AuditAction.DELETE
+        )
+        return True
\ No newline at end of file
@@ -0,0 +1,50 @@
+from sqlmodel import Session
+from typing import List, Optional
+
+from core.tracing import traced
+from models.search import SearchHit, SearchResultType
+from repositories.search import SearchRepository
+
+
+@traced
+class SearchService:
+    def __init__(self, session: Session) -> None:
+        """
+        Initializes the SearchService with the given database session.
+
+        Args:
+            session (Session): The database session for interacting with the
+            database.
+        """
+        self.session = session
+        self.repo = SearchRepository(session=session)
+
+    def search(
+        self,
+        q: str,
+        type: Optional[SearchResultType] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[SearchHit]:
+        """
+        Searches projects (by name and description) and users (by name and
+        position).
+
+        Args:
+            q (str): The text to search for. Words may be partial.
+            type (Optional[SearchResultType]): Restricts the search to one
+            entity type. Both are searched if None.
+            limit (int): The maximum number of results.
+            offset (int): The number of results to skip.
+
+        Returns:
+            List[SearchHit]: The matches, best ranked first.
+        """
+        types = [type] if type else list(SearchResultType)
+        rows = self.repo.search(
+            text=q,
+            types=types,
+            limit=limit,
+            offset=offset
+        )
+        return [SearchHit.model_validate(row) for row in rows]
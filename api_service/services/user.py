@@ -1,10 +1,27 @@
+import os
+
+from datetime import datetime
 from sqlmodel import Session
-from typing import List
+from typing import List, Tuple
 
-from models.user import User, UserCreate, UserUpdate
+from core import audit
+from core.cache import cache
+from core.tracing import traced
+from models.audit import AuditAction, AuditEntity
+from models.project import ProjectStatus
+from models.user import User, UserCreate, UserUpdate, UserWorkload
+from repositories.loader import get_loaders
+from repositories.project import ProjectRepository
+from repositories.summary import ProjectSummaryRepository
 from repositories.user import UserRepository
+from services.exceptions import NotFoundError
+
+
+# Seconds the workload report is cached for (0 disables caching).
+WORKLOAD_CACHE_TTL = float(os.getenv("WORKLOAD_CACHE_TTL", "0"))
 
 
+@traced
 class UserService:
     def __init__(self, session: Session) -> None:
         """
@@ -17,8 +34,10 @@ class UserService:
         self.session = session
         self.repo = UserRepository(session=session)
         self.model = User
+        self.loaders = get_loaders(session)
+        self.summary_repo = ProjectSummaryRepository(session=session)
 
-    def create_user(self, user: UserCreate) -> User | None:
+    def create_user(self, user: UserCreate) -> User:
         """
         Creates a new user in the database.
 
@@ -27,15 +46,25 @@ class UserService:
             be created.
 
         Returns:
-            User | None: The created User instance after saving it to the
-            database, or None if an error occurs during creation.
+            User: The created User instance after saving it to the
+            database.
+
+        Raises:
+            NotFoundError: If the role doesn't exist or is deleted.
         """
         user_db = self.model(
             name=user.name,
             position=user.position,
             role_id=user.role_id,
         )
-        return self.repo.create(object=user_db)
+        created_user = self.repo.create_with_live_role(user=user_db)
+        if created_user is None:
+            raise NotFoundError("Role", [user.role_id])
+        audit.record(
+            self.session, AuditEntity.USER, created_user.id,
+            AuditAction.CREATE, audit.diff({}, user.model_dump())
+        )
+        return created_user
 
     def get_user_by_id(self, id: int) -> User | None:
         """
@@ -49,14 +78,133 @@ class UserService:
         """
         return self.repo.get_by_id(id=id)
     
-    def get_users(self) -> List[User]:
+    def get_users_by_ids(
+        self,
+        ids: List[int],
+        include_deleted: bool = False
+    ) -> Tuple[List[User], List[int]]:
+        """
+        Retrieves several users by their IDs with a single query.
+
+        Args:
+            ids (List[int]): The IDs of the users to retrieve.
+            include_deleted (bool): Whether deleted users are returned too.
+
+        Returns:
+            Tuple[List[User], List[int]]: The users found, in the order
+            of `ids`, and the IDs that were not found.
+        """
+        users = self.repo.get_many(ids=ids, include_deleted=include_deleted)
+        self.loaders.resolve_users(users)
+        found_ids = {user.id for user in users}
+        missing_ids = [id for id in dict.fromkeys(ids) if id not in found_ids]
+        return users, missing_ids
+
+    def get_users(
+        self,
+        updated_since: datetime | None = None,
+        include_deleted: bool = False
+    ) -> List[User]:
         """
         Retrieves all users from the database.
 
+        Args:
+            updated_since (datetime | None): If provided, only users
+            modified at or after this moment are returned.
+            include_deleted (bool): Whether deleted users are returned too.
+
         Returns:
             List[User]: A list of all user instances in the database.
         """
-        return self.repo.get_all()
+        users = self.repo.get_all(
+            updated_since=updated_since,
+            include_deleted=include_deleted
+        )
+        self.loaders.resolve_users(users)
+        return users
+
+    def get_workload(
+        self,
+        role_id: int | None = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[UserWorkload]:
+        """
+        Computes how many projects each user is on, per project status, to
+        spot over-allocated users.
+
+        The report is cached for WORKLOAD_CACHE_TTL seconds, so it may lag
+        behind the latest membership changes by that much.
+
+        Args:
+            role_id (int | None): Only users with this role are reported,
+            if given.
+            limit (int): The maximum number of users returned.
+            offset (int): The number of users to skip.
+
+        Returns:
+            List[UserWorkload]: The users' workloads, most active projects
+            first.
+        """
+        key = f"workload:{role_id}:{limit}:{offset}"
+        if WORKLOAD_CACHE_TTL > 0:
+            cached = cache.get(key)
+            if cached is not None:
+                return [UserWorkload.model_validate(item) for item in cached]
+        rows = self.repo.get_workload(
+            role_id=role_id,
+            limit=limit,
+            offset=offset
+        )
+        workload = [
+            UserWorkload(
+                user_id=row.user_id,
+                full_name=row.full_name,
+                role_name=row.role_name,
+                active_projects=row.active_projects,
+                projects_by_status={
+                    status: getattr(row, status.name)
+                    for status in ProjectStatus
+                }
+            )
+            for row in rows
+        ]
+        if WORKLOAD_CACHE_TTL > 0:
+            cache.set(
+                key,
+                [item.model_dump(mode="json") for item in workload],
+                ttl=WORKLOAD_CACHE_TTL
+            )
+        return workload
+
+    def get_project_overlaps(
+        self,
+        id: int,
+        begin: datetime | None = None,
+        end: datetime | None = None
+    ) -> list | None:
+        """
+        Finds the projects of a user whose periods overlap each other, i.e.
+        where the user is double-booked.
+
+        Args:
+            id (int): The ID of the user.
+            begin (datetime | None): Only overlaps after this moment are
+            reported, if given.
+            end (datetime | None): Only overlaps before this moment are
+            reported, if given.
+
+        Returns:
+            list | None: One row per pair of overlapping projects, or None
+            if the user does not exist.
+        """
+        if self.repo.get_by_id(id=id) is None:
+            return None
+        return ProjectRepository(session=self.session).get_overlaps_for_user(
+            user_id=id,
+            begin=begin,
+            end=end
+        )
     
     def update_user(self, id: int, user_update: UserUpdate) -> User | None:
         """
@@ -69,7 +217,10 @@ class UserService:
 
         Returns:
             User | None: The updated user instance, or None if the user was not
-            found or an error occurred during the update.
+            found or there is nothing to update.
+
+        Raises:
+            NotFoundError: If the new role doesn't exist or is deleted.
         """
         user = self.repo.get_by_id(id=id)
         if not user:
@@ -77,14 +228,27 @@ class UserService:
         update_data = user_update.model_dump(exclude_unset=True)
         if not update_data:
             return None
-        for field, value in update_data.items():
-            setattr(user, field, value)
-
-        updated_user = self.repo.update(object=user)
-        
-        if not updated_user:
-            return None
+        before = {field: getattr(user, field) for field in update_data}
+        if "role_id" in update_data:
+            # The role must be live: checked by the UPDATE itself.
+            updated_user = self.repo.update_with_live_role(
+                id=id,
+                values=update_data
+            )
+            if updated_user is None:
+                raise NotFoundError("Role", [update_data["role_id"]])
+        else:
+            for field, value in update_data.items():
+                setattr(user, field, value)
+            updated_user = self.repo.update(object=user)
         
+        # The role breakdowns of the user's projects change with the role.
+        if "role_id" in update_data:
+            self.summary_repo.refresh_for_user(user_id=id)
+        audit.record(
+            self.session, AuditEntity.USER, id,
+            AuditAction.UPDATE, audit.diff(before, update_data)
+        )
         return updated_user
     
     def delete_user(self, id: int) -> bool | None:
@@ -95,14 +259,16 @@ class UserService:
             id (int): The ID of the user to delete.
 
         Returns:
-            bool | None: True if the user was successfully deleted, False if
-            an error occurred during deletion, or None if the user was not
-            found.
+            bool | None: True if the user was deleted, or None if they were
+            not found.
         """
         user = self.repo.get_by_id(id=id)
         if not user:
             return None
-        is_deleted = self.repo.delete(object=user)
-        if is_deleted:
-            return True
-        return False
\ No newline at end of file
+        self.repo.delete(object=user)
+        # Deleted users are no longer counted as members.
+        self.summary_repo.refresh_for_user(user_id=id)
+        audit.record(
+            self.session, AuditEntity.USER, id, AuditAction.DELETE
+        )
+        return True
\ No newline at end of file
@@ -0,0 +1,202 @@
+import itertools
+import os
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+# The application reads its configuration at import. The tests run against
+# an in-memory SQLite database unless DATABASE_BACKEND (and the POSTGRES_*
+# settings) point them at a local database server.
+os.environ.setdefault("DATABASE_BACKEND", "sqlite")
+os.environ.setdefault("SQLITE_PATH", ":memory:")
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["PURGE_INTERVAL_SECONDS"] = "0"
+os.environ["WORKLOAD_CACHE_TTL"] = "0"
+# Audit entries are only written when a test flushes them, so the writer
+# never runs statements while a test counts them.
+os.environ["AUDIT_FLUSH_INTERVAL"] = "3600"
+os.environ["AUDIT_BATCH_SIZE"] = "100000"
+os.environ["AUDIT_MAINTENANCE_INTERVAL_SECONDS"] = "0"
+# Request logs would only be noise in the test output.
+os.environ["LOG_LEVEL"] = "WARNING"
+
+import pytest
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from sqlmodel import Session, SQLModel
+
+import main
+from core.db import engine
+from models.job import Job
+from models.project import Project, ProjectStatus, UserProject, subtree_prefix
+from models.role import Role
+from models.user import User
+from repositories.summary import ProjectSummaryRepository
+
+
+# Numbers of users and projects seeded. Query counts and response times
+# must not depend on them.
+DATASET_SIZES = (10, 100, 1000)
+# Members of each seeded project.
+MEMBERS_PER_PROJECT = 3
+# Sub-projects of each seeded project.
+CHILDREN_PER_PROJECT = 4
+
+_names = itertools.count()
+
+
+class QueryCounter:
+    def __init__(self):
+        """
+        Records the SQL statements run on the application engine while
+        active:
+
+            with QueryCounter() as queries:
+                client.get("/project/")
+            assert queries.count <= 3
+        """
+        self.statements: list[str] = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        event.remove(engine, "before_cursor_execute", self._record)
+
+
+@dataclass
+class Dataset:
+    """
+    The rows seeded for a test module, and helpers creating fresh rows for
+    the tests that modify or delete one.
+    """
+    size: int
+    role_ids: list[int] = field(default_factory=list)
+    user_ids: list[int] = field(default_factory=list)
+    project_ids: list[int] = field(default_factory=list)
+
+    def _add(self, object) -> int:
+        with Session(engine) as session:
+            session.add(object)
+            session.commit()
+            return object.id
+
+    def new_role(self) -> int:
+        return self._add(Role(
+            name=f"Role {next(_names)}",
+            description="Created by a test"
+        ))
+
+    def new_user(self) -> int:
+        return self._add(User(
+            name=f"User {next(_names)}",
+            position="Engineer",
+            role_id=self.role_ids[0]
+        ))
+
+    def new_project(self, user_ids: list[int] = ()) -> int:
+        with Session(engine) as session:
+            project = Project(
+                name=f"Project {next(_names)}",
+                description="Created by a test",
+                begin_date=datetime(2024, 1, 1),
+                end_date=datetime(2024, 12, 31)
+            )
+            session.add(project)
+            session.flush()
+            session.add_all(
+                UserProject(user_id=user_id, project_id=project.id)
+                for user_id in user_ids
+            )
+            session.commit()
+            return project.id
+
+    def new_job(self) -> int:
+        return self._add(Job(type="purge_tombstones", payload={}))
+
+
+def seed(session: Session, size: int) -> Dataset:
+    """
+    Seeds `size` users and `size` projects, spread over three roles and
+    every project status, each project staffed with MEMBERS_PER_PROJECT
+    users. The projects form a tree of CHILDREN_PER_PROJECT children per
+    project under the first one.
+    """
+    roles = [
+        Role(name=name, description=f"{name} role")
+        for name in ("Project Manager", "Developer", "Analyst")
+    ]
+    users = [
+        User(
+            name=f"User {index}",
+            position="Software Engineer",
+            role=roles[index % len(roles)]
+        )
+        for index in range(size)
+    ]
+    statuses = list(ProjectStatus)
+    projects = [
+        Project(
+            name=f"Project {index}",
+            description=f"Description of project {index}",
+            status=statuses[index % len(statuses)],
+            begin_date=datetime(2024, 1, 1) + timedelta(days=index % 365),
+            end_date=datetime(2024, 3, 1) + timedelta(days=index % 365)
+        )
+        for index in range(size)
+    ]
+    session.add_all(roles + users + projects)
+    session.flush()
+    for index, project in enumerate(projects[1:], start=1):
+        parent = projects[(index - 1) // CHILDREN_PER_PROJECT]
+        project.parent_id = parent.id
+        project.path = subtree_prefix(parent.path, parent.id)
+    session.add_all(
+        UserProject(
+            user_id=users[(index + offset) % size].id,
+            project_id=project.id
+        )
+        for index, project in enumerate(projects)
+        for offset in range(MEMBERS_PER_PROJECT)
+    )
+    session.flush()
+    ProjectSummaryRepository(session=session).refresh(
+        [project.id for project in projects]
+    )
+    # Gives the planner the statistics a live database would have.
+    session.exec(text("ANALYZE"))
+    session.commit()
+    return Dataset(
+        size=size,
+        role_ids=[role.id for role in roles],
+        user_ids=[user.id for user in users],
+        project_ids=[project.id for project in projects]
+    )
+
+
+@pytest.fixture(scope="session")
+def client():
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture(scope="module", params=DATASET_SIZES, ids=lambda size: f"{size}-rows")
+def dataset(request, client):
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    # The session is closed before the tests run so that it doesn't hold a
+    # connection (the only one of an in-memory database) meanwhile.
+    with Session(engine) as session:
+        dataset = seed(session, request.param)
+    yield dataset
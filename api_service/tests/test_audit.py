@@ -0,0 +1,108 @@
+import itertools
+import threading
+
+import pytest
+
+from core.audit import AuditWriter, audit_writer
+
+
+_names = itertools.count()
+
+
+def audit_log(client, **params) -> list[dict]:
+    audit_writer.flush()
+    response = client.get("/audit/", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()["entries"]
+
+
+@pytest.fixture
+def role(client) -> int:
+    response = client.post("/role/", json={
+        "name": f"Auditor {next(_names)}",
+        "description": "Checks the audit log"
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def test_writes_are_recorded_with_their_changes(client, role):
+    client.put(f"/role/{role}", json={"description": "Reads the audit log"})
+    client.delete(f"/role/{role}")
+
+    entries = audit_log(client, entity="role", entity_id=role)
+    assert [entry["action"] for entry in entries] == [
+        "delete", "update", "create"
+    ]
+    assert entries[1]["changes"] == {
+        "description": {
+            "old": "Checks the audit log",
+            "new": "Reads the audit log"
+        }
+    }
+    assert entries[2]["changes"]["name"]["old"] is None
+    assert entries[0]["actor"] == "ip:testclient"
+
+
+def test_membership_changes_are_recorded_on_the_project(client, role):
+    user = client.post("/user/", json={
+        "name": "Audited user",
+        "position": "Engineer",
+        "role_id": role
+    }).json()["user_id"]
+    project = client.post("/project/", json={
+        "name": "Audited project",
+        "begin_date": "2024-01-01T00:00:00",
+        "end_date": "2024-12-31T00:00:00"
+    }).json()["project_id"]
+    client.post(f"/project/{project}/user", params={"user_id": user})
+    client.delete(f"/project/{project}/user", params={"user_id": user})
+
+    entries = audit_log(client, entity="project", entity_id=project)
+    assert [
+        (entry["action"], entry["changes"].get("user_id"))
+        for entry in entries[:2]
+    ] == [
+        ("remove_member", {"old": user, "new": None}),
+        ("add_member", {"old": None, "new": user})
+    ]
+
+
+def test_failed_writes_are_not_recorded(client, role):
+    before = len(audit_log(client, entity="role", limit=1000))
+    response = client.put(f"/role/{role}", json={})
+    assert response.status_code != 200
+    assert len(audit_log(client, entity="role", limit=1000)) == before
+
+
+def test_pages_follow_the_cursor(client, role):
+    for index in range(5):
+        client.put(f"/role/{role}", json={"description": f"Version {index}"})
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"entity": "role", "entity_id": role, "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        audit_writer.flush()
+        page = client.get("/audit/", params=params).json()
+        seen.extend(entry["id"] for entry in page["entries"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == 6
+
+    response = client.get("/audit/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_entries_are_dropped_when_the_queue_is_full():
+    written = []
+    writer = AuditWriter(write=written.extend, max_size=2)
+    # Stands for the writer thread, so that entries stay queued.
+    writer._thread = threading.current_thread()
+    writer.enqueue([{"id": 1}, {"id": 2}, {"id": 3}])
+    assert writer.dropped == 1
+    writer.flush()
+    assert written == [{"id": 1}, {"id": 2}]
@@ -0,0 +1,196 @@
+import itertools
+
+import pytest
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlmodel import Session
+
+from core.db import engine
+from worker import Worker
+
+_names = itertools.count()
+
+
+@pytest.fixture
+def member(client):
+    name = next(_names)
+    role = client.post("/role/", json={
+        "name": f"Constrained {name}",
+        "description": "Staffs the constraint tests"
+    }).json()["id"]
+    user = client.post("/user/", json={
+        "name": f"Member {name}",
+        "position": "Engineer",
+        "role_id": role
+    }).json()["user_id"]
+    project = client.post("/project/", json={
+        "name": f"Constrained {name}",
+        "begin_date": "2024-01-01T00:00:00",
+        "end_date": "2024-12-31T00:00:00"
+    }).json()["project_id"]
+    return role, user, project
+
+
+def test_duplicate_role_name_conflicts(client, member):
+    role, _, _ = member
+    name = client.get(f"/role/{role}").json()["name"]
+    response = client.post("/role/", json={
+        "name": name,
+        "description": "Same name"
+    })
+    assert response.status_code == 409
+    other = client.post("/role/", json={
+        "name": f"{name} bis",
+        "description": "Another name"
+    }).json()["id"]
+    response = client.put(f"/role/{other}", json={"name": name})
+    assert response.status_code == 409
+    assert client.get(f"/role/{other}").json()["name"] == f"{name} bis"
+
+
+def test_deleted_role_name_can_be_reused(client, member):
+    name = f"Reused {next(_names)}"
+    role = client.post("/role/", json={"name": name, "description": "-"})
+    client.delete(f"/role/{role.json()['id']}")
+    response = client.post("/role/", json={"name": name, "description": "-"})
+    assert response.status_code == 200
+
+
+def test_failed_writes_are_errors_not_missing_records(
+    client, member, monkeypatch
+):
+    role = client.post("/role/", json={
+        "name": f"Undeletable {next(_names)}",
+        "description": "Its deletion fails"
+    }).json()["id"]
+
+    flush = Session.flush
+
+    def fail(self, *args, **kwargs):
+        # Autoflushes before the first queries have nothing to write.
+        if self.dirty:
+            raise OperationalError("UPDATE role", {}, Exception("disk I/O"))
+        flush(self, *args, **kwargs)
+
+    monkeypatch.setattr(Session, "flush", fail)
+    with pytest.raises(OperationalError):
+        client.delete(f"/role/{role}")
+    monkeypatch.undo()
+    response = client.get(f"/role/{role}")
+    assert response.status_code == 200
+    assert response.json()["deleted_at"] is None
+
+
+def test_unknown_role_is_not_found(client, member):
+    _, user, _ = member
+    response = client.post("/user/", json={
+        "name": "Orphan",
+        "position": "Engineer",
+        "role_id": 999999
+    })
+    assert response.status_code == 404
+    response = client.put(f"/user/{user}", json={"role_id": 999999})
+    assert response.status_code == 404
+
+
+def test_deleted_role_is_not_found(client, member):
+    _, user, _ = member
+    role_name = client.get(f"/user/{user}").json()["role_name"]
+    deleted = client.post("/role/", json={
+        "name": f"Retired {next(_names)}",
+        "description": "Deleted before use"
+    }).json()["id"]
+    assert client.delete(f"/role/{deleted}").status_code == 200
+    response = client.post("/user/", json={
+        "name": "Late hire",
+        "position": "Engineer",
+        "role_id": deleted
+    })
+    assert response.status_code == 404
+    response = client.put(f"/user/{user}", json={"role_id": deleted})
+    assert response.status_code == 404
+    assert client.get(f"/user/{user}").json()["role_name"] == role_name
+    other = client.post("/role/", json={
+        "name": f"Promoted {next(_names)}",
+        "description": "Live role"
+    }).json()["id"]
+    response = client.put(f"/user/{user}", json={
+        "role_id": other,
+        "position": "Lead"
+    })
+    assert response.status_code == 200
+    assert response.json()["job_title"] == "Lead"
+    assert response.json()["role_name"].startswith("Promoted")
+
+
+def test_membership_is_added_once(client, member):
+    _, user, project = member
+    url = f"/project/{project}/user"
+    assert client.post(url, params={"user_id": user}).status_code == 200
+    assert client.post(url, params={"user_id": user}).status_code == 409
+    users = client.get(f"/project/{project}").json()["users"]
+    assert len(users) == 1
+
+
+def test_bulk_membership_jobs_skip_existing_members(client, member):
+    role, user, project = member
+    newcomer = client.post("/user/", json={
+        "name": f"Newcomer {next(_names)}",
+        "position": "Engineer",
+        "role_id": role
+    }).json()["user_id"]
+    client.post(f"/project/{project}/user", params={"user_id": user})
+    job_id = client.post("/jobs/", json={
+        "type": "add_users_to_project",
+        "payload": {
+            "project_id": project,
+            "user_ids": [user, newcomer, 999999]
+        }
+    }).json()["job_id"]
+    worker = Worker(batch_size=2)
+    while worker.run_once():
+        pass
+
+    job = client.get(f"/jobs/{job_id}").json()
+    assert job["status"] == "Succeeded", job
+    assert job["result"] == {
+        "added": 1,
+        "already_members": 1,
+        "missing_ids": [999999]
+    }
+    users = client.get(f"/project/{project}").json()["users"]
+    assert len(users) == 2
+
+
+def test_membership_of_unknown_records_is_not_found(client, member):
+    _, user, project = member
+    response = client.post("/project/999999/user", params={"user_id": user})
+    assert response.status_code == 404
+    assert "Project" in response.json()["detail"]
+    response = client.post(
+        f"/project/{project}/user", params={"user_id": 999999}
+    )
+    assert response.status_code == 404
+    assert "User" in response.json()["detail"]
+    client.delete(f"/user/{user}")
+    response = client.post(f"/project/{project}/user", params={"user_id": user})
+    assert response.status_code == 404
+
+
+def test_removing_a_missing_membership_is_not_found(client, member):
+    _, user, project = member
+    url = f"/project/{project}/user"
+    assert client.delete(url, params={"user_id": user}).status_code == 404
+    client.post(url, params={"user_id": user})
+    assert client.delete(url, params={"user_id": user}).status_code == 200
+    assert client.delete(url, params={"user_id": user}).status_code == 404
+    response = client.delete("/project/999999/user", params={"user_id": user})
+    assert response.status_code == 404
+
+
+def test_failed_statements_leave_no_query_timer(client):
+    with engine.connect() as connection:
+        with pytest.raises(DBAPIError):
+            connection.execute(text("SELECT * FROM no_such_table"))
+        assert connection.info["query_start"] == []
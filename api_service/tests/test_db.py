@@ -0,0 +1,32 @@
+import threading
+
+import pytest
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from core.db import SerializedStaticPool, engine
+
+pytestmark = pytest.mark.skipif(
+    not isinstance(engine.pool, SerializedStaticPool),
+    reason="Only in-memory SQLite databases share one connection"
+)
+
+
+def test_in_memory_connection_is_used_by_one_thread_at_a_time():
+    statements = []
+
+    def other_thread():
+        with Session(engine) as session:
+            statements.append(session.exec(text("SELECT 2")).one())
+
+    with Session(engine) as session:
+        session.exec(text("SELECT 1")).one()
+        thread = threading.Thread(target=other_thread)
+        thread.start()
+        # The other session waits until this one returns the connection.
+        thread.join(0.2)
+        assert thread.is_alive() and statements == []
+
+    thread.join(5)
+    assert statements == [(2,)]
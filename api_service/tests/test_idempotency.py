@@ -0,0 +1,115 @@
+import itertools
+import uuid
+
+import pytest
+
+from core.cache import cache
+from core.idempotency import IDEMPOTENCY_HEADER, REPLAYED_HEADER
+from tests.conftest import QueryCounter
+
+
+_names = itertools.count()
+
+
+@pytest.fixture
+def role(client) -> int:
+    return client.post("/role/", json={
+        "name": f"Idempotent role {next(_names)}",
+        "description": "Used by the idempotency tests"
+    }).json()["id"]
+
+
+def new_user(role: int) -> dict:
+    return {"name": "Retried user", "position": "Engineer", "role_id": role}
+
+
+def test_retries_replay_the_first_response(client, role):
+    key = {IDEMPOTENCY_HEADER: str(uuid.uuid4())}
+    first = client.post("/user/", json=new_user(role), headers=key)
+    assert first.status_code == 200, first.text
+    assert REPLAYED_HEADER not in first.headers
+
+    with QueryCounter() as queries:
+        retry = client.post("/user/", json=new_user(role), headers=key)
+    assert retry.status_code == 200
+    assert retry.headers[REPLAYED_HEADER] == "true"
+    assert retry.json() == first.json()
+    assert queries.count == 0
+
+    other = client.post("/user/", json=new_user(role))
+    assert other.json()["user_id"] != first.json()["user_id"]
+
+
+def test_retried_memberships_do_not_fail(client, role):
+    user = client.post("/user/", json=new_user(role)).json()["user_id"]
+    project = client.post("/project/", json={
+        "name": "Retried project",
+        "begin_date": "2024-01-01T00:00:00",
+        "end_date": "2024-12-31T00:00:00"
+    }).json()["project_id"]
+    key = {IDEMPOTENCY_HEADER: str(uuid.uuid4())}
+    for _ in range(2):
+        response = client.post(
+            f"/project/{project}/user",
+            params={"user_id": user},
+            headers=key
+        )
+        assert response.status_code == 200, response.text
+
+
+def test_a_key_cannot_be_reused_for_another_request(client, role):
+    key = {IDEMPOTENCY_HEADER: str(uuid.uuid4())}
+    client.post("/user/", json=new_user(role), headers=key)
+    response = client.post(
+        "/user/",
+        json={**new_user(role), "name": "Someone else"},
+        headers=key
+    )
+    assert response.status_code == 422
+
+
+def test_a_retry_gets_the_encoding_it_asked_for(client, role):
+    pytest.importorskip("msgpack")
+    key = str(uuid.uuid4())
+    msgpack = {IDEMPOTENCY_HEADER: key, "Accept": "application/msgpack"}
+    first = client.post("/user/", json=new_user(role), headers=msgpack)
+    assert first.headers["content-type"] == "application/msgpack"
+
+    retry = client.post("/user/", json=new_user(role), headers=msgpack)
+    assert retry.headers[REPLAYED_HEADER] == "true"
+    assert retry.content == first.content
+    retry = client.post(
+        "/user/", json=new_user(role), headers={IDEMPOTENCY_HEADER: key}
+    )
+    assert retry.status_code == 422
+
+
+def test_a_retry_waits_for_the_first_request(client, role):
+    key = str(uuid.uuid4())
+    response = client.post(
+        "/user/",
+        json=new_user(role),
+        headers={IDEMPOTENCY_HEADER: key}
+    )
+    cache_key = next(
+        name for name in cache._entries if name.endswith(f":{key}")
+    )
+    stored = cache.get(cache_key)
+    cache.set(cache_key, {**stored, "status": None}, 60)
+
+    response = client.post(
+        "/user/",
+        json=new_user(role),
+        headers={IDEMPOTENCY_HEADER: key}
+    )
+    assert response.status_code == 409
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_errors_are_not_stored(client):
+    key = {IDEMPOTENCY_HEADER: str(uuid.uuid4())}
+    body = {"name": "Orphan", "position": "Engineer", "role_id": 999999}
+    first = client.post("/user/", json=body, headers=key)
+    retry = client.post("/user/", json=body, headers=key)
+    assert first.status_code == retry.status_code == 404
+    assert REPLAYED_HEADER not in retry.headers
@@ -0,0 +1,61 @@
+import csv
+import itertools
+import math
+
+from jobs import handlers
+from tests.conftest import QueryCounter
+from worker import Worker
+
+_names = itertools.count()
+
+
+def run_job(client, type: str, payload: dict, batch_size: int) -> dict:
+    response = client.post("/jobs/", json={"type": type, "payload": payload})
+    assert response.status_code == 202, response.text
+    job_id = response.json()["job_id"]
+    worker = Worker(batch_size=batch_size)
+    while worker.run_once():
+        pass
+    job = client.get(f"/jobs/{job_id}").json()
+    assert job["status"] == "Succeeded", job
+    return job
+
+
+def test_exports_read_each_batch_once(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(handlers, "JOB_EXPORT_DIR", str(tmp_path))
+    for _ in range(12):
+        client.post("/project/", json={"name": f"Exported {next(_names)}"})
+    total = len(client.get("/project/").json())
+
+    with QueryCounter() as queries:
+        job = run_job(client, "export_projects", {}, batch_size=5)
+    assert job["result"]["rows"] == total
+    with open(job["result"]["path"], newline="") as file:
+        assert len(list(csv.reader(file))) == total + 1
+    # Claiming, counting and completing, then per batch the projects, their
+    # members and the checkpoint: never a statement per project.
+    assert queries.count <= 10 + 4 * math.ceil(total / 5)
+
+
+def test_purges_checkpoint_every_batch(client, monkeypatch):
+    checkpoints = []
+    checkpoint = handlers.JobContext.checkpoint
+
+    def record(context, done):
+        checkpoints.append(done)
+        checkpoint(context, done)
+
+    monkeypatch.setattr(handlers.JobContext, "checkpoint", record)
+    for _ in range(5):
+        role = client.post("/role/", json={
+            "name": f"Purged {next(_names)}",
+            "description": "Purged by the job"
+        }).json()["id"]
+        client.delete(f"/role/{role}")
+
+    job = run_job(
+        client, "purge_tombstones", {"retention_days": 0}, batch_size=2
+    )
+    assert job["result"]["purged"] >= 5
+    assert len(checkpoints) > 3
+    assert job["progress"] == sum(checkpoints) == job["result"]["purged"]
@@ -0,0 +1,97 @@
+import json
+import logging
+import queue
+
+import pytest
+
+from core import logging as logs
+
+
+@pytest.fixture
+def records():
+    captured = []
+    handler = logging.Handler()
+    handler.emit = captured.append
+    root = logging.getLogger()
+    level = root.level
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    yield captured
+    root.removeHandler(handler)
+    root.setLevel(level)
+
+
+def test_requests_get_an_id(client):
+    response = client.get("/healthcheck")
+    generated = response.headers[logs.REQUEST_ID_HEADER]
+    assert len(generated) == 32
+    response = client.get(
+        "/healthcheck", headers={logs.REQUEST_ID_HEADER: "edge-42.a"}
+    )
+    assert response.headers[logs.REQUEST_ID_HEADER] == "edge-42.a"
+    response = client.get(
+        "/healthcheck", headers={logs.REQUEST_ID_HEADER: "bad id\n"}
+    )
+    assert response.headers[logs.REQUEST_ID_HEADER] != "bad id\n"
+
+
+def test_requests_are_logged_with_their_id(client, records):
+    response = client.get(
+        "/healthcheck", headers={logs.REQUEST_ID_HEADER: "trace-me"}
+    )
+    assert response.status_code == 200
+    [record] = [r for r in records if r.name == "api.request"]
+    assert record.status == 200
+    assert record.path == "/healthcheck"
+    assert logs.request_id.get() is None
+
+
+def test_json_formatter_adds_the_request_id_and_extra_fields():
+    handler = logs._NonBlockingQueueHandler(queue.Queue())
+    record = logging.LogRecord(
+        "api.sql", logging.INFO, __file__, 1, "%s rows", (3,), None
+    )
+    record.duration_ms = 1.5
+    token = logs.request_id.set("abc")
+    try:
+        prepared = handler.prepare(record)
+    finally:
+        logs.request_id.reset(token)
+    entry = json.loads(logs.JsonFormatter().format(prepared))
+    assert entry["message"] == "3 rows"
+    assert entry["request_id"] == "abc"
+    assert entry["duration_ms"] == 1.5
+    assert entry["level"] == "INFO"
+
+
+def test_a_full_queue_drops_records_without_blocking():
+    handler = logs._NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    logger = logging.getLogger("test.full")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        logger.warning("kept")
+        logger.warning("dropped")
+    finally:
+        logger.removeHandler(handler)
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+
+
+def test_only_slow_or_sampled_queries_are_logged(records, monkeypatch):
+    monkeypatch.setattr(logs, "LOG_SLOW_QUERY_MS", 100)
+    monkeypatch.setattr(logs, "LOG_SQL_SAMPLE_RATE", 0)
+    logs.log_query("SELECT 1", 0.001, False)
+    logs.log_query("SELECT 2", 0.2, False)
+    assert [(r.getMessage(), r.levelno) for r in records] == [
+        ("SELECT 2", logging.WARNING)
+    ]
+    records.clear()
+    monkeypatch.setattr(logs, "LOG_SQL_SAMPLE_RATE", 0.5)
+    token = logs.sql_sampled.set(True)
+    logs.log_query("SELECT 3", 0.001, False)
+    logs.sql_sampled.reset(token)
+    token = logs.sql_sampled.set(False)
+    logs.log_query("SELECT 4", 0.001, False)
+    logs.sql_sampled.reset(token)
+    assert [r.getMessage() for r in records] == ["SELECT 3"]
@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import pytest
+
+msgpack = pytest.importorskip("msgpack")
+
+from core.negotiation import datetime_restorer
+
+MSGPACK = {"Accept": "application/msgpack"}
+
+
+def unpack(response) -> object:
+    assert response.headers["content-type"] == "application/msgpack"
+    return msgpack.unpackb(response.content, timestamp=3)
+
+
+def test_dates_are_found_from_the_response_model(client):
+    role = client.post("/role/", json={
+        "name": "Packer",
+        "description": "Reads MessagePack"
+    }).json()["id"]
+    user = client.post("/user/", json={
+        "name": "Packer",
+        "position": "Engineer",
+        "role_id": role
+    }).json()["user_id"]
+    projects = [
+        client.post("/project/", json={
+            "name": f"Packed {index}",
+            "begin_date": "2024-01-01T00:00:00",
+            "end_date": "2024-12-31T00:00:00",
+            "user_ids": [user]
+        }).json()["project_id"]
+        for index in range(2)
+    ]
+    packed = unpack(client.get(f"/project/{projects[0]}", headers=MSGPACK))
+    assert isinstance(packed["begin_date"], datetime)
+    assert isinstance(packed["updated_at"], datetime)
+    assert packed["name"] == "Packed 0"
+
+    overlaps = unpack(client.get(f"/user/{user}/overlaps", headers=MSGPACK))
+    assert overlaps
+    for overlap in overlaps:
+        assert isinstance(overlap["overlap_begin"], datetime)
+
+
+def test_only_date_fields_are_converted():
+    restore = datetime_restorer({
+        "type": "object",
+        "properties": {
+            "updated_at": {"type": "string"},
+            "seen": {"anyOf": [
+                {"type": "string", "format": "date-time"},
+                {"type": "null"}
+            ]},
+            "children": {"type": "array", "items": {"$ref": "#/$defs/Node"}}
+        },
+        "$defs": {"Node": {
+            "type": "object",
+            "properties": {
+                "at": {"type": "string", "format": "date-time"},
+                "children": {
+                    "type": "array", "items": {"$ref": "#/$defs/Node"}
+                }
+            }
+        }}
+    })
+    content = restore({
+        "updated_at": "2024-01-01T00:00:00",
+        "seen": None,
+        "children": [{"at": "2024-01-01T00:00:00", "children": [
+            {"at": "2024-02-01T00:00:00", "children": []}
+        ]}]
+    })
+    assert content["updated_at"] == "2024-01-01T00:00:00"
+    assert content["seen"] is None
+    assert isinstance(content["children"][0]["children"][0]["at"], datetime)
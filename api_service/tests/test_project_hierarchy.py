@@ -0,0 +1,144 @@
+import itertools
+
+import pytest
+
+
+_trees = itertools.count()
+
+
+def create_project(client, name: str, parent_id: int | None = None, **fields) -> int:
+    response = client.post("/project/", json={
+        "name": name,
+        "begin_date": "2024-01-01T00:00:00",
+        "end_date": "2024-12-31T00:00:00",
+        "parent_id": parent_id,
+        **fields
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["project_id"]
+
+
+def subtree(client, project_id: int) -> dict[int, tuple[int, int]]:
+    response = client.get(f"/project/{project_id}/subtree")
+    assert response.status_code == 200, response.text
+    return {
+        node["project_id"]: (node["parent_id"], node["depth"])
+        for node in response.json()
+    }
+
+
+@pytest.fixture
+def tree(client):
+    """
+    program
+    ├── alpha
+    │   └── alpha_one
+    └── beta
+    """
+    role = client.post("/role/", json={
+        "name": f"Hierarchy tester {next(_trees)}",
+        "description": "Staffs the hierarchy tests"
+    }).json()
+    users = [
+        client.post("/user/", json={
+            "name": f"Member {index}",
+            "position": "Engineer",
+            "role_id": role["id"]
+        }).json()["user_id"]
+        for index in range(3)
+    ]
+    program = create_project(client, "Program", user_ids=users[:1])
+    alpha = create_project(client, "Alpha", program, user_ids=users[:2])
+    alpha_one = create_project(
+        client, "Alpha One", alpha,
+        status="Completed",
+        end_date="2025-06-30T00:00:00",
+        user_ids=users[1:]
+    )
+    beta = create_project(client, "Beta", program)
+    return {
+        "program": program,
+        "alpha": alpha,
+        "alpha_one": alpha_one,
+        "beta": beta
+    }
+
+
+def test_subtree_lists_every_descendant_with_its_depth(client, tree):
+    assert subtree(client, tree["program"]) == {
+        tree["alpha"]: (tree["program"], 1),
+        tree["beta"]: (tree["program"], 1),
+        tree["alpha_one"]: (tree["alpha"], 2),
+    }
+    assert subtree(client, tree["alpha_one"]) == {}
+
+
+def test_rollup_sums_up_the_subtree(client, tree):
+    response = client.get(f"/project/{tree['program']}/rollup")
+    assert response.status_code == 200, response.text
+    rollup = response.json()
+    assert rollup["sub_projects"] == 3
+    assert rollup["members"] == 3
+    assert rollup["projects_by_status"]["Planning"] == 3
+    assert rollup["projects_by_status"]["Completed"] == 1
+    assert rollup["end_date"] == "2025-06-30T00:00:00"
+
+
+def test_moving_a_project_moves_its_subtree(client, tree):
+    response = client.put(
+        f"/project/{tree['alpha']}",
+        json={"parent_id": tree["beta"]}
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["parent_id"] == tree["beta"]
+
+    assert subtree(client, tree["beta"]) == {
+        tree["alpha"]: (tree["beta"], 1),
+        tree["alpha_one"]: (tree["alpha"], 2),
+    }
+    assert subtree(client, tree["program"])[tree["alpha_one"]] == (
+        tree["alpha"], 3
+    )
+
+    response = client.put(
+        f"/project/{tree['alpha']}",
+        json={"parent_id": None}
+    )
+    assert response.status_code == 200, response.text
+    assert subtree(client, tree["alpha"]) == {
+        tree["alpha_one"]: (tree["alpha"], 1),
+    }
+    assert tree["alpha"] not in subtree(client, tree["program"])
+
+
+def test_a_project_cannot_be_moved_under_its_subtree(client, tree):
+    for parent in ("program", "alpha_one"):
+        response = client.put(
+            f"/project/{tree['program']}",
+            json={"parent_id": tree[parent]}
+        )
+        assert response.status_code == 400, response.text
+
+
+def test_unknown_parents_are_rejected(client, tree):
+    response = client.put(
+        f"/project/{tree['alpha']}",
+        json={"parent_id": 999999}
+    )
+    assert response.status_code == 404, response.text
+    response = client.post("/project/", json={
+        "name": "Orphan",
+        "begin_date": "2024-01-01T00:00:00",
+        "end_date": "2024-12-31T00:00:00",
+        "parent_id": 999999
+    })
+    assert response.status_code == 404, response.text
+
+
+def test_projects_with_sub_projects_cannot_be_deleted(client, tree):
+    assert client.delete(f"/project/{tree['alpha']}").status_code == 400
+    assert client.delete(f"/project/{tree['alpha_one']}").status_code == 200
+    assert client.delete(f"/project/{tree['alpha']}").status_code == 200
+    assert subtree(client, tree["program"]) == {
+        tree["beta"]: (tree["program"], 1),
+    }
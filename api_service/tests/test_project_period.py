@@ -0,0 +1,68 @@
+import itertools
+
+import pytest
+
+from sqlalchemy import inspect, text
+
+from core.db import create_db_and_tables, engine
+
+_names = itertools.count()
+
+
+def create_project(client, **dates) -> dict:
+    response = client.post("/project/", json={
+        "name": f"Period {next(_names)}",
+        **dates
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_projects_without_dates_are_returned(client):
+    project = create_project(client)
+    assert project["begin_date"] is None
+    assert project["end_date"] is None
+    response = client.get(f"/project/{project['project_id']}")
+    assert response.status_code == 200
+    assert response.json()["end_date"] is None
+
+
+def test_open_ended_projects_are_active_from_their_begin_date(client):
+    project = create_project(client, begin_date="2030-03-01T00:00:00")
+    assert project["end_date"] is None
+
+    def active(**window) -> dict[int, dict]:
+        response = client.get("/project/active", params=window)
+        assert response.status_code == 200, response.text
+        return {p["project_id"]: p for p in response.json()}
+
+    later = active(**{
+        "from": "2031-01-01T00:00:00",
+        "to": "2031-02-01T00:00:00"
+    })
+    assert later[project["project_id"]]["end_date"] is None
+    earlier = active(**{
+        "from": "2029-01-01T00:00:00",
+        "to": "2029-02-01T00:00:00"
+    })
+    assert project["project_id"] not in earlier
+    assert project["project_id"] in active()
+
+
+@pytest.mark.skipif(
+    engine.dialect.name != "postgresql",
+    reason="the period column only exists on Postgres"
+)
+def test_startup_adds_the_period_to_existing_tables(client):
+    with engine.begin() as connection:
+        connection.execute(text("ALTER TABLE project DROP COLUMN period"))
+    create_db_and_tables()
+    create_db_and_tables()
+    schema = inspect(engine)
+    assert "period" in [
+        column["name"] for column in schema.get_columns("project")
+    ]
+    assert "ix_project_period" in [
+        index["name"] for index in schema.get_indexes("project")
+    ]
+    assert create_project(client, begin_date="2024-01-01T00:00:00")
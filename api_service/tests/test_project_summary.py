@@ -0,0 +1,112 @@
+import itertools
+
+import pytest
+
+from worker import Worker
+
+_teams = itertools.count()
+
+
+def summaries(client, **params) -> dict[int, dict]:
+    response = client.get("/project/summary", params={"limit": 1000, **params})
+    assert response.status_code == 200, response.text
+    return {summary["project_id"]: summary for summary in response.json()}
+
+
+def breakdown(summary: dict) -> dict[str, int]:
+    return {role["role_name"]: role["members"] for role in summary["roles"]}
+
+
+@pytest.fixture
+def team(client):
+    team = next(_teams)
+    roles = {
+        name: client.post("/role/", json={
+            "name": f"{name} {team}",
+            "description": "Staffs the summary tests"
+        }).json()["id"]
+        for name in ("Lead", "Engineer")
+    }
+    users = [
+        client.post("/user/", json={
+            "name": f"Member {index}",
+            "position": "Engineer",
+            "role_id": roles["Lead" if index == 0 else "Engineer"]
+        }).json()["user_id"]
+        for index in range(3)
+    ]
+    response = client.post("/project/", json={
+        "name": f"Dashboard {team}",
+        "begin_date": "2024-01-01T00:00:00",
+        "end_date": "2024-12-31T00:00:00",
+        "user_ids": users[:2]
+    })
+    assert response.status_code == 200, response.text
+    return {
+        "number": team,
+        "roles": roles,
+        "users": users,
+        "project": response.json()["project_id"]
+    }
+
+
+def test_a_new_project_is_summarized_with_its_team(client, team):
+    summary = summaries(client)[team["project"]]
+    assert summary["name"] == f"Dashboard {team['number']}"
+    assert summary["status"] == "Planning"
+    assert summary["member_count"] == 2
+    assert breakdown(summary) == {
+        f"Lead {team['number']}": 1,
+        f"Engineer {team['number']}": 1
+    }
+
+
+def test_membership_changes_update_the_summary(client, team):
+    project, users = team["project"], team["users"]
+    client.post(f"/project/{project}/user", params={"user_id": users[2]})
+    assert summaries(client)[project]["member_count"] == 3
+
+    client.delete(f"/project/{project}/user", params={"user_id": users[0]})
+    summary = summaries(client)[project]
+    assert summary["member_count"] == 2
+    assert breakdown(summary) == {f"Engineer {team['number']}": 2}
+
+
+def test_user_changes_update_the_summary(client, team):
+    project, users, roles = team["project"], team["users"], team["roles"]
+    client.put(f"/user/{users[1]}", json={"role_id": roles["Lead"]})
+    assert breakdown(summaries(client)[project]) == {
+        f"Lead {team['number']}": 2
+    }
+
+    client.delete(f"/user/{users[0]}")
+    summary = summaries(client)[project]
+    assert summary["member_count"] == 1
+    assert breakdown(summary) == {f"Lead {team['number']}": 1}
+
+
+def test_project_changes_update_the_summary(client, team):
+    project = team["project"]
+    client.put(f"/project/{project}", json={"status": "On Hold"})
+    assert project in summaries(client, status="On Hold")
+    assert project not in summaries(client, status="Planning")
+
+    client.delete(f"/project/{project}")
+    assert project not in summaries(client)
+
+
+def test_the_refresh_job_rebuilds_the_summaries(client, team):
+    response = client.post("/jobs/", json={
+        "type": "refresh_project_summaries",
+        "payload": {}
+    })
+    assert response.status_code == 202, response.text
+    job_id = response.json()["job_id"]
+    worker = Worker(batch_size=2)
+    while worker.run_once():
+        pass
+
+    job = client.get(f"/jobs/{job_id}").json()
+    assert job["status"] == "Succeeded", job
+    assert job["progress"] == job["total"] == job["result"]["refreshed"]
+    assert summaries(client)[team["project"]]["member_count"] == 2
@@ -0,0 +1,246 @@
+import time
+
+from dataclasses import dataclass
+from fastapi.routing import APIRoute
+from typing import Callable
+
+import pytest
+
+import main
+from tests.conftest import Dataset, QueryCounter
+
+
+# Response time allowed to any route, whatever the number of rows.
+DEFAULT_MAX_MS = 250
+# Response time allowed to the routes returning whole tables, which
+# serialize every row.
+LIST_MAX_MS = 1000
+# Idempotent requests are timed several times and the best run is kept, so
+# a scheduling hiccup does not fail the test.
+TIMING_RUNS = 3
+
+
+@dataclass
+class RouteBudget:
+    """
+    The most a route may cost, with the request exercising it.
+
+    Args:
+        method: The HTTP method of the route.
+        path: The path of the route, as declared in its router.
+        max_queries: The maximum number of SQL statements per request.
+        request: Builds the keyword arguments of the request (`url`, and
+            `params` or `json`) from the seeded dataset. It may create the
+            rows the request modifies; those statements are not counted.
+        status: The expected status code.
+        max_ms: The maximum response time, in milliseconds.
+    """
+    method: str
+    path: str
+    max_queries: int
+    request: Callable[[Dataset], dict]
+    status: int = 200
+    max_ms: float = DEFAULT_MAX_MS
+
+    @property
+    def idempotent(self) -> bool:
+        return self.method == "GET"
+
+
+BUDGETS = [
+    # project
+    RouteBudget(
+        "POST", "/project/", 5,
+        lambda data: {"url": "/project/", "json": {
+            "name": "New project",
+            "begin_date": "2024-01-01T00:00:00",
+            "end_date": "2024-06-30T00:00:00",
+            "user_ids": data.user_ids[:3]
+        }}
+    ),
+    RouteBudget(
+        "GET", "/project/", 4,
+        lambda data: {"url": "/project/"},
+        max_ms=LIST_MAX_MS
+    ),
+    RouteBudget(
+        "GET", "/project/active", 4,
+        lambda data: {"url": "/project/active", "params": {
+            "from": "2024-03-01T00:00:00",
+            "to": "2024-03-31T00:00:00"
+        }},
+        max_ms=LIST_MAX_MS
+    ),
+    RouteBudget(
+        "GET", "/project/summary", 2,
+        lambda data: {"url": "/project/summary", "params": {"limit": 1000}},
+        max_ms=LIST_MAX_MS
+    ),
+    RouteBudget(
+        "GET", "/project/{project_id}", 2,
+        lambda data: {"url": f"/project/{data.project_ids[0]}"}
+    ),
+    RouteBudget(
+        "GET", "/project/{project_id}/subtree", 2,
+        lambda data: {"url": f"/project/{data.project_ids[0]}/subtree"},
+        max_ms=LIST_MAX_MS
+    ),
+    RouteBudget(
+        "GET", "/project/{project_id}/rollup", 2,
+        lambda data: {"url": f"/project/{data.project_ids[0]}/rollup"}
+    ),
+    RouteBudget(
+        "PUT", "/project/{project_id}", 3,
+        lambda data: {
+            "url": f"/project/{data.project_ids[0]}",
+            "json": {"description": "Updated by a test"}
+        }
+    ),
+    RouteBudget(
+        "DELETE", "/project/{project_id}", 5,
+        lambda data: {"url": f"/project/{data.new_project()}"}
+    ),
+    RouteBudget(
+        "POST", "/project/{project_id}/user", 4,
+        lambda data: {
+            "url": f"/project/{data.new_project()}/user",
+            "params": {"user_id": data.user_ids[0]}
+        }
+    ),
+    RouteBudget(
+        "DELETE", "/project/{project_id}/user", 4,
+        lambda data: {
+            "url": f"/project/{data.new_project([data.user_ids[0]])}/user",
+            "params": {"user_id": data.user_ids[0]}
+        }
+    ),
+    # role
+    RouteBudget(
+        "POST", "/role/", 1,
+        lambda data: {"url": "/role/", "json": {
+            "name": f"Role of size {data.size}",
+            "description": "Created by a test"
+        }}
+    ),
+    RouteBudget(
+        "GET", "/role/", 1,
+        lambda data: {"url": "/role/"}
+    ),
+    RouteBudget(
+        "GET", "/role/{role_id}", 1,
+        lambda data: {"url": f"/role/{data.role_ids[0]}"}
+    ),
+    RouteBudget(
+        "PUT", "/role/{role_id}", 2,
+        lambda data: {
+            "url": f"/role/{data.role_ids[0]}",
+            "json": {"description": "Updated by a test"}
+        }
+    ),
+    RouteBudget(
+        "DELETE", "/role/{role_id}", 3,
+        lambda data: {"url": f"/role/{data.new_role()}"}
+    ),
+    # user
+    RouteBudget(
+        "POST", "/user/", 2,
+        lambda data: {"url": "/user/", "json": {
+            "name": "New user",
+            "position": "Analyst",
+            "role_id": data.role_ids[0]
+        }}
+    ),
+    RouteBudget(
+        "GET", "/user/", 2,
+        lambda data: {"url": "/user/"},
+        max_ms=LIST_MAX_MS
+    ),
+    RouteBudget(
+        "GET", "/user/workload", 1,
+        lambda data: {"url": "/user/workload", "params": {"limit": 100}}
+    ),
+    RouteBudget(
+        "GET", "/user/{user_id}", 2,
+        lambda data: {"url": f"/user/{data.user_ids[0]}"}
+    ),
+    RouteBudget(
+        "GET", "/user/{user_id}/overlaps", 2,
+        lambda data: {"url": f"/user/{data.user_ids[0]}/overlaps"}
+    ),
+    RouteBudget(
+        "PUT", "/user/{user_id}", 3,
+        lambda data: {
+            "url": f"/user/{data.user_ids[0]}",
+            "json": {"position": "Staff Engineer"}
+        }
+    ),
+    RouteBudget(
+        "DELETE", "/user/{user_id}", 3,
+        lambda data: {"url": f"/user/{data.new_user()}"}
+    ),
+    # search
+    RouteBudget(
+        "GET", "/search/", 1,
+        lambda data: {"url": "/search/", "params": {"q": "project"}}
+    ),
+    # jobs
+    RouteBudget(
+        "POST", "/jobs/", 1,
+        lambda data: {"url": "/jobs/", "json": {
+            "type": "purge_tombstones",
+            "payload": {"retention_days": 30}
+        }},
+        status=202
+    ),
+    RouteBudget(
+        "GET", "/jobs/{job_id}", 1,
+        lambda data: {"url": f"/jobs/{data.new_job()}"}
+    ),
+    # audit
+    RouteBudget(
+        "GET", "/audit/", 1,
+        lambda data: {"url": "/audit/", "params": {"entity": "project"}}
+    ),
+    # API
+    RouteBudget("GET", "/info", 0, lambda data: {"url": "/info"}),
+    RouteBudget("GET", "/healthcheck", 0, lambda data: {"url": "/healthcheck"}),
+    RouteBudget("GET", "/metrics", 0, lambda data: {"url": "/metrics"}),
+]
+
+
+def test_every_route_has_a_budget():
+    routes = {
+        (method, route.path)
+        for route in main.app.routes
+        if isinstance(route, APIRoute) and route.include_in_schema
+        for method in route.methods
+    }
+    budgeted = {(budget.method, budget.path) for budget in BUDGETS}
+    assert routes - budgeted == set(), "Routes without a query budget"
+    assert budgeted - routes == set(), "Budgets of routes that don't exist"
+
+
+@pytest.mark.parametrize(
+    "budget",
+    BUDGETS,
+    ids=lambda budget: f"{budget.method} {budget.path}"
+)
+def test_route_stays_within_budget(client, dataset, budget):
+    runs = TIMING_RUNS if budget.idempotent else 1
+    timings = []
+    for _ in range(runs):
+        request = budget.request(dataset)
+        with QueryCounter() as queries:
+            started = time.perf_counter()
+            response = client.request(budget.method, **request)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        assert response.status_code == budget.status, response.text
+        assert queries.count <= budget.max_queries, (
+            f"{queries.count} queries with {dataset.size} rows "
+            f"(budget {budget.max_queries}):\n" + "\n".join(queries.statements)
+        )
+    elapsed = min(timings)
+    assert elapsed <= budget.max_ms, (
+        f"{elapsed:.0f} ms with {dataset.size} rows (budget {budget.max_ms} ms)"
+    )
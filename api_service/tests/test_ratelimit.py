@@ -0,0 +1,34 @@
+import pytest
+
+from core.ratelimit import InMemoryBackend, RedisBackend
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "memory":
+        return InMemoryBackend()
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisBackend(fakeredis.FakeRedis())
+
+
+def test_rejected_requests_spend_no_bucket(backend):
+    shared = ("client", 10, 0.001)
+    route = ("client:GET:/project/", 2, 0.001)
+    assert backend.consume([shared, route], 1) == 0
+    assert backend.consume([shared, route], 1) == 0
+    for _ in range(5):
+        assert backend.consume([shared, route], 1) > 0
+    # Only the two accepted requests were taken from the shared budget.
+    other_route = ("client:GET:/user/", 10, 0.001)
+    for _ in range(8):
+        assert backend.consume([shared, other_route], 1) == 0
+    assert backend.consume([shared, other_route], 1) > 0
+
+
+def test_releasing_never_frees_more_slots_than_the_limit(backend):
+    backend.release("client")
+    backend.release("client")
+    assert backend.acquire("client", 1)
+    assert not backend.acquire("client", 1)
+    backend.release("client")
+    assert backend.acquire("client", 1)
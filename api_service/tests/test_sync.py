@@ -0,0 +1,80 @@
+import itertools
+import time
+
+import pytest
+
+from sqlalchemy import text
+
+from core.db import UnitOfWork, engine
+from models.role import Role
+from repositories.role import RoleRepository
+
+_names = itertools.count()
+
+
+def create_role(client) -> dict:
+    response = client.post("/role/", json={
+        "name": f"Synced {next(_names)}",
+        "description": "Follows the sync cursor"
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def synced(client, cursor: str, **params) -> dict[int, dict]:
+    response = client.get(
+        "/role/", params={"updated_since": cursor, **params}
+    )
+    assert response.status_code == 200, response.text
+    return {role["id"]: role for role in response.json()}
+
+
+def test_changes_since_the_cursor_are_returned(client):
+    role = create_role(client)
+    cursor = role["updated_at"]
+    assert role["id"] in synced(client, cursor)
+
+    time.sleep(0.01)
+    response = client.put(
+        f"/role/{role['id']}", json={"description": "Changed"}
+    )
+    assert response.json()["updated_at"] > cursor
+    assert synced(client, cursor)[role["id"]]["description"] == "Changed"
+
+    cursor = response.json()["updated_at"]
+    time.sleep(0.01)
+    client.delete(f"/role/{role['id']}")
+    assert role["id"] not in synced(client, cursor)
+    assert synced(client, cursor, include_deleted=True)[role["id"]][
+        "deleted_at"
+    ] is not None
+
+
+@pytest.mark.skipif(
+    engine.dialect.name != "postgresql",
+    reason="only Postgres stamps rows with the transaction start"
+)
+def test_rows_are_stamped_when_written_not_when_the_transaction_began(client):
+    role = create_role(client)
+    with UnitOfWork() as uow:
+        began = uow.session.exec(text("SELECT now()")).scalar_one()
+        time.sleep(0.01)
+        record = uow.session.get(Role, role["id"])
+        record.description = "Written late"
+        uow.session.flush()
+        assert record.updated_at > began
+
+
+@pytest.mark.skipif(
+    engine.dialect.name != "postgresql",
+    reason="only Postgres stamps rows with the transaction start"
+)
+def test_tombstones_are_stamped_when_written(client):
+    role = create_role(client)
+    with UnitOfWork() as uow:
+        began = uow.session.exec(text("SELECT now()")).scalar_one()
+        time.sleep(0.01)
+        record = uow.session.get(Role, role["id"])
+        RoleRepository(session=uow.session).delete(record)
+        uow.session.refresh(record)
+        assert record.deleted_at > began
@@ -0,0 +1,118 @@
+import json
+
+import pytest
+
+pytest.importorskip("opentelemetry.sdk")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter
+)
+from sqlalchemy import text
+from sqlmodel import create_engine
+
+from core import tracing
+
+_exporter = InMemorySpanExporter()
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    monkeypatch.setattr(tracing, "TRACING_ENABLED", True)
+    provider = trace.get_tracer_provider()
+    if not isinstance(provider, TracerProvider):
+        provider = TracerProvider()
+        trace.set_tracer_provider(provider)
+    if not getattr(provider, "_test_exporter", False):
+        provider.add_span_processor(SimpleSpanProcessor(_exporter))
+        provider._test_exporter = True
+    _exporter.clear()
+    yield _exporter
+    _exporter.clear()
+
+
+def names(exporter) -> list[str]:
+    return [span.name for span in exporter.get_finished_spans()]
+
+
+def test_methods_get_spans_within_sampled_traces(spans):
+    @tracing.traced
+    class CounterService:
+        def count(self, value):
+            return self._double(value)
+
+        def _double(self, value):
+            return value * 2
+
+    assert CounterService().count(2) == 4
+    assert names(spans) == []
+    with tracing.start_span("request"):
+        assert CounterService().count(3) == 6
+    assert names(spans) == ["CounterService.count", "request"]
+    child, parent = spans.get_finished_spans()
+    assert child.parent.span_id == parent.context.span_id
+
+
+def test_classes_are_untouched_when_tracing_is_disabled(monkeypatch):
+    monkeypatch.setattr(tracing, "TRACING_ENABLED", False)
+
+    class Service:
+        def run(self):
+            pass
+
+    run = Service.run
+    assert tracing.traced(Service).run is run
+
+
+def test_statements_get_spans_with_row_counts(spans):
+    engine = create_engine("sqlite://")
+    tracing.instrument_engine(engine)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE item (id INTEGER)"))
+        with tracing.start_span("request"):
+            connection.execute(
+                text("INSERT INTO item VALUES (1), (2), (3)")
+            )
+    statement, _ = spans.get_finished_spans()
+    assert statement.name == "INSERT"
+    assert statement.kind == trace.SpanKind.CLIENT
+    assert statement.attributes["db.system"] == "sqlite"
+    assert statement.attributes["db.row_count"] == 3
+
+
+def test_requests_get_a_span_named_after_their_route(spans):
+    app = FastAPI()
+    app.add_middleware(tracing.TracingMiddleware)
+
+    @app.get("/item/{item_id}")
+    def read_item(item_id: int):
+        with tracing.start_span("lookup"):
+            return {"id": item_id}
+
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    response = TestClient(app).get(
+        "/item/7",
+        headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"}
+    )
+    assert response.status_code == 200
+    lookup, request = spans.get_finished_spans()
+    assert request.name == "GET /item/{item_id}"
+    assert request.attributes["http.response.status_code"] == 200
+    assert format(request.context.trace_id, "032x") == trace_id
+    assert lookup.parent.span_id == request.context.span_id
+
+
+def test_file_exporter_writes_one_span_per_line(spans, tmp_path):
+    with tracing.start_span("first"):
+        pass
+    with tracing.start_span("second"):
+        pass
+    path = tmp_path / "traces.jsonl"
+    exporter = tracing.FileSpanExporter(str(path))
+    exporter.export(spans.get_finished_spans())
+    lines = path.read_text().splitlines()
+    assert [json.loads(line)["name"] for line in lines] == ["first", "second"]
@@ -0,0 +1,86 @@
+import pytest
+
+from sqlalchemy import inspect, text
+from sqlmodel import SQLModel
+
+from core.db import engine, upgrade_schema
+
+pytestmark = pytest.mark.skipif(
+    engine.dialect.name != "postgresql",
+    reason="upgrades only apply to Postgres databases"
+)
+
+SCHEMA = "upgrade_test"
+
+# The schema of the first release, before timestamps, soft deletes, the
+# project hierarchy and full-text search.
+BASELINE = [
+    "CREATE TYPE projectstatus AS ENUM "
+    "('PLANNING', 'IN_PROGRESS', 'COMPLETED', 'ON_HOLD', 'CANCELLED')",
+    "CREATE TABLE project (name VARCHAR NOT NULL, description VARCHAR, "
+    "status projectstatus, begin_date TIMESTAMP WITHOUT TIME ZONE, "
+    "end_date TIMESTAMP WITHOUT TIME ZONE, id SERIAL PRIMARY KEY)",
+    "CREATE INDEX ix_project_name ON project (name)",
+    "CREATE TABLE role (name VARCHAR NOT NULL, description VARCHAR, "
+    "id SERIAL PRIMARY KEY, CONSTRAINT uq_role_name UNIQUE (name))",
+    "CREATE INDEX ix_role_name ON role (name)",
+    'CREATE TABLE "user" (name VARCHAR NOT NULL, position VARCHAR NOT NULL, '
+    "id SERIAL PRIMARY KEY, role_id INTEGER NOT NULL REFERENCES role (id), "
+    "creation_date TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL)",
+    'CREATE INDEX ix_user_role_id ON "user" (role_id)',
+    "CREATE TABLE user_project ("
+    'user_id INTEGER NOT NULL REFERENCES "user" (id), '
+    "project_id INTEGER NOT NULL REFERENCES project (id), "
+    "PRIMARY KEY (user_id, project_id))",
+    "INSERT INTO role (name, description) VALUES ('Lead', 'Leads')",
+    "INSERT INTO project (name) VALUES ('Existing')",
+]
+
+
+@pytest.fixture
+def baseline():
+    with engine.connect() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        connection.execute(text(f"SET search_path TO {SCHEMA}"))
+        for statement in BASELINE:
+            connection.execute(text(statement))
+        connection.commit()
+        try:
+            yield connection
+        finally:
+            connection.rollback()
+            connection.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+            connection.execute(text("RESET search_path"))
+            connection.commit()
+
+
+def test_baseline_databases_get_every_column_and_index(baseline):
+    upgrade_schema(baseline)
+    upgrade_schema(baseline)
+    baseline.commit()
+
+    schema = inspect(baseline)
+    for name in ("project", "role", "user", "user_project"):
+        table = SQLModel.metadata.tables[name]
+        columns = {
+            column["name"] for column in schema.get_columns(name, SCHEMA)
+        }
+        assert {column.name for column in table.columns} <= columns, name
+        indexes = {
+            index["name"] for index in schema.get_indexes(name, SCHEMA)
+        }
+        assert {index.name for index in table.indexes} <= indexes, name
+
+    # Deleted roles no longer hold on to their name.
+    baseline.execute(text("UPDATE role SET deleted_at = now()"))
+    baseline.execute(
+        text("INSERT INTO role (name, description) VALUES ('Lead', 'New')")
+    )
+    assert schema.get_unique_constraints("role", SCHEMA) == []
+
+    project = baseline.execute(
+        text("SELECT path, updated_at FROM project")
+    ).one()
+    assert project.path == "/"
+    assert project.updated_at is not None
@@ -0,0 +1,137 @@
+import logging
+import os
+import signal
+import threading
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from sqlmodel import Session
+
+from core.audit import audit_writer
+from core.db import engine
+from core.logging import configure_logging, stop_logging
+from core.tracing import configure_tracing, start_span, stop_tracing
+from jobs import HANDLERS, JobContext
+from services.job import JobService
+
+
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+JOB_BATCH_SIZE = int(os.getenv("JOB_BATCH_SIZE", "500"))
+# Size of the process pool for CPU-bound steps (0 uses every CPU).
+JOB_PROCESSES = int(os.getenv("JOB_PROCESSES", "0")) or os.cpu_count()
+# A running job whose worker has not reported for this long is run again,
+# up to JOB_MAX_ATTEMPTS times.
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "600"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+
+logger = logging.getLogger("worker")
+
+
+class Worker:
+    def __init__(
+        self,
+        executor: Executor | None = None,
+        batch_size: int = JOB_BATCH_SIZE,
+        poll_interval: float = JOB_POLL_INTERVAL
+    ) -> None:
+        """
+        Runs queued jobs one at a time, outside of the API processes.
+
+        Several workers can run side by side: each job is claimed with
+        `FOR UPDATE SKIP LOCKED`, so it is only run by one of them.
+
+        Args:
+            executor (Executor | None): The process pool handed to jobs for
+            their CPU-bound steps.
+            batch_size (int): The number of items jobs handle per transaction.
+            poll_interval (float): Seconds to wait when the queue is empty.
+        """
+        self.executor = executor
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+
+    def run_once(self) -> bool:
+        """
+        Claims and runs the next job.
+
+        Returns:
+            bool: True if a job was run, False if the queue was empty.
+        """
+        with Session(engine) as session:
+            service = JobService(session=session)
+            stale_before = (
+                datetime.now(timezone.utc)
+                - timedelta(seconds=JOB_STALE_SECONDS)
+            )
+            job = service.claim_next_job(stale_before=stale_before)
+            session.commit()
+            if job is None:
+                return False
+
+            logger.info("Running job %s (%s)", job.id, job.type)
+            with start_span(
+                f"job {job.type}",
+                {"job.id": job.id, "job.type": job.type}
+            ):
+                try:
+                    if job.attempts > JOB_MAX_ATTEMPTS:
+                        raise RuntimeError(
+                            f"Gave up after {JOB_MAX_ATTEMPTS} attempts"
+                        )
+                    handler = HANDLERS[job.type]
+                    context = JobContext(
+                        session=session,
+                        job=job,
+                        executor=self.executor,
+                        batch_size=self.batch_size
+                    )
+                    result = handler.func(
+                        context,
+                        handler.payload_model.model_validate(job.payload)
+                    )
+                except Exception as error:
+                    logger.exception("Job %s failed", job.id)
+                    session.rollback()
+                    service.fail_job(job, error)
+                else:
+                    service.complete_job(job, result)
+                session.commit()
+            return True
+
+    def run(self) -> None:
+        """
+        Runs jobs until `stop()` is called. A job being run is finished
+        first.
+        """
+        while not self._stop.is_set():
+            try:
+                if self.run_once():
+                    continue
+            except Exception:
+                logger.exception("Error claiming a job")
+            self._stop.wait(self.poll_interval)
+
+    def stop(self, *args) -> None:
+        self._stop.set()
+
+
+def main() -> None:
+    configure_logging()
+    with ProcessPoolExecutor(max_workers=JOB_PROCESSES) as executor:
+        worker = Worker(executor=executor)
+        signal.signal(signal.SIGTERM, worker.stop)
+        signal.signal(signal.SIGINT, worker.stop)
+        configure_tracing()
+        audit_writer.start()
+        try:
+            worker.run()
+        finally:
+            audit_writer.stop()
+            stop_tracing()
+            stop_logging()
+
+
+if __name__ == "__main__":
+    main()